@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Append-only archive of raw pages, so extraction can be re-run offline.
+
+Two files make up an archive:
+
+    pages.arc      concatenated gzip members, one per fetched page
+    pages.arc.idx  one line per member: "<offset>\\t<length>\\t<url>\\n"
+
+Each gzip member holds a one-line JSON header ({"url", "fetched_at"})
+followed by the page body. The data file is always written before its
+index line; opening for append truncates a torn last index line, and any
+data bytes past the last indexed frame, so new frames start clean.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+
+ARCHIVE_FILE = 'pages.arc'
+
+
+class HtmlArchive:
+    def __init__(self, path: str = ARCHIVE_FILE, mode: str = 'a'):
+        self.path       = path
+        self.index_path = path + '.idx'
+        self.index      = []        # (offset, length, url) in append order
+        self._lock      = threading.Lock()
+        self._data = self._idx = None
+        end, good_bytes = self._load_index()
+        if mode == 'a':
+            # cut off a torn index line so the next append starts on a clean one
+            if os.path.exists(self.index_path) and os.path.getsize(self.index_path) != good_bytes:
+                os.truncate(self.index_path, good_bytes)
+            self._data = open(path, 'ab')
+            if self._data.tell() > end:
+                self._data.truncate(end)
+                self._data.seek(end)
+            self._idx = open(self.index_path, 'a', encoding='utf-8')
+        elif not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+    def _load_index(self) -> tuple:
+        """Read the complete index lines: (end of the last frame, bytes they span)."""
+        end = good_bytes = 0
+        try:
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        offset, length, url = line.decode('utf-8').rstrip('\n').split('\t', 2)
+                        offset, length = int(offset), int(length)
+                    except ValueError:
+                        break
+                    good_bytes += len(line)
+                    self.index.append((offset, length, url))
+                    end = offset + length
+        except FileNotFoundError:
+            pass
+        return end, good_bytes
+
+    def __len__(self):
+        return len(self.index)
+
+    def urls(self) -> set:
+        return {url for _, _, url in self.index}
+
+    def latest(self) -> dict:
+        """url -> (offset, length) of the most recent frame for that URL."""
+        return {url: (offset, length) for offset, length, url in self.index}
+
+    def append(self, url: str, html: str):
+        header = json.dumps({'url': url, 'fetched_at': time.time()}).encode('utf-8')
+        frame = gzip.compress(header + b'\n' + html.encode('utf-8'), mtime=0)
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(frame)
+            self._data.flush()
+            self._idx.write(f'{offset}\t{len(frame)}\t{url}\n')
+            self._idx.flush()
+            self.index.append((offset, len(frame), url))
+
+    def close(self):
+        for f in (self._data, self._idx):
+            if f:
+                f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_frame(f, offset: int, length: int):
+    """Decode one frame from an open archive file: returns (url, html)."""
+    f.seek(offset)
+    header, _, body = gzip.decompress(f.read(length)).partition(b'\n')
+    return json.loads(header)['url'], body.decode('utf-8')
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Pipelined asyncio crawler: listing fetch → detail fetch → parse.
+
+Each stage runs as its own set of tasks and hands work to the next one
+through a bounded asyncio.Queue, so the next listing page is requested
+while detail pages from the previous one are still downloading. HTTP goes
+through the same requests.Session as main.py (on worker threads), so the
+records are exactly what main.crawl_sequential produces.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from journal import result_id
+from main import BASE_URL, TARGET, MAX_WORKERS, fetch_html, retry_queue
+from parsers import parse_result, parse_survey_page
+
+_DONE = object()
+
+
+class HostLimiter:
+    """Global cap on requests in flight, plus a separate cap per host."""
+
+    def __init__(self, concurrency: int, per_host: int):
+        self._global = asyncio.Semaphore(concurrency)
+        self._per_host = per_host
+        self._hosts = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc
+        sem = self._hosts.setdefault(host, asyncio.Semaphore(self._per_host))
+        async with self._global, sem:
+            yield
+
+
+class _CrawlState:
+    def __init__(self, target: int, journal=None):
+        self.target    = target
+        self.journal   = journal
+        self.records   = journal.records if journal else []
+        self.seen_ids  = journal.seen_ids if journal else set()
+        self.queued    = set()  # result IDs handed to the detail stage
+        self.in_flight = 0      # queued for detail fetch but not yet parsed/failed
+        self.progress  = asyncio.Event()
+        # page -> [results still in flight, fully listed, any failure]
+        self.pages     = {}
+
+    def add(self, rec: dict):
+        if self.journal:
+            self.journal.add_record(rec)
+        else:
+            self.records.append(rec)
+            self.seen_ids.add(result_id(rec['url']))
+
+    def close_page(self, page: int, fully_listed: bool):
+        self.pages[page][1] = fully_listed
+        self._maybe_checkpoint(page)
+
+    def finish_one(self, page: int, rid: int, ok: bool):
+        self.queued.discard(rid)
+        self.in_flight -= 1
+        self.progress.set()
+        entry = self.pages[page]
+        entry[0] -= 1
+        entry[2] = entry[2] or not ok
+        self._maybe_checkpoint(page)
+
+    def _maybe_checkpoint(self, page: int):
+        pending, fully_listed, failed = self.pages[page]
+        if pending == 0 and fully_listed:
+            del self.pages[page]
+            if self.journal and not failed:
+                self.journal.page_done(page)
+
+    @property
+    def satisfied(self) -> bool:
+        # stop listing once everything already queued would reach the target
+        return len(self.records) + self.in_flight >= self.target
+
+
+async def _fetch(loop, limiter: HostLimiter, url: str) -> str:
+    async with limiter.slot(url):
+        return await loop.run_in_executor(None, fetch_html, url)
+
+
+async def _list_pages(loop, limiter, state, base_url, detail_q, start_page,
+                      known_ids, stale_pages):
+    page_number = start_page
+    stale = 0
+    while True:
+        # hold off while the queued work would cover the target; a failed
+        # detail fetch frees a slot and sends us back to the listings
+        while state.satisfied and state.in_flight:
+            state.progress.clear()
+            await state.progress.wait()
+        if state.satisfied:
+            break
+        survey_url = f'{base_url}/survey/?page={page_number}'
+        try:
+            html = await _fetch(loop, limiter, survey_url)
+        except Exception as e:
+            # records so far are journaled; --resume picks up at this page
+            print(f"❌ {survey_url}: {e}, stopping")
+            break
+        meta = await loop.run_in_executor(None, parse_survey_page, html, survey_url)
+        if not meta:
+            break
+        state.pages[page_number] = [0, False, False]
+        new = 0
+        fully_listed = True
+        for url, term in meta:
+            rid = result_id(url)
+            if rid in state.seen_ids or rid in state.queued or rid in known_ids:
+                continue
+            if state.satisfied:
+                fully_listed = False
+                break
+            state.queued.add(rid)
+            new += 1
+            state.in_flight += 1
+            state.pages[page_number][0] += 1
+            await detail_q.put((page_number, url, term))
+        state.close_page(page_number, fully_listed)
+        print(f"Listed survey page {page_number}: {new} new")
+        stale = 0 if new else stale + 1
+        if stale_pages and stale >= stale_pages:
+            print(f"No new results on the last {stale} pages, stopping.")
+            break
+        page_number += 1
+
+
+async def _fetch_details(loop, limiter, state, detail_q, parse_q):
+    while (item := await detail_q.get()) is not _DONE:
+        page, url, term = item
+        try:
+            html = await _fetch(loop, limiter, url)
+        except Exception as e:
+            state.finish_one(page, result_id(url), ok=False)
+            print(f"❌ {url}: {e}")
+            retry_queue.push(url, term, e)
+            continue
+        await parse_q.put((page, url, term, html))
+
+
+async def _parse_details(loop, state, parse_q):
+    while (item := await parse_q.get()) is not _DONE:
+        page, url, term, html = item
+        ok = False
+        try:
+            rec = await loop.run_in_executor(None, parse_result, html, url)
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+        else:
+            rec['term'] = term
+            if len(state.records) < state.target:
+                ok = True
+                state.add(rec)
+                if len(state.records) % 100 == 0:
+                    print(f" → Collected {len(state.records)}/{state.target}")
+        finally:
+            state.finish_one(page, result_id(url), ok)
+
+
+async def crawl(target: int = TARGET, base_url: str = BASE_URL, *,
+                concurrency: int = 20, per_host: int = MAX_WORKERS,
+                parse_workers: int = 2, queue_size: int = 200,
+                journal=None, known_ids=frozenset(),
+                stale_pages=None) -> list:
+    """Collect up to `target` unique records, returned in completion order.
+
+    With a CrawlJournal the crawl starts from its first incomplete page,
+    skips result IDs it already holds, and checkpoints as it goes.
+    Result IDs in `known_ids` are never fetched; with `stale_pages` the
+    listing stage gives up after that many pages in a row with nothing new.
+    """
+    loop = asyncio.get_running_loop()
+    # blocking requests/BeautifulSoup calls run here; size it so the
+    # semaphores, not the executor, decide how much is in flight
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency + parse_workers))
+
+    limiter  = HostLimiter(concurrency, per_host)
+    state    = _CrawlState(target, journal)
+    start_page = journal.next_page if journal else 1
+    detail_q = asyncio.Queue(maxsize=queue_size)
+    parse_q  = asyncio.Queue(maxsize=queue_size)
+
+    fetchers = [asyncio.create_task(_fetch_details(loop, limiter, state, detail_q, parse_q))
+                for _ in range(concurrency)]
+    parsers  = [asyncio.create_task(_parse_details(loop, state, parse_q))
+                for _ in range(parse_workers)]
+    try:
+        await _list_pages(loop, limiter, state, base_url, detail_q, start_page,
+                          known_ids, stale_pages)
+        for _ in fetchers:
+            await detail_q.put(_DONE)
+        await asyncio.gather(*fetchers)
+        for _ in parsers:
+            await parse_q.put(_DONE)
+        await asyncio.gather(*parsers)
+    finally:
+        for task in fetchers + parsers:
+            task.cancel()
+    print(f" → Collected {len(state.records)}/{target}")
+    return state.records
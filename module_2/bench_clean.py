@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Cleaning throughput on synthetic record files, engine by engine.
+
+    python bench_clean.py [--sizes 10000 100000 1000000] [--workers 4]
+
+Each size gets a generated .jsonl file (about 1% repeated URLs, messy
+whitespace, "Degree" suffixes, "Accepted on ..." statuses, timeline dumps),
+cleaned file-to-file by:
+
+    legacy     the old per-record re.sub() passes with uncompiled patterns
+    record     iter_clean(), precompiled / split-join per record
+    columnar   chunks cleaned and JSON-encoded column by column, in this process
+    columnar×N the same chunks spread over N processes
+
+The script exits non-zero if any engine's output differs from legacy's.
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from clean import clean_file
+from records import iter_records, write_records
+
+DEGREES  = ['Masters', 'PhD', ' Masters  Degree', 'PhD\n Degree ', 'MFA', 'Other', '']
+STATUSES = ['Accepted', 'Rejected', 'Wait listed', 'Interview',
+            'Accepted on 12 Mar', ' Rejected on 3 Feb ', '']
+TERMS    = ['Fall 2024', 'Spring 2025', ' Fall 2025 ', '']
+ORIGINS  = ['American', 'International', 'Other', ' International ']
+WORDS    = 'funding offer advisor visit lab interview great email portal waitlist'.split()
+
+
+# ————— Reference (pre-chunking clean.py) —————
+def legacy_clean_record(rec: dict) -> dict:
+    deg = re.sub(r'\s+', ' ', rec.get('Degree', '')).strip()
+    deg = re.sub(r'\bDegree\b', '', deg).strip()
+    txt = re.sub(r'\s+', ' ', rec.get('comments', '')).strip()
+    if txt.lower().startswith("timeline"):
+        txt = ""
+    return {
+        'program':           rec.get('program', '').strip(),
+        'comments':          txt,
+        'date_added':        rec.get('date_added', '').strip(),
+        'url':               rec.get('url', '').strip(),
+        'status':            rec.get('status', '').strip().split(' on ', 1)[0].strip(),
+        'term':              rec.get('term', '').strip(),
+        'US/International':  rec.get('US/International', '').strip(),
+        'Degree':            deg
+    }
+
+def legacy_clean_file(input_path: str, output_path: str) -> int:
+    def cleaned():
+        seen_urls = set()
+        for rec in iter_records(input_path):
+            url = rec.get('url', '').strip()
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                yield legacy_clean_record(rec)
+    return write_records(output_path, cleaned())
+
+
+# ————— Synthetic Data —————
+def synthetic_records(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(n):
+        rid = rng.randrange(i) if i and rng.random() < 0.01 else 900000 + i
+        if rng.random() < 0.02:
+            comments = 'Timeline\n\n  Submitted  ' + ' '.join(rng.choices(WORDS, k=40))
+        else:
+            comments = '  '.join(rng.choices(WORDS, k=rng.randrange(0, 25))).replace('lab', 'lab\n\t')
+        yield {
+            'program':          f"Program {i % 900}, University {i % 317}  ",
+            'comments':         comments,
+            'date_added':       f"Added on March {1 + i % 28}, 2025 ",
+            'url':              f" https://www.thegradcafe.com/result/{rid}",
+            'status':           rng.choice(STATUSES),
+            'term':             rng.choice(TERMS),
+            'US/International': rng.choice(ORIGINS),
+            'Degree':           rng.choice(DEGREES),
+        }
+
+
+def _digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    engines = [
+        ('legacy',   legacy_clean_file),
+        ('record',   lambda i, o: clean_file(i, o, columnar=False)),
+        ('columnar', lambda i, o: clean_file(i, o, workers=1)),
+    ]
+    if args.workers > 1:
+        engines.append((f'columnar×{args.workers}',
+                        lambda i, o: clean_file(i, o, workers=args.workers)))
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            raw = os.path.join(tmp, f'raw_{n}.jsonl')
+            write_records(raw, synthetic_records(n))
+            print(f"\n{n:,} records")
+            print(f"  {'engine':<12} {'seconds':>8} {'records/sec':>12} {'speed-up':>9}")
+            reference, base = None, None
+            for name, run in engines:
+                out = os.path.join(tmp, f'clean_{n}.jsonl')
+                start = time.perf_counter()
+                count = run(raw, out)
+                elapsed = time.perf_counter() - start
+                digest = _digest(out)
+                if reference is None:
+                    reference, base = digest, elapsed
+                same = digest == reference
+                mismatches += not same
+                print(f"  {name:<12} {elapsed:>8.2f} {count / elapsed:>12,.0f} "
+                      f"{base / elapsed:>8.2f}x{'' if same else '  OUTPUT DIFFERS'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
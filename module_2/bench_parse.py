@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Per-page parse latency: parse_result on each backend vs. the original regex scan.
+
+    python bench_parse.py [--repeat 200] [fixtures/result ...]
+
+Every implementation runs over every saved detail page; the script exits
+non-zero if the raw parse_result dict (what scrape.py writes) or the cleaned
+record differs by a single byte from the original on any page.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from main import clean_record
+from parsers import BACKENDS, parse_result
+
+FIXTURE_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'fixtures', 'result', '*.html')
+
+
+def legacy_parse_result(html: str, url: str) -> dict:
+    """parse_result as it was before the selectable backends (reference)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    text = soup.get_text('\n')
+
+    entry = {'url': url}
+
+    # Program & Institution
+    title = soup.find('title').get_text(strip=True)
+    if ' - ' in title:
+        prog, inst = title.split(' - ', 1)
+        entry['program'] = f"{prog}, {inst}  "
+    else:
+        entry['program'] = title
+
+    # Degree Type
+    if m := re.search(r'Degree Type\s*([\w\s]+)', text):
+        entry['Degree'] = m.group(1).strip()
+
+    # Country of Origin
+    if m := re.search(r"Degree's Country of Origin\s*(\w+)", text):
+        entry['US/International'] = m.group(1)
+
+    # Decision (just the word) & date_added
+    if m_dec := re.search(r'Decision\s*(Accepted|Rejected|Interview|Wait listed)', text):
+        entry['status'] = m_dec.group(1)
+    else:
+        entry['status'] = ''
+
+    if m_not := re.search(r'Notification\s*on\s*(\d{2})/(\d{2})/(\d{4})', text):
+        d, mth, yr = m_not.groups()
+        dt = datetime.strptime(f"{d}/{mth}/{yr}", "%d/%m/%Y")
+        entry['date_added'] = f"Added on {dt.strftime('%B')} {dt.day}, {dt.year}"
+    else:
+        entry['date_added'] = ''
+
+    # Undergrad GPA
+    if m := re.search(r'Undergrad GPA\s*([\d\.]+)', text):
+        entry['GPA'] = f"GPA {m.group(1)}"
+
+    # GRE scores
+    if m := re.search(r'GRE General:\s*(\d+)', text):
+        entry['GRE'] = f"GRE {m.group(1)}"
+    if m := re.search(r'GRE Verbal:\s*(\d+)', text):
+        entry['GRE V'] = f"GRE V {m.group(1)}"
+    if m := re.search(r'Analytical Writing:\s*([\d\.]+)', text):
+        entry['GRE AW'] = f"GRE AW {m.group(1)}"
+
+    # Notes → comments (strict dt/dd, filter out UI dumps)
+    comments = ''
+    notes_dt = soup.find('dt', string=re.compile(r'^\s*Notes\s*$', re.I))
+    if notes_dt and (dd := notes_dt.find_next_sibling('dd')):
+        raw = dd.get_text(separator=' ', strip=True)
+        if not raw.lower().startswith('timeline'):
+            comments = raw
+    entry['comments'] = comments
+
+    return entry
+
+
+def written_form(rec: dict) -> str:
+    """The raw record and what cleaning keeps of it, serialized."""
+    return json.dumps({'raw': rec, 'clean': clean_record(rec)}, ensure_ascii=False,
+                      sort_keys=True)
+
+
+def time_per_page(fn, pages, repeat: int) -> list:
+    """Median seconds per call for each page."""
+    medians = []
+    for url, html in pages:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(html, url)
+            samples.append(time.perf_counter() - start)
+        medians.append(statistics.median(samples))
+    return medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', help='HTML files (default: fixtures/result/*.html)')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(FIXTURE_GLOB))
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            rid = os.path.splitext(os.path.basename(path))[0]
+            pages.append((f'https://www.thegradcafe.com/result/{rid}', f.read()))
+
+    mismatches = 0
+    for backend in BACKENDS:
+        for url, html in pages:
+            old = written_form(legacy_parse_result(html, url))
+            new = written_form(parse_result(html, url, backend))
+            if old != new:
+                mismatches += 1
+                print(f"✗ {backend} {url}\n  old: {old}\n  new: {new}")
+
+    old_t = statistics.mean(time_per_page(legacy_parse_result, pages, args.repeat))
+    print(f"{len(pages)} pages, {args.repeat} runs each (mean of per-page medians)")
+    print(f"  {'regex scan':<12}: {old_t * 1e6:8.1f} µs/page")
+    for backend in BACKENDS:
+        new_t = statistics.mean(time_per_page(
+            lambda html, url, b=backend: parse_result(html, url, b), pages, args.repeat))
+        print(f"  {backend:<12}: {new_t * 1e6:8.1f} µs/page  {old_t / new_t:5.2f}x")
+    print(f"  output      : {'identical' if not mismatches else f'{mismatches} page(s) differ'}")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Parse-only benchmark of the parser backends over the saved fixture pages.
+
+    python bench_parsers.py [--rounds 200] [--backends html.parser lxml stream]
+
+Every backend runs in a freshly spawned process, so the peak RSS it reports
+is its own. Throughput counts listing and detail pages together; field
+diffs are reported against the html.parser output.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from parsers import BACKENDS, parse_result, parse_survey_page
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SITE        = 'https://www.thegradcafe.com'
+
+
+def load_fixtures():
+    """([(listing_url, html)], [(result_url, html)]) from fixtures/."""
+    def read(kind, url_fmt):
+        pages = []
+        for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, kind, '*.html'))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append((url_fmt.format(name), f.read()))
+        return pages
+    return read('survey', SITE + '/survey/?page={}'), read('result', SITE + '/result/{}')
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _run_backend(backend: str, rounds: int):
+    listings, details = load_fixtures()
+    baseline = _peak_rss_mb()
+    outputs = ([parse_survey_page(html, url, backend) for url, html in listings],
+               [parse_result(html, url, backend) for url, html in details])
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, html in listings:
+            parse_survey_page(html, url, backend)
+        for url, html in details:
+            parse_result(html, url, backend)
+    elapsed = time.perf_counter() - start
+    pages = rounds * (len(listings) + len(details))
+    return pages / elapsed, baseline, _peak_rss_mb(), outputs
+
+
+def field_diffs(reference, outputs) -> list:
+    """Human-readable differences between two backends' outputs."""
+    diffs = []
+    ref_listings, ref_details = reference
+    listings, details = outputs
+    for i, (want, got) in enumerate(zip(ref_listings, listings), 1):
+        if want != got:
+            diffs.append(f"survey page {i}: {want!r} vs {got!r}")
+    for want, got in zip(ref_details, details):
+        for field in sorted(set(want) | set(got)):
+            if want.get(field) != got.get(field):
+                diffs.append(f"{want['url']} [{field}]: {want.get(field)!r} vs {got.get(field)!r}")
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=200,
+                        help='passes over the whole fixture set per backend')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+
+    listings, details = load_fixtures()
+    print(f"{len(listings)} listing + {len(details)} detail pages, {args.rounds} rounds\n")
+    print(f"{'backend':<12} {'pages/sec':>10} {'peak RSS':>10} {'parse RSS':>10} {'diffs':>6}")
+
+    ctx = multiprocessing.get_context('spawn')
+    reference = None
+    report = []
+    for backend in args.backends:
+        with ctx.Pool(1) as pool:
+            try:
+                rate, baseline, peak, outputs = pool.apply(_run_backend, (backend, args.rounds))
+            except Exception as e:     # e.g. lxml not installed
+                print(f"{backend:<12} unavailable: {e}")
+                continue
+        if reference is None and backend == 'html.parser':
+            reference = outputs
+        diffs = field_diffs(reference, outputs) if reference else []
+        report.append((backend, diffs))
+        print(f"{backend:<12} {rate:>10.0f} {peak:>8.1f}MB {peak - baseline:>8.1f}MB {len(diffs):>6}")
+
+    for backend, diffs in report:
+        for line in diffs[:10]:
+            print(f"  {backend}: {line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,46 @@
 #!/usr/bin/env python3
+"""Clean scraped GradCafe records: python clean.py [input] [output] [--workers N]
+
+Two engines produce byte-identical output:
+
+    record     clean_record() one record at a time (iter_clean)
+    columnar   clean_columns() over chunks of CHUNK_SIZE records; low-cardinality
+               columns (Degree, status, term, ...) are cleaned once per distinct
+               value, and chunks can be spread over a process pool
+
+bench_clean.py times both, serial and parallel.
+"""
+import argparse
 import json
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from records import RecordWriter, iter_records, open_text, write_records
+
+INPUT_FILE  = 'applicant_data.jsonl'
+OUTPUT_FILE = 'cleaned_applicant_data.jsonl'
+CHUNK_SIZE  = 5000
+
+FIELDS = ('program', 'comments', 'date_added', 'url', 'status', 'term',
+          'US/International', 'Degree')
 
-INPUT_FILE  = 'applicant_data.json'
-OUTPUT_FILE = 'cleaned_applicant_data.json'
+_DEGREE_WORD_RE = re.compile(r'\bDegree\b')
+
+def _collapse(raw: str) -> str:
+    # same as re.sub(r'\s+', ' ', raw).strip(): str.split() and \s agree on
+    # what counts as whitespace, and split/join avoids the regex engine
+    return ' '.join(raw.split())
 
 def clean_degree(raw_deg: str) -> str:
     # collapse all whitespace into single spaces, remove “Degree”
-    deg = re.sub(r'\s+', ' ', raw_deg).strip()
-    deg = re.sub(r'\bDegree\b', '', deg).strip()
-    return deg
+    return _DEGREE_WORD_RE.sub('', _collapse(raw_deg)).strip()
 
 def clean_comments(raw: str) -> str:
     # collapse whitespace into single spaces
-    txt = re.sub(r'\s+', ' ', raw).strip()
+    txt = _collapse(raw)
     # drop any full-page UI dumps
     if txt.lower().startswith("timeline"):
         return ""
@@ -35,25 +62,136 @@ def clean_record(rec: dict) -> dict:
         'Degree':            clean_degree(rec.get('Degree', ''))
     }
 
-def main():
-    # load raw scraped data
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        raw = json.load(f)
+def iter_clean(records):
+    """Clean a stream of raw records lazily, dropping repeated or missing URLs.
 
-    cleaned = []
+    Only the URLs seen so far are kept in memory, never the records.
+    """
     seen_urls = set()
-    for rec in raw:
+    for rec in records:
         url = rec.get('url', '').strip()
         if not url or url in seen_urls:
             continue
         seen_urls.add(url)
-        cleaned.append(clean_record(rec))
+        yield clean_record(rec)
+
+# ————— Columnar Engine —————
+# json.dumps(rec, ensure_ascii=False) for a cleaned record, laid out field by field
+_ROW_TEMPLATE = '{' + ', '.join(f'{json.dumps(f)}: %s' for f in FIELDS) + '}'
+_encode_str = json.encoder.encode_basestring   # what ensure_ascii=False uses
+_LOW_CARDINALITY = {2, 4, 5, 6, 7}             # date_added, status, term, origin, Degree
+
+def _by_distinct(fn, column: list) -> list:
+    """fn applied to every value, computed once per distinct value."""
+    table = {value: fn(value) for value in set(column)}
+    return [table[value] for value in column]
+
+def _strip(value: str) -> str:
+    return value.strip()
+
+def _status(value: str) -> str:
+    return clean_status(value.strip())
+
+def _clean_column_lists(records: list) -> list:
+    """The cleaned FIELDS of `records`, one list per field."""
+    def column(key):
+        return [rec.get(key, '') for rec in records]
+
+    return [
+        [value.strip() for value in column('program')],
+        [clean_comments(value) for value in column('comments')],
+        _by_distinct(_strip, column('date_added')),
+        [value.strip() for value in column('url')],
+        _by_distinct(_status, column('status')),
+        _by_distinct(_strip, column('term')),
+        _by_distinct(_strip, column('US/International')),
+        _by_distinct(clean_degree, column('Degree')),
+    ]
+
+def clean_columns(records: list) -> list:
+    """Columnar twin of [clean_record(r) for r in records]."""
+    return [dict(zip(FIELDS, row)) for row in zip(*_clean_column_lists(records))]
+
+def _encode_rows(records: list) -> list:
+    """(url, JSON text) per cleaned record, byte-identical to json.dumps().
+
+    Strings are JSON-encoded column by column, low-cardinality columns once
+    per distinct value, and spliced into a row template; no per-record dict
+    is built and json.dumps never runs.
+    """
+    columns = _clean_column_lists(records)
+    urls = columns[3]
+    encoded = [
+        _by_distinct(_encode_str, col) if i in _LOW_CARDINALITY else list(map(_encode_str, col))
+        for i, col in enumerate(columns)
+    ]
+    return list(zip(urls, (_ROW_TEMPLATE % row for row in zip(*encoded))))
+
+def _clean_lines(lines: list) -> list:
+    """Pool task: raw JSON lines in, (url, cleaned JSON text) pairs out."""
+    return _encode_rows([json.loads(line) for line in lines])
+
+def _raw_lines(path: str):
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+def _chunks(iterable, size: int):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def _ordered_map(fn, chunks, workers: int):
+    """fn over chunks, results in input order, at most 2×workers chunks in flight."""
+    if workers <= 1:
+        yield from map(fn, chunks)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def clean_file(input_path: str, output_path: str, workers: int = 1,
+               chunk_size: int = CHUNK_SIZE, columnar: bool = True) -> int:
+    """Clean input_path into output_path; returns the number of records written."""
+    if not columnar:
+        return write_records(output_path, iter_clean(iter_records(input_path)))
+
+    if input_path.removesuffix('.gz').endswith('.json'):
+        task, source = _encode_rows, iter_records(input_path)
+    else:
+        task, source = _clean_lines, _raw_lines(input_path)
+
+    seen_urls = set()
+    with RecordWriter(output_path) as out:
+        for results in _ordered_map(task, _chunks(source, chunk_size), workers):
+            for url, text in results:
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    out.write_json(text)
+    return out.count
 
-    # write out only the 8 clean fields per record
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cleaned, f, ensure_ascii=False, indent=4)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Clean scraped GradCafe records.')
+    parser.add_argument('input', nargs='?', default=INPUT_FILE,
+                        help='.jsonl(.gz) stream or legacy .json array')
+    parser.add_argument('output', nargs='?', default=OUTPUT_FILE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='cleaning processes; 1 cleans in this process')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--record-wise', action='store_true',
+                        help='use the one-record-at-a-time engine')
+    args = parser.parse_args(argv)
 
-    print(f"Cleaned {len(cleaned)} records → {OUTPUT_FILE}")
+    # write out only the 8 clean fields per record, in input order
+    count = clean_file(args.input, args.output, args.workers, args.chunk_size,
+                       columnar=not args.record_wise)
+    print(f"Cleaned {count} records → {args.output}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Local stand-in for thegradcafe.com that serves the saved pages in fixtures/.
+
+    python fixture_server.py --port 8765
+    python main.py --base-url http://127.0.0.1:8765 --target 8
+
+With --throttle-rate 0.3 about a third of requests get a 429 (with a
+Retry-After), which is handy for exercising the scraper's back-off.
+"""
+import argparse
+import os
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+EMPTY_SURVEY = (
+    '<!DOCTYPE html><html><head><title>GradCafe Admissions Results</title></head>'
+    '<body><main><table><tbody></tbody></table></main></body></html>'
+)
+
+SURVEY_RE = re.compile(r'^/survey/?\?page=(\d+)$')
+RESULT_RE = re.compile(r'^/result/(\d+)$')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Map /survey/?page=N and /result/ID onto fixtures/survey/N.html and fixtures/result/ID.html."""
+
+    fixture_dir   = FIXTURE_DIR
+    throttle_rate = 0.0   # fraction of requests answered with 429
+    retry_after   = 1
+
+    def do_GET(self):
+        if random.random() < self.throttle_rate:
+            return self._send(429, b'Too Many Requests',
+                              {'Retry-After': str(self.retry_after)})
+        if m := SURVEY_RE.match(self.path):
+            path = os.path.join(self.fixture_dir, 'survey', f'{m.group(1)}.html')
+            # past the last saved listing GradCafe just shows an empty table
+            body = self._read(path) or EMPTY_SURVEY.encode('utf-8')
+            return self._send(200, body)
+        if m := RESULT_RE.match(self.path):
+            body = self._read(os.path.join(self.fixture_dir, 'result', f'{m.group(1)}.html'))
+            if body is not None:
+                return self._send(200, body)
+        return self._send(404, b'Not Found')
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _send(self, code, body, headers=None):
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve_fixtures(port: int = 0, host: str = '127.0.0.1'):
+    """Start the stand-in on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of requests to answer with 429')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with those 429s')
+    args = parser.parse_args()
+    FixtureHandler.throttle_rate = args.throttle_rate
+    FixtureHandler.retry_after = args.retry_after
+    server = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+    print(f"Serving {FIXTURE_DIR} at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
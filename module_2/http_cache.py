@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""On-disk HTTP response cache that plugs in underneath a requests.Session.
+
+    from http_cache import install_cache
+    install_cache(session, '.http_cache')
+
+Responses are stored gzip-compressed under the SHA-256 of their URL, the
+directory is kept under a size budget by evicting the least recently used
+entries, and stale entries are revalidated with If-None-Match /
+If-Modified-Since so an unchanged page costs a 304 instead of a download.
+How long an entry stays fresh is decided per URL pattern (see DEFAULT_TTLS).
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CACHE_DIR       = '.http_cache'
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# (URL pattern, seconds fresh); None means never expires
+DEFAULT_TTLS = [
+    (r'/result/\d+', None),        # a posted result practically never changes
+    (r'/survey/\?page=', 15 * 60), # listings move as new results come in
+]
+DEFAULT_TTL = 60 * 60
+
+# hop-by-hop or no longer true once the body is decoded and stored
+_DROP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class DiskCache:
+    """Content-addressed, gzip-compressed, size-bounded LRU store of responses."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith('.gz'):
+                    path = os.path.join(root, name)
+                    self._sizes[path] = os.path.getsize(path)
+        self._total = sum(self._sizes.values())
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + '.gz')
+
+    def get(self, url: str):
+        """Return (meta, body) for a cached URL, or None."""
+        path = self._path(url)
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        # bump mtime: it is the recency stamp eviction goes by
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return meta, body
+
+    def put(self, url: str, meta: dict, body: bytes):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps(dict(meta, url=url)).encode('utf-8') + b'\n' + body
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += os.path.getsize(path) - self._sizes.get(path, 0)
+            self._sizes[path] = os.path.getsize(path)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        # trim to 90% so we are not evicting again on the very next put
+        while by_age and self._total > self.max_bytes * 0.9:
+            path = by_age.pop(0)
+            self._total -= self._sizes.pop(path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers GETs from a DiskCache when it can."""
+
+    def __init__(self, cache: DiskCache, ttls=DEFAULT_TTLS, default_ttl=DEFAULT_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, url: str):
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        url = request.url
+        cached = self.cache.get(url)
+        if cached:
+            meta, body = cached
+            ttl = self.ttl_for(url)
+            if ttl is None or time.time() - meta['stored_at'] < ttl:
+                return self._build(request, meta, body)
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+
+        resp = super().send(request, **kwargs)
+
+        if resp.status_code == 304 and cached:
+            meta['stored_at'] = time.time()
+            self.cache.put(url, meta, body)
+            resp.close()
+            return self._build(request, meta, body)
+        if resp.status_code == 200:
+            meta = {
+                'status':        200,
+                'headers':       {k: v for k, v in resp.headers.items()
+                                  if k.lower() not in _DROP_HEADERS},
+                'etag':          resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                'stored_at':     time.time(),
+            }
+            self.cache.put(url, meta, resp.content)
+        return resp
+
+    def _build(self, request, meta: dict, body: bytes) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = meta['status']
+        resp.reason = 'OK'
+        resp.headers = CaseInsensitiveDict(meta['headers'])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp._content = body
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.from_cache = True
+        return resp
+
+
+def install_cache(session: requests.Session, directory: str = CACHE_DIR,
+                  max_bytes: int = MAX_CACHE_BYTES, ttls=DEFAULT_TTLS,
+                  default_ttl=DEFAULT_TTL, **adapter_kwargs) -> CachingAdapter:
+    """Mount a CachingAdapter for http:// and https:// on `session`."""
+    adapter = CachingAdapter(DiskCache(directory, max_bytes), ttls, default_ttl,
+                             **adapter_kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return adapter
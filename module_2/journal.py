@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Durable crawl journal so a long scrape can be resumed after a crash.
+
+The journal is an append-only JSON-lines file with two kinds of entries:
+
+    {"rec": {...scraped record...}}
+    {"page": 17}                      # survey page 17 fully processed
+
+Every entry is written with a single os.write() on an O_APPEND descriptor,
+so a crash can at worst leave one torn line at the end; replay drops it.
+Page markers are fsync'ed, which makes them the durable checkpoints.
+"""
+import json
+import os
+import re
+import threading
+
+JOURNAL_FILE = 'crawl_journal.jsonl'
+
+_RESULT_ID_RE = re.compile(r'/result/(\d+)')
+
+
+def result_id(url: str):
+    """GradCafe result ID from a detail URL, or None."""
+    m = _RESULT_ID_RE.search(url)
+    return int(m.group(1)) if m else None
+
+
+class CrawlJournal:
+    def __init__(self, path: str = JOURNAL_FILE, resume: bool = False, on_record=None):
+        self.path            = path
+        self.on_record       = on_record   # called with each record added (not replayed)
+        self.records         = []
+        self.seen_ids        = set()
+        self.completed_pages = set()
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._replay()
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        if not resume:
+            flags |= os.O_TRUNC
+        self._fd = os.open(path, flags, 0o644)
+
+    def _replay(self):
+        good_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                good_bytes += len(line)
+                if 'rec' in entry:
+                    rec = entry['rec']
+                    self.records.append(rec)
+                    self.seen_ids.add(result_id(rec['url']))
+                elif 'page' in entry:
+                    self.completed_pages.add(entry['page'])
+        # cut off a torn tail so new appends start on a clean line
+        if good_bytes != os.path.getsize(self.path):
+            os.truncate(self.path, good_bytes)
+
+    @property
+    def next_page(self) -> int:
+        """First survey page not yet known to be complete."""
+        page = 1
+        while page in self.completed_pages:
+            page += 1
+        return page
+
+    def _append(self, entry: dict, sync: bool = False):
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            os.write(self._fd, line)
+            if sync:
+                os.fsync(self._fd)
+
+    def add_record(self, rec: dict):
+        self._append({'rec': rec})
+        self.records.append(rec)
+        self.seen_ids.add(result_id(rec['url']))
+        if self.on_record is not None:
+            self.on_record(rec)
+
+    def page_done(self, page_number: int):
+        self._append({'page': page_number}, sync=True)
+        self.completed_pages.add(page_number)
+
+    def close(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
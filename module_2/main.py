@@ -1,96 +1,52 @@
 #!/usr/bin/env python3
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import re
-import json
-import time
-from datetime import datetime
-from urllib.parse import urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from archive import HtmlArchive
+from http_cache import install_cache
+from journal import JOURNAL_FILE, CrawlJournal, result_id
+from parsers import BACKENDS, parse_result, parse_survey_page, set_backend
+from rate_limit import RetryQueue, Throttle
+from records import RecordWriter, iter_records
+
 BASE_URL    = 'https://www.thegradcafe.com'
 TARGET      = 10000      # adjust down for testing
 MAX_WORKERS = 10
+OUTPUT_FILE = 'applicant_data.jsonl'
+FAILED_FILE = 'failed_urls.json'
+RATE        = 10.0       # requests/sec shared by listing and detail fetches
 
 # ————— Scraping Setup —————
 session = requests.Session()
 session.headers.update({'User-Agent': 'Mozilla/5.0'})
 
-def scrape_result(url: str) -> dict:
-    """Scrape one detail page (no term)."""
-    resp = session.get(url, timeout=10)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    text = soup.get_text('\n')
-
-    entry = {'url': url}
-
-    # Program & Institution
-    title = soup.find('title').get_text(strip=True)
-    if ' - ' in title:
-        prog, inst = title.split(' - ', 1)
-        entry['program'] = f"{prog}, {inst}  "
-    else:
-        entry['program'] = title
-
-    # Degree Type
-    if m := re.search(r'Degree Type\s*([\w\s]+)', text):
-        entry['Degree'] = m.group(1).strip()
-
-    # Country of Origin
-    if m := re.search(r"Degree's Country of Origin\s*(\w+)", text):
-        entry['US/International'] = m.group(1)
-
-    # Decision (just the word) & date_added
-    if m_dec := re.search(r'Decision\s*(Accepted|Rejected|Interview|Wait listed)', text):
-        entry['status'] = m_dec.group(1)
-    else:
-        entry['status'] = ''
-
-    if m_not := re.search(r'Notification\s*on\s*(\d{2})/(\d{2})/(\d{4})', text):
-        d, mth, yr = m_not.groups()
-        dt = datetime.strptime(f"{d}/{mth}/{yr}", "%d/%m/%Y")
-        entry['date_added'] = f"Added on {dt.strftime('%B')} {dt.day}, {dt.year}"
-    else:
-        entry['date_added'] = ''
-
-    # Undergrad GPA
-    if m := re.search(r'Undergrad GPA\s*([\d\.]+)', text):
-        entry['GPA'] = f"GPA {m.group(1)}"
-
-    # GRE scores
-    if m := re.search(r'GRE General:\s*(\d+)', text):
-        entry['GRE'] = f"GRE {m.group(1)}"
-    if m := re.search(r'GRE Verbal:\s*(\d+)', text):
-        entry['GRE V'] = f"GRE V {m.group(1)}"
-    if m := re.search(r'Analytical Writing:\s*([\d\.]+)', text):
-        entry['GRE AW'] = f"GRE AW {m.group(1)}"
-
-    # Notes → comments (strict dt/dd, filter out UI dumps)
-    comments = ''
-    notes_dt = soup.find('dt', string=re.compile(r'^\s*Notes\s*$', re.I))
-    if notes_dt and (dd := notes_dt.find_next_sibling('dd')):
-        raw = dd.get_text(separator=' ', strip=True)
-        if not raw.lower().startswith('timeline'):
-            comments = raw
-    entry['comments'] = comments
-
-    return entry
-
-def scrape_survey_page(page_url: str) -> list:
-    """Scrape one survey listing page: returns list of dicts with 'term' set."""
-    resp = session.get(page_url, timeout=10)
+# raw pages are also appended here when --archive is given
+archive = None
+_archived_urls = set()
+
+# every fetch is paced, backed off and retried here; see rate_limit.py
+throttle    = Throttle(RATE, max_concurrency=MAX_WORKERS)
+retry_queue = RetryQueue()
+
+def fetch_html(url: str) -> str:
+    """GET one page through the shared session and return its body."""
+    resp = throttle.request(lambda: session.get(url, timeout=10))
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    if archive is not None:
+        # a cache hit for a URL we already archived is the same bytes again
+        if not (getattr(resp, 'from_cache', False) and url in _archived_urls):
+            archive.append(url, resp.text)
+            _archived_urls.add(url)
+    return resp.text
 
-    # collect (url, term) for each entry
-    meta = []
-    for a in soup.find_all('a', href=re.compile(r'^/result/\d+')):
-        detail_url = urljoin(BASE_URL, a['href'])
-        term_tag = a.find_next(string=re.compile(r'^(Fall|Spring) \d{4}$'))
-        term = term_tag.strip() if term_tag else ''
-        meta.append((detail_url, term))
+def scrape_result(url: str) -> dict:
+    """Scrape one detail page (no term)."""
+    return parse_result(fetch_html(url), url)
 
+def scrape_details(meta: list) -> list:
+    """Fetch the (detail_url, term) pairs from one listing in parallel."""
     results = []
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
         future_to_meta = {
@@ -105,6 +61,7 @@ def scrape_survey_page(page_url: str) -> list:
                 results.append(rec)
             except Exception as e:
                 print(f"❌ {url}: {e}")
+                retry_queue.push(url, term, e)
     return results
 
 # ————— Cleaning Helpers —————
@@ -129,34 +86,166 @@ def clean_record(rec: dict) -> dict:
         'Degree':            clean_degree(rec.get('Degree', ''))
     }
 
-# ————— Main Orchestration —————
-def main():
-    all_records = []
-    seen_urls   = set()
-    page_number = 1
+# ————— Incremental Mode —————
+def load_known_ids_json(path: str) -> set:
+    """Result IDs already present in a previous output file (.jsonl or .json)."""
+    try:
+        return {rid for r in iter_records(path) if (rid := result_id(r.get('url', ''))) is not None}
+    except FileNotFoundError:
+        return set()
+
+def load_known_ids_db(dsn: str) -> set:
+    """Result IDs already loaded into the application_data table."""
+    import psycopg2  # only needed for this option
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT url FROM application_data WHERE url LIKE %s", ('%/result/%',))
+        return {rid for (url,) in cur if (rid := result_id(url)) is not None}
 
-    while len(all_records) < TARGET:
-        survey_url = f'{BASE_URL}/survey/?page={page_number}'
+# ————— Main Orchestration —————
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape GradCafe survey results.')
+    parser.add_argument('--target', type=int, default=TARGET,
+                        help='number of records to collect')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help='site root (point at fixture_server.py for offline runs)')
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help='record file; .jsonl streams one record per line, .gz compresses')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='use the pipelined asyncio crawler')
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='async mode: max requests in flight overall')
+    parser.add_argument('--per-host', type=int, default=MAX_WORKERS,
+                        help='async mode: max requests in flight per host')
+    parser.add_argument('--journal', default=JOURNAL_FILE,
+                        help='crawl journal used for checkpoints and --resume')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue from the journal instead of starting over')
+    parser.add_argument('--parser', choices=BACKENDS, default='stream',
+                        help='HTML backend for extraction (see bench_parsers.py)')
+    parser.add_argument('--rate', type=float, default=RATE,
+                        help='max requests/sec; 429/5xx responses slow it further')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='keep an on-disk HTTP cache here (result pages never expire)')
+    parser.add_argument('--archive', metavar='PATH',
+                        help='append every fetched page to this raw archive (see reparse.py)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only fetch results not already in the output file')
+    parser.add_argument('--known-db', metavar='DSN',
+                        help='incremental mode: also skip IDs already in application_data')
+    parser.add_argument('--stale-pages', type=int, default=3,
+                        help='incremental mode: stop after this many pages with no new IDs')
+    return parser.parse_args(argv)
+
+def crawl_sequential(target: int, base_url: str, journal: CrawlJournal,
+                     known_ids=frozenset(), stale_pages=None) -> list:
+    all_records = journal.records
+    seen_ids    = journal.seen_ids
+    page_number = journal.next_page
+    stale       = 0
+
+    while len(all_records) < target:
+        survey_url = f'{base_url}/survey/?page={page_number}'
         print(f"Scraping survey page {page_number}…")
-        page_recs = scrape_survey_page(survey_url)
-        if not page_recs:
+        try:
+            html = fetch_html(survey_url)
+        except Exception as e:
+            # records so far are journaled; --resume picks up at this page
+            print(f"❌ {survey_url}: {e}, stopping")
+            break
+        meta = parse_survey_page(html, survey_url)
+        if not meta:
             break
-        for rec in page_recs:
-            if rec['url'] not in seen_urls:
-                seen_urls.add(rec['url'])
-                all_records.append(rec)
-                if len(all_records) >= TARGET:
+        todo = [(url, term) for url, term in meta
+                if result_id(url) not in seen_ids and result_id(url) not in known_ids]
+        stale = 0 if todo else stale + 1
+        for rec in scrape_details(todo):
+            if result_id(rec['url']) not in seen_ids:
+                journal.add_record(rec)
+                if len(all_records) >= target:
                     break
-        print(f" → Collected {len(all_records)}/{TARGET}")
+        # a page only counts as done once every result on it is stored
+        if all(result_id(url) in seen_ids or result_id(url) in known_ids for url, _ in meta):
+            journal.page_done(page_number)
+        print(f" → Collected {len(all_records)}/{target}")
+        if stale_pages and stale >= stale_pages:
+            print(f"No new results on the last {stale} pages, stopping.")
+            break
         page_number += 1
-        time.sleep(0.2)
-
-    # Clean in-memory and write only once
-    cleaned = [clean_record(r) for r in all_records[:TARGET]]
-    with open('applicant_data.json', 'w', encoding='utf-8') as f:
-        json.dump(cleaned, f, ensure_ascii=False, indent=4)
+    return all_records
+
+def retry_failed(journal: CrawlJournal, target: int):
+    """One more pass over detail fetches that ran out of attempts; whatever
+    still fails is written to FAILED_FILE instead of being dropped."""
+    failed = retry_queue.drain()
+    if failed:
+        print(f"Retrying {len(failed)} failed detail pages…")
+        for rec in scrape_details([(url, term) for url, term, _ in failed
+                                   if result_id(url) not in journal.seen_ids]):
+            if len(journal.records) < target and result_id(rec['url']) not in journal.seen_ids:
+                journal.add_record(rec)
+    leftovers = retry_queue.drain()
+    if leftovers:
+        retry_queue.save(FAILED_FILE, leftovers)
+        print(f"❌ {len(leftovers)} pages still failing, listed in {FAILED_FILE}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    base_url = args.base_url.rstrip('/')
+    set_backend(args.parser)
+    global throttle
+    throttle = Throttle(args.rate, max_concurrency=args.concurrency if args.use_async else MAX_WORKERS)
+    if args.cache_dir:
+        install_cache(session, args.cache_dir)
+    global archive
+    if args.archive:
+        archive = HtmlArchive(args.archive)
+        _archived_urls.update(archive.urls())
+    known_ids, stale_pages = frozenset(), None
+    if args.incremental:
+        known_ids = load_known_ids_json(args.output)
+        if args.known_db:
+            known_ids |= load_known_ids_db(args.known_db)
+        stale_pages = args.stale_pages
+        print(f"Incremental: {len(known_ids)} result IDs already known")
+
+    # cleaned records are streamed to the output as the journal takes them
+    with RecordWriter(args.output, line_buffered=True) as out:
+        def on_record(rec):
+            out.write(clean_record(rec))
+
+        with CrawlJournal(args.journal, resume=args.resume, on_record=on_record) as journal:
+            if journal.records:
+                print(f"Resuming: {len(journal.records)} records journaled, "
+                      f"starting at survey page {journal.next_page}")
+                for rec in journal.records[:args.target]:
+                    on_record(rec)
+            if args.use_async:
+                import asyncio
+                from async_crawl import crawl
+                asyncio.run(crawl(args.target, base_url,
+                                  concurrency=args.concurrency,
+                                  per_host=args.per_host,
+                                  journal=journal,
+                                  known_ids=known_ids,
+                                  stale_pages=stale_pages))
+            else:
+                crawl_sequential(args.target, base_url, journal, known_ids, stale_pages)
+            retry_failed(journal, args.target)
+        if archive is not None:
+            archive.close()
+        if args.incremental:
+            # newest results first, followed by everything from earlier runs
+            print(f"Found {out.count} new records")
+            try:
+                for rec in iter_records(args.output):
+                    out.write(rec)
+            except FileNotFoundError:
+                pass
 
-    print(f"\nDone! Wrote {len(cleaned)} records to applicant_data.json")
+    print(f"\nDone! Wrote {out.count} records to {args.output}")
 
 if __name__ == '__main__':
-    main()
+    # run through the importable module so async_crawl, which does
+    # `from main import fetch_html`, sees the same session/archive/throttle
+    import main as _main
+    _main.main()
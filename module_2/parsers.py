@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Listing and detail-page extraction with a selectable HTML backend.
+
+    stream       stdlib HTMLParser callbacks only; no tree is ever built (the default)
+    html.parser  BeautifulSoup on the stdlib parser
+    lxml         BeautifulSoup on lxml's C parser
+
+All three feed the same field logic, so they differ only in speed and in
+how forgiving they are of broken markup. bench_parsers.py compares them.
+"""
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+BACKENDS = ('html.parser', 'lxml', 'stream')
+BACKEND  = 'stream'
+
+def set_backend(name: str):
+    """Select the backend used when parse_* is called without one."""
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"unknown parser backend {name!r}; choose from {', '.join(BACKENDS)}")
+    BACKEND = name
+
+# ————— Field Patterns —————
+# compiled once; each runs over the page text, newline-joined as get_text('\n') gives it
+_DEGREE_RE   = re.compile(r'Degree Type\s*([\w\s]+)')
+_ORIGIN_RE   = re.compile(r"Degree's Country of Origin\s*(\w+)")
+_DECISION_RE = re.compile(r'Decision\s*(Accepted|Rejected|Interview|Wait listed)')
+_NOTIFIED_RE = re.compile(r'Notification\s*on\s*(\d{2})/(\d{2})/(\d{4})')
+_GPA_RE      = re.compile(r'Undergrad GPA\s*([\d\.]+)')
+_GRE_RE      = re.compile(r'GRE General:\s*(\d+)')
+_GRE_V_RE    = re.compile(r'GRE Verbal:\s*(\d+)')
+_GRE_AW_RE   = re.compile(r'Analytical Writing:\s*([\d\.]+)')
+_NOTES_RE    = re.compile(r'^\s*Notes\s*$', re.I)
+
+_RESULT_HREF_RE = re.compile(r'^/result/\d+')
+_TERM_RE        = re.compile(r'^(Fall|Spring) \d{4}$')
+
+# ————— Tree Backends (BeautifulSoup) —————
+def _scan_detail_page(soup):
+    """(title, page text, Notes <dd> text or None) from a parsed page."""
+    title_tag = soup.find('title')
+    title = title_tag.get_text(strip=True) if title_tag else ''
+    notes = None
+    notes_dt = soup.find('dt', string=_NOTES_RE)
+    if notes_dt and (dd := notes_dt.find_next_sibling('dd')):
+        notes = dd.get_text(separator=' ', strip=True)
+    return title, soup.get_text('\n'), notes
+
+def _scan_listing(soup, page_url: str) -> list:
+    meta = []
+    for a in soup.find_all('a', href=_RESULT_HREF_RE):
+        detail_url = urljoin(page_url, a['href'])
+        term_tag = a.find_next(string=_TERM_RE)
+        term = term_tag.strip() if term_tag else ''
+        meta.append((detail_url, term))
+    return meta
+
+# ————— Streaming Backend —————
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+              'link', 'meta', 'param', 'source', 'track', 'wbr'}
+_SKIP_TEXT = {'script', 'style', 'template'}
+_KEEP_WHITESPACE = {'pre', 'textarea'}
+
+class _StreamScanner(HTMLParser):
+    """Keeps just the stack of open tag names; subclasses react to text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in _VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        # tolerate unclosed children the way a tree builder would
+        if tag in self.stack:
+            while self.stack.pop() != tag:
+                pass
+
+    def handle_data(self, data):
+        parent = self.stack[-1] if self.stack else ''
+        if parent not in _SKIP_TEXT:
+            self.text(data, parent)
+
+    def text(self, data, parent):
+        raise NotImplementedError
+
+class _DetailStream(_StreamScanner):
+    """Streaming twin of _scan_detail_page."""
+
+    def __init__(self):
+        super().__init__()
+        self.title, self.notes = '', None
+        self.parts = []             # text nodes, to be joined as get_text('\n') joins them
+        self._notes_scope = None    # depth of the Notes <dt>'s parent while we look for its <dd>
+        self._notes_depth = None    # depth of the Notes <dd> while we collect its text
+        self._notes_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'dd' and self._notes_scope == len(self.stack):
+            self._notes_scope = None
+            self._notes_depth = len(self.stack)
+        super().handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        super().handle_endtag(tag)
+        depth = len(self.stack)
+        if self._notes_scope is not None and depth < self._notes_scope:
+            self._notes_scope = None        # no <dd> sibling after the Notes <dt>
+        if self._notes_depth is not None and depth <= self._notes_depth:
+            self.notes = ' '.join(self._notes_parts)
+            self._notes_depth = None
+
+    def text(self, data, parent):
+        text = data.strip()
+        if text or _KEEP_WHITESPACE.intersection(self.stack):
+            self.parts.append(data)
+        else:
+            # a tree builder keeps a whitespace-only node as a single '\n' or ' '
+            self.parts.append('\n' if '\n' in data else ' ')
+            return
+        if self._notes_depth is not None:
+            self._notes_parts.append(text)
+        if parent == 'dt' and text.lower() == 'notes':
+            if self.notes is None and self._notes_depth is None:
+                self._notes_scope = len(self.stack) - 1
+        elif parent == 'title' and not self.title:
+            self.title = text
+
+class _ListingStream(_StreamScanner):
+    """Streaming twin of _scan_listing."""
+
+    def __init__(self, page_url: str):
+        super().__init__()
+        self.page_url = page_url
+        self.meta = []
+        self._awaiting_term = []    # indexes into meta still without a term
+
+    def handle_starttag(self, tag, attrs):
+        super().handle_starttag(tag, attrs)
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            if _RESULT_HREF_RE.search(href):
+                self._awaiting_term.append(len(self.meta))
+                self.meta.append((urljoin(self.page_url, href), ''))
+
+    def text(self, data, parent):
+        if self._awaiting_term and _TERM_RE.search(data):
+            term = data.strip()
+            for i in self._awaiting_term:
+                self.meta[i] = (self.meta[i][0], term)
+            self._awaiting_term = []
+
+# ————— Public API —————
+def _feed(scanner: _StreamScanner, html: str) -> _StreamScanner:
+    scanner.feed(html)
+    scanner.close()
+    return scanner
+
+def parse_result(html: str, url: str, backend: str = None) -> dict:
+    """Extract the detail-page fields from already-fetched HTML."""
+    backend = backend or BACKEND
+    if backend == 'stream':
+        s = _feed(_DetailStream(), html)
+        title, text, notes = s.title, '\n'.join(s.parts), s.notes
+    else:
+        title, text, notes = _scan_detail_page(BeautifulSoup(html, backend))
+
+    entry = {'url': url}
+
+    # Program & Institution
+    if ' - ' in title:
+        prog, inst = title.split(' - ', 1)
+        entry['program'] = f"{prog}, {inst}  "
+    else:
+        entry['program'] = title
+
+    # Degree Type
+    if m := _DEGREE_RE.search(text):
+        entry['Degree'] = m.group(1).strip()
+
+    # Country of Origin
+    if m := _ORIGIN_RE.search(text):
+        entry['US/International'] = m.group(1)
+
+    # Decision (just the word) & date_added
+    m_dec = _DECISION_RE.search(text)
+    entry['status'] = m_dec.group(1) if m_dec else ''
+
+    if m_not := _NOTIFIED_RE.search(text):
+        d, mth, yr = m_not.groups()
+        dt = datetime(int(yr), int(mth), int(d))
+        entry['date_added'] = f"Added on {dt.strftime('%B')} {dt.day}, {dt.year}"
+    else:
+        entry['date_added'] = ''
+
+    # Undergrad GPA
+    if m := _GPA_RE.search(text):
+        entry['GPA'] = f"GPA {m.group(1)}"
+
+    # GRE scores
+    if m := _GRE_RE.search(text):
+        entry['GRE'] = f"GRE {m.group(1)}"
+    if m := _GRE_V_RE.search(text):
+        entry['GRE V'] = f"GRE V {m.group(1)}"
+    if m := _GRE_AW_RE.search(text):
+        entry['GRE AW'] = f"GRE AW {m.group(1)}"
+
+    # Notes → comments (strict dt/dd, filter out UI dumps)
+    comments = ''
+    if notes and not notes.lower().startswith('timeline'):
+        comments = notes
+    entry['comments'] = comments
+
+    return entry
+
+def parse_survey_page(html: str, page_url: str, backend: str = None) -> list:
+    """Return the (detail_url, term) pairs listed on one survey page."""
+    backend = backend or BACKEND
+    if backend == 'stream':
+        return _feed(_ListingStream(page_url), html).meta
+    return _scan_listing(BeautifulSoup(html, backend), page_url)
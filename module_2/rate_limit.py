@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Pacing, back-off and retries shared by every request the scraper makes.
+
+    Throttle
+      ├─ TokenBucket          requests/sec ceiling, paused by Retry-After
+      ├─ AdaptiveConcurrency  AIMD limit on requests in flight
+      └─ RetryPolicy          exponential back-off with full jitter
+    RetryQueue                URLs that ran out of attempts, for a later pass
+
+A 429 or 5xx halves the concurrency limit and pauses the bucket for as
+long as the server's Retry-After asks; a run of fast successes grows the
+limit again by one slot per window. Everything is thread-safe, since the
+sequential crawler fetches from a ThreadPoolExecutor and the async one
+from run_in_executor.
+"""
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class Throttled(Exception):
+    """The server answered 429/5xx; `retry_after` is in seconds if it said."""
+
+    def __init__(self, status: int, retry_after=None):
+        super().__init__(f"HTTP {status}" + (f", retry after {retry_after:.0f}s" if retry_after else ''))
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds from now; it may be delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def refund(self):
+        """Give a token back (the request never reached the network)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on concurrent requests.
+
+    Each success under `latency_target` adds 1/limit (so about +1 per full
+    window); a throttle response halves the limit, at most once per
+    `cooldown` seconds so one burst of 429s counts as a single signal.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1,
+                 latency_target: float = 2.0, cooldown: float = 5.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            return
+        with self._cond:
+            before = int(self._limit)
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            if int(self._limit) > before:
+                self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._limit = max(self.minimum, self._limit / 2)
+                self._last_decrease = now
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential back-off for the given 0-based attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class Throttle:
+    def __init__(self, rate: float = 10.0, burst: int = None,
+                 initial_concurrency: int = 4, max_concurrency: int = 10,
+                 retry: RetryPolicy = None):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, max_concurrency)
+        self.retry = retry or RetryPolicy()
+
+    def request(self, send):
+        """Call send() → requests.Response under the limits, retrying
+        transient failures. Raises the last error once attempts run out."""
+        for attempt in range(self.retry.max_attempts):
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            start = time.monotonic()
+            try:
+                resp = send()
+                if resp.status_code in RETRYABLE_STATUS:
+                    raise Throttled(resp.status_code,
+                                    parse_retry_after(resp.headers.get('Retry-After')))
+            except Throttled as e:
+                self.concurrency.on_throttle()
+                wait = e.retry_after if e.retry_after is not None else self.retry.delay(attempt)
+                self.bucket.pause(wait)
+                error = e
+            except OSError as e:   # requests' connection/timeout errors subclass it
+                wait = self.retry.delay(attempt)
+                error = e
+            else:
+                if getattr(resp, 'from_cache', False):
+                    self.bucket.refund()
+                else:
+                    self.concurrency.on_success(time.monotonic() - start)
+                return resp
+            finally:
+                self.concurrency.release()
+            if attempt + 1 < self.retry.max_attempts:
+                time.sleep(wait)
+        raise error
+
+
+class RetryQueue:
+    """Thread-safe holding area for (url, term, error) that exhausted retries."""
+
+    def __init__(self):
+        self._items = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def push(self, url: str, term: str, error):
+        with self._lock:
+            self._items.append((url, term, str(error)))
+
+    def drain(self) -> list:
+        with self._lock:
+            items, self._items = self._items, []
+        return items
+
+    @staticmethod
+    def save(path: str, items: list):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{'url': u, 'term': t, 'error': e} for u, t, e in items],
+                      f, ensure_ascii=False, indent=4)
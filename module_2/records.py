@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Streaming record files shared by the scrape, clean and reparse stages.
+
+    *.jsonl / *.jsonl.gz   one JSON object per line (the default format)
+    *.json  / *.json.gz    a JSON array, as older runs wrote it
+
+Records are written one at a time and read back one at a time from JSON
+lines, so memory stays flat however big the corpus gets. A .json array is
+still written incrementally, but reading one back has to load it whole.
+"""
+import gzip
+import json
+import os
+
+
+def _is_array(path: str) -> bool:
+    return path.removesuffix('.gz').endswith('.json')
+
+
+def open_text(path: str, mode: str = 'r', gz: bool = None, line_buffered: bool = False):
+    """open() that transparently gzips paths ending in .gz (or when gz=True)."""
+    if path.endswith('.gz') if gz is None else gz:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8', buffering=1 if line_buffered else -1)
+
+
+def iter_records(path: str):
+    """Yield the records in a .jsonl(.gz) or .json(.gz) file in order."""
+    with open_text(path) as f:
+        if _is_array(path):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordWriter:
+    """Append records to a record file as they arrive.
+
+    Output goes to `path + '.part'` and replaces `path` on close(), so an
+    interrupted run never leaves a truncated file where the last good one was.
+    With line_buffered each record reaches the .part file as soon as it is
+    written (for watching a crawl with `tail -f`), at one write() per record.
+    """
+
+    def __init__(self, path: str, line_buffered: bool = False):
+        self.path  = path
+        self.count = 0
+        self._tmp  = path + '.part'
+        self._array = _is_array(path)
+        self._f = open_text(self._tmp, 'w', gz=path.endswith('.gz'), line_buffered=line_buffered)
+        if self._array:
+            self._f.write('[')
+
+    def write(self, rec: dict):
+        self.write_json(json.dumps(rec, ensure_ascii=False))
+
+    def write_json(self, line: str):
+        """Write one record that is already serialized (no trailing newline)."""
+        if self._array:
+            line = ('\n    ' if self.count == 0 else ',\n    ') + line
+        else:
+            line += '\n'
+        self._f.write(line)
+        self.count += 1
+
+    def close(self):
+        if self._f is None:
+            return
+        if self._array:
+            self._f.write('\n]\n')
+        self._f.close()
+        self._f = None
+        os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        elif self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def write_records(path: str, records) -> int:
+    """Stream an iterable of records to `path`; returns how many were written."""
+    with RecordWriter(path) as out:
+        for rec in records:
+            out.write(rec)
+    return out.count
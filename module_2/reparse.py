@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Re-run extraction over a raw page archive without touching the network.
+
+    python main.py --archive pages.arc          # crawl once, keeping raw pages
+    python reparse.py pages.arc --workers 8     # after every parser change
+
+Listing pages give each result its term and the output order; detail pages
+go through the same parse_result as a live crawl, spread over a process pool,
+and stream to the output file as they come back, so memory stays flat however
+big the archive is.
+"""
+import argparse
+import re
+from multiprocessing import Pool
+
+from archive import ARCHIVE_FILE, HtmlArchive, read_frame
+from journal import result_id
+from main import OUTPUT_FILE, clean_record
+from parsers import BACKENDS, parse_result, parse_survey_page, set_backend
+from records import write_records
+
+SURVEY_PAGE_RE = re.compile(r'/survey/\?page=(\d+)')
+
+# per-worker handle on the archive data file, opened by _init_worker
+_archive_file = None
+
+
+def _init_worker(path: str, backend: str):
+    global _archive_file
+    _archive_file = open(path, 'rb')
+    set_backend(backend)
+
+
+def _parse_listing(frame):
+    url, html = read_frame(_archive_file, *frame)
+    return parse_survey_page(html, url)
+
+
+def _parse_detail(frame):
+    url, html = read_frame(_archive_file, *frame)
+    try:
+        return parse_result(html, url)
+    except Exception as e:
+        print(f"❌ {url}: {e}")
+        return None
+
+
+def reparse(path: str = ARCHIVE_FILE, workers=None, chunksize: int = 64,
+            backend: str = 'stream'):
+    """Yield raw (uncleaned) records for every result page in the archive."""
+    latest = HtmlArchive(path, mode='r').latest()
+    listings = sorted((int(m.group(1)), frame) for url, frame in latest.items()
+                      if (m := SURVEY_PAGE_RE.search(url)))
+    details = {url: frame for url, frame in latest.items() if result_id(url) is not None}
+
+    with Pool(workers, initializer=_init_worker, initargs=(path, backend)) as pool:
+        terms = {}
+        for meta in pool.map(_parse_listing, [frame for _, frame in listings]):
+            for url, term in meta:
+                terms.setdefault(url, term)
+        # listing order first, then results no archived listing pointed at
+        order = [url for url in terms if url in details]
+        order += [url for url in details if url not in terms]
+
+        frames = [details[url] for url in order]
+        for url, rec in zip(order, pool.imap(_parse_detail, frames, chunksize)):
+            if rec is not None:
+                rec['term'] = terms.get(url, '')
+                yield rec
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-extract records from a raw page archive.')
+    parser.add_argument('archive', nargs='?', default=ARCHIVE_FILE)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='parser processes (default: one per CPU)')
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--parser', choices=BACKENDS, default='stream')
+    args = parser.parse_args()
+
+    records = reparse(args.archive, args.workers, backend=args.parser)
+    count = write_records(args.output, (clean_record(r) for r in records))
+    print(f"Reparsed {count} records → {args.output}")
+
+
+if __name__ == '__main__':
+    main()
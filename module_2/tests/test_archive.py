@@ -0,0 +1,51 @@
+import pytest
+from archive import HtmlArchive, read_frame
+
+@pytest.mark.archive
+def test_frames_read_back(tmp_path):
+    path = str(tmp_path / 'pages.arc')
+    with HtmlArchive(path) as archive:
+        archive.append('https://example.test/a', '<p>a</p>')
+        archive.append('https://example.test/a', '<p>a, again</p>')
+        archive.append('https://example.test/b', '<p>b</p>')
+    archive = HtmlArchive(path, mode='r')
+    assert len(archive) == 3
+    latest = archive.latest()
+    with open(path, 'rb') as f:
+        assert read_frame(f, *latest['https://example.test/a']) == \
+            ('https://example.test/a', '<p>a, again</p>')
+        assert read_frame(f, *latest['https://example.test/b']) == \
+            ('https://example.test/b', '<p>b</p>')
+
+@pytest.mark.archive
+def test_append_after_torn_write(tmp_path):
+    path = str(tmp_path / 'pages.arc')
+    with HtmlArchive(path) as archive:
+        archive.append('https://example.test/a', '<p>a</p>')
+    # a crash between the data write and a complete index line
+    with open(path, 'ab') as f:
+        f.write(b'\x1f\x8b partial frame')
+    with open(path + '.idx', 'a', encoding='utf-8') as f:
+        f.write('123\t4')
+
+    with HtmlArchive(path) as archive:
+        assert archive.urls() == {'https://example.test/a'}
+        archive.append('https://example.test/b', '<p>b</p>')
+
+    archive = HtmlArchive(path, mode='r')
+    assert [url for _, _, url in archive.index] == ['https://example.test/a',
+                                                    'https://example.test/b']
+    with open(path, 'rb') as f:
+        assert [read_frame(f, offset, length) for offset, length, _ in archive.index] == [
+            ('https://example.test/a', '<p>a</p>'), ('https://example.test/b', '<p>b</p>')]
+
+@pytest.mark.archive
+def test_read_mode_leaves_files_alone(tmp_path):
+    path = str(tmp_path / 'pages.arc')
+    with HtmlArchive(path) as archive:
+        archive.append('https://example.test/a', '<p>a</p>')
+    with open(path + '.idx', 'a', encoding='utf-8') as f:
+        f.write('123\t4')
+    size = (tmp_path / 'pages.arc.idx').stat().st_size
+    assert len(HtmlArchive(path, mode='r')) == 1
+    assert (tmp_path / 'pages.arc.idx').stat().st_size == size
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import async_crawl
+import main
+from fixture_server import serve_fixtures
+from journal import CrawlJournal
+from rate_limit import Throttle
+
+@pytest.fixture(name='base_url')
+def fixture_base_url(monkeypatch):
+    server, base_url = serve_fixtures()
+    # the fixtures are local; don't pace them like the real site
+    monkeypatch.setattr(main, 'throttle', Throttle(1000.0, max_concurrency=20))
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+def as_set(records):
+    return {json.dumps(rec, sort_keys=True) for rec in records}
+
+def crawl_async(tmp_path, base_url, target, **kwargs):
+    with CrawlJournal(str(tmp_path / 'async.jsonl')) as journal:
+        return asyncio.run(async_crawl.crawl(target, base_url, journal=journal, **kwargs))
+
+@pytest.mark.crawl
+def test_async_crawl_matches_sequential(tmp_path, base_url):
+    with CrawlJournal(str(tmp_path / 'sequential.jsonl')) as journal:
+        expected = main.crawl_sequential(100, base_url, journal)
+    assert len(expected) == 8
+    # queues of one force every stage to wait on the next
+    records = crawl_async(tmp_path, base_url, 100, concurrency=3, per_host=2,
+                          parse_workers=1, queue_size=1)
+    assert len(records) == len(expected)
+    assert as_set(records) == as_set(expected)
+
+@pytest.mark.crawl
+def test_async_crawl_stops_at_target(tmp_path, base_url):
+    records = crawl_async(tmp_path, base_url, 3, concurrency=4, queue_size=2)
+    assert len(records) == 3
+    assert len({rec['url'] for rec in records}) == 3
+
+@pytest.mark.crawl
+def test_host_limiter_caps_requests_in_flight(tmp_path, base_url, monkeypatch):
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+    fetch_html = async_crawl.fetch_html
+
+    def slow_fetch(url):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            time.sleep(0.05)
+            return fetch_html(url)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    monkeypatch.setattr(async_crawl, 'fetch_html', slow_fetch)
+    records = crawl_async(tmp_path, base_url, 100, concurrency=6, per_host=2)
+    assert len(records) == 8
+    assert peak[0] == 2
@@ -0,0 +1,84 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from http_cache import DiskCache, install_cache
+
+class VersionedPage(BaseHTTPRequestHandler):
+    """One page whose body and ETag are set by the test; 304 when the client has it."""
+
+    body = b'<p>first</p>'
+    etag = '"v1"'
+    seen = []       # (path, If-None-Match) per request
+
+    def do_GET(self):
+        self.seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    VersionedPage.body, VersionedPage.etag, VersionedPage.seen = b'<p>first</p>', '"v1"', []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), VersionedPage)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+def cached_session(directory, ttls):
+    session = requests.Session()
+    install_cache(session, str(directory), ttls=ttls)
+    return session
+
+@pytest.mark.http_cache
+def test_fresh_entry_is_served_without_a_request(server, tmp_path):
+    session = cached_session(tmp_path, [(r'/result/\d+', None)])
+    first = session.get(f'{server}/result/1')
+    second = session.get(f'{server}/result/1')
+    assert second.text == first.text == '<p>first</p>'
+    assert getattr(second, 'from_cache', False)
+    assert len(VersionedPage.seen) == 1
+
+@pytest.mark.http_cache
+def test_stale_entry_is_revalidated_with_a_304(server, tmp_path):
+    session = cached_session(tmp_path, [(r'.*', 0)])
+    session.get(f'{server}/survey/?page=1')
+    response = session.get(f'{server}/survey/?page=1')
+    assert VersionedPage.seen[1] == ('/survey/?page=1', '"v1"')
+    assert response.status_code == 200
+    assert response.from_cache
+    assert response.text == '<p>first</p>'
+    assert response.headers['ETag'] == '"v1"'
+
+@pytest.mark.http_cache
+def test_changed_page_replaces_the_entry(server, tmp_path):
+    session = cached_session(tmp_path, [(r'.*', 0)])
+    session.get(f'{server}/survey/?page=1')
+    VersionedPage.body, VersionedPage.etag = b'<p>second</p>', '"v2"'
+    response = session.get(f'{server}/survey/?page=1')
+    assert response.text == '<p>second</p>'
+    assert not getattr(response, 'from_cache', False)
+    meta, body = DiskCache(str(tmp_path)).get(f'{server}/survey/?page=1')
+    assert (meta['etag'], body) == ('"v2"', b'<p>second</p>')
+
+@pytest.mark.http_cache
+def test_cache_is_kept_under_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=4000)
+    for i in range(20):
+        cache.put(f'https://example.test/{i}', {'status': 200}, bytes(range(256)) * 2)
+    assert sum(f.stat().st_size for f in tmp_path.rglob('*.gz')) <= 4000
+    assert cache.get('https://example.test/19') is not None
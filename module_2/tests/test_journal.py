@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+from journal import CrawlJournal
+
+def record(rid):
+    return {'url': f'https://www.thegradcafe.com/result/{rid}', 'status': 'Accepted'}
+
+@pytest.mark.journal
+def test_resume_replays_records_and_pages(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with CrawlJournal(path) as journal:
+        journal.add_record(record(1))
+        journal.add_record(record(2))
+        journal.page_done(1)
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.records == [record(1), record(2)]
+        assert journal.seen_ids == {1, 2}
+        assert journal.next_page == 2
+
+@pytest.mark.journal
+def test_without_resume_starts_over(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with CrawlJournal(path) as journal:
+        journal.add_record(record(1))
+    with CrawlJournal(path) as journal:
+        assert journal.records == []
+    assert os.path.getsize(path) == 0
+
+@pytest.mark.journal
+def test_replay_drops_torn_tail(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with CrawlJournal(path) as journal:
+        journal.add_record(record(1))
+        journal.page_done(1)
+    good_bytes = os.path.getsize(path)
+    with open(path, 'ab') as f:
+        f.write(b'{"rec": {"url": "https://www.thegradcafe.com/res')   # crash mid-write
+
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.records == [record(1)]
+        assert journal.completed_pages == {1}
+        assert os.path.getsize(path) == good_bytes
+        journal.add_record(record(2))
+
+    # the new entry starts on a clean line, so the file replays in full
+    with open(path, 'rb') as f:
+        entries = [json.loads(line) for line in f]
+    assert entries == [{'rec': record(1)}, {'page': 1}, {'rec': record(2)}]
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.seen_ids == {1, 2}
+
+@pytest.mark.journal
+def test_replay_stops_at_corrupt_line(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with CrawlJournal(path) as journal:
+        journal.add_record(record(1))
+    with open(path, 'ab') as f:
+        f.write(b'not json\n' + json.dumps({'rec': record(2)}).encode() + b'\n')
+    with CrawlJournal(path, resume=True) as journal:
+        assert journal.records == [record(1)]
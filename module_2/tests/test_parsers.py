@@ -0,0 +1,42 @@
+import glob
+import os
+
+import pytest
+from parsers import BACKENDS, parse_result, parse_survey_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+
+def pages(kind):
+    for path in sorted(glob.glob(os.path.join(FIXTURES, kind, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield os.path.splitext(os.path.basename(path))[0], f.read()
+
+@pytest.mark.parsers
+@pytest.mark.parametrize('backend', [b for b in BACKENDS if b != 'html.parser'])
+def test_backends_agree_on_detail_pages(backend):
+    for rid, html in pages('result'):
+        url = f'https://www.thegradcafe.com/result/{rid}'
+        assert parse_result(html, url, backend) == parse_result(html, url, 'html.parser')
+
+@pytest.mark.parsers
+@pytest.mark.parametrize('backend', [b for b in BACKENDS if b != 'html.parser'])
+def test_backends_agree_on_listings(backend):
+    for page, html in pages('survey'):
+        url = f'https://www.thegradcafe.com/survey/?page={page}'
+        meta = parse_survey_page(html, url, backend)
+        assert meta and meta == parse_survey_page(html, url, 'html.parser')
+
+@pytest.mark.parsers
+def test_backends_read_the_page_text_alike():
+    html = ('<html><head><title>CS - JHU</title></head><body><dl>'
+            '<dt>Degree Type</dt>\n  <dd>Masters</dd>\n  <dt>Decision</dt><dd>Accepted</dd>'
+            '<dt>Notification</dt><dd>on 03/04/2025</dd>'
+            '<dt>Notes</dt><dd> great <b>news</b> </dd></dl></body></html>')
+    entries = [parse_result(html, 'u', backend) for backend in BACKENDS]
+    assert all(entry == entries[0] for entry in entries)
+    # as on the page text, the Degree Type match runs on into the next label
+    assert entries[0]['Degree'] == 'Masters\n\n\nDecision\nAccepted\nNotification\non 03'
+    assert entries[0]['status'] == 'Accepted'
+    assert entries[0]['date_added'] == 'Added on April 3, 2025'
+    assert entries[0]['comments'] == 'great news'
+    assert entries[0]['program'] == 'CS, JHU  '
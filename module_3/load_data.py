@@ -1,7 +1,51 @@
+import argparse
+import gzip
+import io
 import json
+import re
+import uuid
 import psycopg2
+from psycopg2.extras import execute_values
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
-import sys
+from functools import lru_cache
+from itertools import chain, islice
+
+# Database connection parameters
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'module3',
+    'user': 'postgres',  # Change to your PostgreSQL username
+    'password': 'your_password',  # Change to your PostgreSQL password
+    'port': '5432'
+}
+
+# Columns written by every load strategy, in row-tuple order
+COLUMNS = ('program', 'comments', 'date_added', 'url', 'status', 'term',
+           'us_or_international', 'gpa', 'gre', 'gre_v', 'gre_aw', 'degree',
+           'result_id')
+# What content_hash covers: everything but the key itself
+CONTENT_COLUMNS = COLUMNS[:-1]
+STAGING_TABLE = 'staging_application_data'
+RESULT_ID_RE = re.compile(r'/result/(\d+)')
+STRATEGIES = ('copy', 'values', 'row')
+BATCH_SIZE = 5000
+# Column-wise parsing: records per chunk, distinct 'Added on ...' strings cached
+PARSE_CHUNK_SIZE = 5000
+DATE_CACHE_SIZE = 4096
+# Score columns: (record key, prefix)
+SCORE_FIELDS = {'gpa': ('GPA', 'GPA '), 'gre': ('GRE', 'GRE '),
+                'gre_v': ('GRE V', 'GRE V '), 'gre_aw': ('GRE AW', 'GRE AW ')}
+# Text columns: record key
+TEXT_FIELDS = {'program': 'program', 'comments': 'comments', 'url': 'url',
+               'status': 'status', 'term': 'term',
+               'us_or_international': 'US/International', 'degree': 'Degree'}
+# Parallel mode: each run's workers COPY their shards into an unlogged table
+# named with this prefix and a random suffix, so concurrent runs stay apart
+SHARD_TABLE_PREFIX = 'shard_staging_application_data'
+SHARD_SIZE = 50000
+SHARD_RETRIES = 3
 
 def parse_gpa(gpa_str):
     """Parse GPA from 'GPA 3.75' format"""
@@ -21,8 +65,12 @@ def parse_gre_score(score_str, prefix):
     except:
         return None
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def parse_date(date_str):
-    """Parse date from 'Added on March 31, 2024' format"""
+    """Parse date from 'Added on March 31, 2024' format
+
+    Cached: a whole corpus only has a few hundred distinct dates.
+    """
     if not date_str or not date_str.startswith('Added on '):
         return None
     try:
@@ -31,26 +79,445 @@ def parse_date(date_str):
     except:
         return None
 
-def load_json_to_postgres():
-    # Database connection parameters
-    db_config = {
-        'host': 'localhost',
-        'database': 'module3',
-        'user': 'postgres',  # Change to your PostgreSQL username
-        'password': 'your_password',  # Change to your PostgreSQL password
-        'port': '5432'
-    }
-    
-    # File path to your JSON file
-    json_file_path = 'cleaned_applicant_data_10000.json'  # Your uploaded file
-    
+def iter_records(path):
+    """Yield records one at a time from a .jsonl / .jsonl.gz stream
+    (as module_2 writes them) or from a legacy .json array."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        if path.removesuffix('.gz').endswith('.json'):
+            # a JSON array can only be parsed whole
+            yield from json.load(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+def parse_result_id(url):
+    """GradCafe result ID from 'https://www.thegradcafe.com/result/986101'"""
+    m = RESULT_ID_RE.search(url or '')
+    return int(m.group(1)) if m else None
+
+def record_to_row(record):
+    """Turn one JSON record into a tuple in COLUMNS order"""
+    return (
+        record.get('program', '').strip(),
+        record.get('comments', ''),
+        parse_date(record.get('date_added', '')),
+        record.get('url', ''),
+        record.get('status', ''),
+        record.get('term', ''),
+        record.get('US/International', ''),
+        parse_gpa(record.get('GPA', '')),
+        parse_gre_score(record.get('GRE', ''), 'GRE '),
+        parse_gre_score(record.get('GRE V', ''), 'GRE V '),
+        parse_gre_score(record.get('GRE AW', ''), 'GRE AW '),
+        record.get('Degree', ''),
+        parse_result_id(record.get('url', ''))
+    )
+
+# ---- Column-wise parsing, a chunk of records at a time ----
+
+class ParseReport:
+    """Values per column that could not be parsed and were loaded as NULL"""
+    SAMPLES = 3
+
+    def __init__(self):
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, column, value, count=1):
+        self.counts[column] += count
+        samples = self.samples.setdefault(column, [])
+        if len(samples) < self.SAMPLES and value not in samples:
+            samples.append(value)
+
+    def update(self, other):
+        """Fold in another report (from a worker process, say)"""
+        for column, count in other.counts.items():
+            for value in other.samples.get(column, []):
+                self.add(column, value, 0)
+            self.counts[column] += count
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def lines(self):
+        return [f"{column}: {count} bad value{'s' if count > 1 else ''}, e.g. "
+                + ', '.join(repr(value) for value in self.samples[column])
+                for column, count in self.counts.most_common()]
+
+def _column(records, key):
+    return [record.get(key, '') for record in records]
+
+def _strings(values, column, report):
+    """`values` with anything but a string reported as bad and blanked"""
+    cleaned = []
+    for value in values:
+        if not isinstance(value, str):
+            if value is not None:  # JSON null is just a missing value
+                report.add(column, value)
+            value = ''
+        cleaned.append(value)
+    return cleaned
+
+def _parse_distinct(values, parse, column, report):
+    """parse() of every value, computed once per distinct value.
+    A value that is present but parses to None is reported as bad."""
+    try:
+        distinct = set(values)
+    except TypeError:  # a list or object where a string belongs
+        values = _strings(values, column, report)
+        distinct = set(values)
+    table = {value: parse(value) if isinstance(value, str) else None for value in distinct}
+    bad = {value for value, parsed in table.items()
+           if parsed is None and value is not None and value != ''}
+    if bad:
+        for value, count in Counter(value for value in values if value in bad).items():
+            report.add(column, value, count)
+    return [table[value] for value in values]
+
+def parse_score_column(values, prefix, column='score', report=None):
+    """A column of 'GRE 165'-style strings as floats, None where missing.
+    A plain list, not an array: the values go straight into row tuples."""
+    report = ParseReport() if report is None else report
+    return _parse_distinct(values, lambda value: parse_gre_score(value, prefix), column, report)
+
+def parse_columns(records, report):
+    """Parse a chunk of records column by column into {column: values}.
+    Unparseable values are None; text columns pass through as record_to_row leaves them."""
+    columns = {column: _column(records, key) for column, key in TEXT_FIELDS.items()}
+    try:
+        columns['program'] = [value.strip() for value in columns['program']]
+    except AttributeError:
+        programs = _strings(columns['program'], 'program', report)
+        columns['program'] = [value.strip() for value in programs]
+    columns['date_added'] = _parse_distinct(_column(records, 'date_added'), parse_date,
+                                            'date_added', report)
+    for column, (key, prefix) in SCORE_FIELDS.items():
+        columns[column] = parse_score_column(_column(records, key), prefix, column, report)
+    # URLs are unique, so there is nothing to share between rows here
+    try:
+        result_ids = list(map(parse_result_id, columns['url']))
+    except TypeError:
+        result_ids = list(map(parse_result_id, _strings(columns['url'], 'url', report)))
+    if None in result_ids:
+        for url, result_id in zip(columns['url'], result_ids):
+            if result_id is None and url:
+                report.add('result_id', url)
+    columns['result_id'] = result_ids
+    return columns
+
+def rows_from_columns(columns):
+    """Row tuples in COLUMNS order"""
+    return zip(*(columns[column] for column in COLUMNS))
+
+def parse_chunk(records, report):
+    """Rows for one chunk of records; anything but a JSON object is skipped"""
+    objects = [record for record in records if isinstance(record, dict)]
+    if len(objects) < len(records):
+        for record in records:
+            if not isinstance(record, dict):
+                report.add('record', record)
+    return rows_from_columns(parse_columns(objects, report))
+
+def iter_parsed_rows(records, report, chunk_size=PARSE_CHUNK_SIZE):
+    """Rows for a stream of records, parsed a chunk at a time.
+    Bad field values go in as NULL and are counted in `report` instead of
+    stopping the load."""
+    chunks = batched(records, chunk_size)
+    return chain.from_iterable(parse_chunk(chunk, report) for chunk in chunks)
+
+def batched(rows, size):
+    """Split an iterable of rows into lists of at most `size`"""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+# ---- Load strategies: each takes a cursor and an iterable of rows ----
+
+# COPY text format: tab-separated, \N for NULL, backslash escapes
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def copy_value(value):
+    """One field in COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+def copy_rows(cur, rows, batch_size=BATCH_SIZE, table='application_data', columns=COLUMNS,
+              progress=True):
+    """COPY FROM STDIN, one in-memory text-format buffer per batch"""
+    copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    for batch in batched(rows, batch_size):
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write('\t'.join(map(copy_value, row)) + '\n')
+        buffer.seek(0)
+        cur.copy_expert(copy_sql, buffer)
+        total += len(batch)
+        if progress:
+            print(f"  Copied {total} records...")
+    return total
+
+def insert_values(cur, rows, batch_size=BATCH_SIZE, table='application_data'):
+    """Multi-row INSERT ... VALUES through psycopg2's execute_values"""
+    insert_sql = f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES %s"
+    total = 0
+    for batch in batched(rows, batch_size):
+        execute_values(cur, insert_sql, batch, page_size=batch_size)
+        total += len(batch)
+        print(f"  Inserted {total} records...")
+    return total
+
+def insert_rows(cur, rows, table='application_data'):
+    """One INSERT round trip per row (the original behaviour)"""
+    insert_sql = (f"INSERT INTO {table} ({', '.join(COLUMNS)}) "
+                  f"VALUES ({', '.join(['%s'] * len(COLUMNS))})")
+    total = 0
+    for row in rows:
+        cur.execute(insert_sql, row)
+        total += 1
+        # Show progress every 1000 records
+        if total % 1000 == 0:
+            print(f"  Processed {total} records...")
+    return total
+
+def load_rows(cur, rows, strategy, batch_size=BATCH_SIZE, table='application_data'):
+    """Insert rows with one of STRATEGIES; batch_size does not apply to 'row'"""
+    if strategy == 'copy':
+        return copy_rows(cur, rows, batch_size, table=table)
+    if strategy == 'values':
+        return insert_values(cur, rows, batch_size, table=table)
+    if strategy == 'row':
+        return insert_rows(cur, rows, table=table)
+    raise ValueError(f"unknown strategy {strategy!r}; choose from {', '.join(STRATEGIES)}")
+
+# ---- Idempotent loading: stage, then merge on result_id ----
+
+def ensure_natural_key(cur):
+    """Add result_id/content_hash to application_data and make result_id unique.
+
+    Tables loaded before this existed get result_id backfilled from url, and
+    rows repeated by earlier double loads are removed (the oldest p_id stays).
+    Also adds degree, which tables created by the module_5 loader used to lack.
+    """
+    cur.execute("""
+        ALTER TABLE application_data ADD COLUMN IF NOT EXISTS degree TEXT;
+        ALTER TABLE application_data ADD COLUMN IF NOT EXISTS result_id BIGINT;
+        ALTER TABLE application_data ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        UPDATE application_data
+           SET result_id = substring(url from '/result/([0-9]+)')::BIGINT
+         WHERE result_id IS NULL AND url ~ '/result/[0-9]+';
+    """)
+    cur.execute("""
+        DELETE FROM application_data a
+         USING application_data b
+         WHERE a.result_id = b.result_id AND a.p_id > b.p_id
+    """)
+    if cur.rowcount:
+        print(f"  Removed {cur.rowcount} duplicate rows")
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS application_data_result_id_key
+            ON application_data (result_id)
+    """)
+
+def create_staging_table(cur):
+    """Temporary table with the loader's columns plus an arrival sequence"""
+    cur.execute(f"""
+        DROP TABLE IF EXISTS {STAGING_TABLE};
+        CREATE TEMP TABLE {STAGING_TABLE} AS
+            SELECT {', '.join(COLUMNS)} FROM application_data WITH NO DATA;
+        ALTER TABLE {STAGING_TABLE} ADD COLUMN seq BIGSERIAL;
+    """)
+
+def merge_staged(cur, staging=STAGING_TABLE):
+    """Upsert the staged rows (from `staging`) into application_data.
+
+    Rows whose content hash matches the stored one are left alone, so a
+    re-run of the same file writes nothing. If a result appears more than
+    once in the input, the last occurrence wins. Rows without a result ID
+    cannot be matched and are always inserted.
+    Returns (inserted, updated).
+    """
+    columns = ', '.join(COLUMNS)
+    content_hash = f"md5(ROW({', '.join(CONTENT_COLUMNS)})::TEXT)"
+    updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in CONTENT_COLUMNS + ('content_hash',))
+    cur.execute(f"""
+        WITH merged AS (
+            INSERT INTO application_data ({columns}, content_hash)
+            SELECT DISTINCT ON (result_id) {columns}, {content_hash}
+              FROM {staging}
+             WHERE result_id IS NOT NULL
+             ORDER BY result_id, seq DESC
+            ON CONFLICT (result_id) DO UPDATE SET {updates}
+             WHERE application_data.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted)
+          FROM merged
+    """)
+    inserted, updated = cur.fetchone()
+    cur.execute(f"""
+        INSERT INTO application_data ({columns}, content_hash)
+        SELECT {columns}, {content_hash} FROM {staging}
+         WHERE result_id IS NULL ORDER BY seq
+    """)
+    return inserted + cur.rowcount, updated
+
+# ---- Parallel mode: shards COPYed from worker processes, merged once ----
+
+_worker_conn = None
+
+def _init_shard_worker():
+    """Open the connection this worker process loads its shards on"""
+    global _worker_conn
+    _worker_conn = psycopg2.connect(**DB_CONFIG)
+
+def load_shard(shard_table, first_seq, items):
+    """COPY one shard into shard_table in its own transaction.
+
+    `items` are raw JSON lines or already-parsed records. seq numbers carry
+    on from first_seq, so the merge still knows which duplicate came last.
+    Returns (rows staged, records rejected, ParseReport); a rejected record
+    (anything but a JSON object) is counted in the report, as in a serial load.
+    """
+    report = ParseReport()
+    records = [json.loads(item) if isinstance(item, str) else item for item in items]
+    rejected = sum(not isinstance(record, dict) for record in records)
+    rows = (row + (first_seq + i,) for i, row in enumerate(iter_parsed_rows(records, report)))
+    try:
+        with _worker_conn.cursor() as cur:
+            count = copy_rows(cur, rows, table=shard_table, columns=COLUMNS + ('seq',),
+                              progress=False)
+        _worker_conn.commit()
+    except Exception:
+        # leave nothing behind so the shard can simply be sent again
+        if _worker_conn.closed:
+            _init_shard_worker()
+        else:
+            _worker_conn.rollback()
+        raise
+    return count, rejected, report
+
+def iter_raw_lines(path):
+    """Non-blank lines of a .jsonl / .jsonl.gz file, left unparsed"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield line
+
+def iter_shards(path, shard_size=SHARD_SIZE):
+    """(first_seq, items) for consecutive shards of the input file.
+
+    JSON lines are passed on unparsed so the workers do the parsing; a .json
+    array has to be parsed here.
+    """
+    if path.removesuffix('.gz').endswith('.json'):
+        items = iter_records(path)
+    else:
+        items = iter_raw_lines(path)
+    seq = 0
+    for shard in batched(items, shard_size):
+        yield seq, shard
+        seq += len(shard)
+
+def create_shard_table(cur):
+    """Unlogged table one parallel run's workers stage into; returns its name"""
+    shard_table = f'{SHARD_TABLE_PREFIX}_{uuid.uuid4().hex[:12]}'
+    cur.execute(f"""
+        CREATE UNLOGGED TABLE {shard_table} AS
+            SELECT {', '.join(COLUMNS)} FROM application_data WITH NO DATA;
+        ALTER TABLE {shard_table} ADD COLUMN seq BIGINT;
+    """)
+    return shard_table
+
+def stage_parallel(path, workers, shard_table, shard_size=SHARD_SIZE, retries=SHARD_RETRIES):
+    """Load every shard of `path` into shard_table from a pool of worker processes.
+
+    Each shard commits on its own, so a failed one is retried by itself, up
+    to `retries` times. At most 2×workers shards are in memory at once.
+    Returns (records read, rows staged, records rejected, ParseReport).
+    """
+    shards = iter_shards(path, shard_size)
+    sent = staged = rejected = 0
+    report = ParseReport()
+    with ProcessPoolExecutor(workers, initializer=_init_shard_worker) as pool:
+        pending = {}
+
+        def submit(shard, attempt):
+            pending[pool.submit(load_shard, shard_table, *shard)] = (shard, attempt)
+
+        for shard in islice(shards, 2 * workers):
+            sent += len(shard[1])
+            submit(shard, 1)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard, attempt = pending.pop(future)
+                try:
+                    count, shard_rejected, shard_report = future.result()
+                except Exception as e:
+                    if attempt > retries:
+                        raise RuntimeError(f"shard starting at record {shard[0]} "
+                                           f"failed {attempt} times: {e}") from e
+                    print(f"  Shard starting at record {shard[0]} failed ({e}), retrying...")
+                    submit(shard, attempt + 1)
+                    continue
+                staged += count
+                rejected += shard_rejected
+                report.update(shard_report)
+                print(f"  Staged {staged} records...")
+                if (shard := next(shards, None)) is not None:
+                    sent += len(shard[1])
+                    submit(shard, 1)
+    return sent, staged, rejected, report
+
+def load_parallel(conn, path, workers, shard_size=SHARD_SIZE):
+    """Stage `path` from `workers` processes, then merge it all in one transaction.
+
+    Raises RuntimeError, with nothing committed, if the row counts don't add up.
+    Returns (staged, inserted, updated, ParseReport).
+    """
+    cur = conn.cursor()
+    shard_table = create_shard_table(cur)
+    conn.commit()
+    try:
+        sent, staged, rejected, report = stage_parallel(path, workers, shard_table, shard_size)
+        cur.execute(f"SELECT COUNT(*) FROM {shard_table}")
+        in_table = cur.fetchone()[0]
+        if not sent - rejected == staged == in_table:
+            raise RuntimeError(f"read {sent} records ({rejected} rejected) but staged "
+                               f"{staged} ({in_table} in table)")
+
+        cur.execute("SELECT COUNT(*) FROM application_data")
+        before = cur.fetchone()[0]
+        inserted, updated = merge_staged(cur, staging=shard_table)
+        cur.execute("SELECT COUNT(*) FROM application_data")
+        after = cur.fetchone()[0]
+        if after - before != inserted:
+            raise RuntimeError(f"merge inserted {inserted} rows but the table grew by "
+                               f"{after - before}")
+        conn.commit()
+    finally:
+        conn.rollback()
+        cur.execute(f"DROP TABLE IF EXISTS {shard_table}")
+        conn.commit()
+        cur.close()
+    return staged, inserted, updated, report
+
+def load_json_to_postgres(json_file_path='cleaned_applicant_data_10000.json',
+                          strategy='copy', batch_size=BATCH_SIZE, workers=1):
     conn = None
     cur = None
     
     try:
         # Step 1: Connect to PostgreSQL
         print("Step 1: Connecting to PostgreSQL...")
-        conn = psycopg2.connect(**db_config)
+        conn = psycopg2.connect(**DB_CONFIG)
         cur = conn.cursor()
         print("✓ Connected successfully!")
         
@@ -70,69 +537,41 @@ def load_json_to_postgres():
             gre FLOAT,
             gre_v FLOAT,
             gre_aw FLOAT,
-            degree TEXT
+            degree TEXT,
+            result_id BIGINT,
+            content_hash TEXT
         );
         """
         cur.execute(create_table_query)
+        ensure_natural_key(cur)
         conn.commit()
         print("✓ Table created successfully!")
         
-        # Step 3: Load JSON data
-        print("\nStep 3: Loading JSON data...")
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        print(f"✓ Loaded {len(data)} records from JSON file")
-        
-        # Step 4: Process and insert data
-        print("\nStep 4: Processing and inserting data...")
+        # Step 3: Open the record stream (read lazily, one record at a time)
+        print(f"\nStep 3: Reading records from {json_file_path}...")
+        data = iter_records(json_file_path)
         
-        insert_query = """
-        INSERT INTO application_data 
-        (program, comments, date_added, url, status, term, us_or_international, gpa, gre, gre_v, gre_aw, degree)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        successful_inserts = 0
-        failed_inserts = 0
-        
-        for i, record in enumerate(data):
-            try:
-                # Parse all fields
-                row_data = (
-                    record.get('program', '').strip(),
-                    record.get('comments', ''),
-                    parse_date(record.get('date_added', '')),
-                    record.get('url', ''),
-                    record.get('status', ''),
-                    record.get('term', ''),
-                    record.get('US/International', ''),
-                    parse_gpa(record.get('GPA', '')),
-                    parse_gre_score(record.get('GRE', ''), 'GRE '),
-                    parse_gre_score(record.get('GRE V', ''), 'GRE V '),
-                    parse_gre_score(record.get('GRE AW', ''), 'GRE AW '),
-                    record.get('Degree', '')
-                )
-                
-                # Insert single record
-                cur.execute(insert_query, row_data)
-                successful_inserts += 1
-                
-                # Show progress every 1000 records
-                if (i + 1) % 1000 == 0:
-                    print(f"  Processed {i + 1} records...")
-                    
-            except Exception as e:
-                failed_inserts += 1
-                print(f"  Error on record {i + 1}: {e}")
-                if failed_inserts > 10:  # Stop if too many errors
-                    print("  Too many errors, stopping...")
-                    break
-        
-        # Commit all changes
-        conn.commit()
-        print(f"✓ Successfully inserted {successful_inserts} records")
-        if failed_inserts > 0:
-            print(f"  Failed to insert {failed_inserts} records")
+        # Step 4: Stage the rows, then merge them on result_id
+        if workers > 1:
+            # shards COPYed on `workers` connections, merged in one transaction
+            print(f"\nStep 4: Staging data (copy, {workers} connections, "
+                  f"shards of {SHARD_SIZE})...")
+            staged, inserted, updated, report = load_parallel(conn, json_file_path, workers)
+        else:
+            print(f"\nStep 4: Staging data ({strategy}, batches of {batch_size})...")
+            report = ParseReport()
+            create_staging_table(cur)
+            staged = load_rows(cur, iter_parsed_rows(data, report), strategy, batch_size,
+                               table=STAGING_TABLE)
+            inserted, updated = merge_staged(cur)
+            
+            # Commit all changes
+            conn.commit()
+        print(f"✓ Staged {staged} records: {inserted} new, {updated} changed, "
+              f"{staged - inserted - updated} unchanged")
+        # Bad values don't stop the load; say which columns had them
+        for line in report.lines():
+            print(f"  Loaded as NULL - {line}")
         
         # Step 5: Verify data
         print("\nStep 5: Verifying insertion...")
@@ -177,6 +616,8 @@ def load_json_to_postgres():
         print("Please check the file path and make sure the file exists.")
     except json.JSONDecodeError as e:
         print(f"✗ Invalid JSON format: {e}")
+    except RuntimeError as e:
+        print(f"✗ Load aborted, nothing committed: {e}")
     except Exception as e:
         print(f"✗ Unexpected error: {e}")
         import traceback
@@ -190,4 +631,14 @@ def load_json_to_postgres():
         print("Database connection closed.")
 
 if __name__ == "__main__":
-    load_json_to_postgres()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Load applicant records into PostgreSQL.')
+    parser.add_argument('path', nargs='?', default='cleaned_applicant_data_10000.json',
+                        help='.jsonl(.gz) stream or .json array')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='copy',
+                        help='copy: COPY FROM STDIN; values: multi-row INSERT; row: one INSERT per row')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='rows per COPY buffer / INSERT statement')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='load shards of the file on this many connections in parallel')
+    args = parser.parse_args()
+    load_json_to_postgres(args.path, args.strategy, args.batch_size, args.workers)
\ No newline at end of file
@@ -1,9 +1,18 @@
 # query_data.py
 
+import threading
+import time
+import weakref
+
 from psycopg2 import sql
 
 # ─── 1. SQL STATEMENT BUILDERS ─────────────────────────────────────────────
 
+def _value(value) -> sql.Composable:
+    """A Literal for value, or value itself if it is already SQL (e.g. a Placeholder)."""
+    return value if isinstance(value, sql.Composable) else sql.Literal(value)
+
+
 def build_fetch_stats_query(
     schema: str,
     table: str,
@@ -25,10 +34,10 @@ def build_fetch_stats_query(
         sql.SQL(" FROM "),
         sql.Identifier(schema), sql.SQL('.'), sql.Identifier(table),
         sql.SQL(" WHERE "),
-        sql.Identifier(pk_col), sql.SQL(' = '), sql.Literal(pk_value)
+        sql.Identifier(pk_col), sql.SQL(' = '), _value(pk_value)
     ]
     if limit is not None:
-        parts += [sql.SQL(' LIMIT '), sql.Literal(limit)]
+        parts += [sql.SQL(' LIMIT '), _value(limit)]
     parts.append(sql.SQL(';'))
     return sql.Composed(parts)
 
@@ -49,7 +58,7 @@ def build_insert_user_query(
         sql.SQL("INSERT INTO "),
         sql.Identifier(schema), sql.SQL('.'), sql.Identifier(table),
         sql.SQL(" ("), sql.SQL(', ').join(map(sql.Identifier, cols)), sql.SQL(") VALUES ("),
-        sql.SQL(', ').join(sql.Literal(v) for v in vals),
+        sql.SQL(', ').join(_value(v) for v in vals),
         sql.SQL(");")
     ])
 
@@ -69,7 +78,7 @@ def build_update_status_query(
     """
     set_clauses = [
         sql.Composed([
-            sql.Identifier(col), sql.SQL(' = '), sql.Literal(val)
+            sql.Identifier(col), sql.SQL(' = '), _value(val)
         ])
         for col, val in updates.items()
     ]
@@ -79,12 +88,32 @@ def build_update_status_query(
         sql.SQL(" SET "),
         sql.SQL(', ').join(set_clauses),
         sql.SQL(" WHERE "),
-        sql.Identifier(id_col), sql.SQL(' = '), sql.Literal(id_val),
+        sql.Identifier(id_col), sql.SQL(' = '), _value(id_val),
         sql.SQL(';')
     ])
 
 # ─── 2. EXECUTOR ───────────────────────────────────────────────────────────
 
+ROW_KEYWORDS = ('SELECT', 'WITH', 'VALUES', 'TABLE', 'SHOW')
+
+
+def _leading_sql(query) -> str:
+    """First literal SQL text of a composed query; no connection needed."""
+    if isinstance(query, sql.SQL):
+        return query.string
+    if isinstance(query, sql.Composed):
+        for part in query.seq:
+            text = _leading_sql(part)
+            if text.strip():
+                return text
+    return query if isinstance(query, str) else ''
+
+
+def returns_rows(query) -> bool:
+    """True if query is a statement whose results are fetched (SELECT and the like)."""
+    return _leading_sql(query).lstrip(' \n\t(').upper().startswith(ROW_KEYWORDS)
+
+
 def execute_query(
     conn,
     query: sql.Composed
@@ -94,12 +123,101 @@ def execute_query(
     """
     with conn.cursor() as cur:
         cur.execute(query)
-        sql_text = query.as_string(conn).lstrip().upper()
-        if sql_text.startswith('SELECT'):
+        if returns_rows(query):
             return cur.fetchall()
         conn.commit()
 
-# ─── 3. CONVENIENCE WRAPPERS ────────────────────────────────────────────────
+# ─── 3. PREPARED STATEMENTS ────────────────────────────────────────────────
+
+class PreparedStatement:
+    """
+    One builder's SQL with %s placeholders for its values, prepared per connection.
+    Whether it returns rows is decided once, here, not on every call.
+    """
+
+    def __init__(self, name: str, query: sql.Composed):
+        self.name = name
+        self.query = query
+        self.returns_rows = returns_rows(query)
+        self.calls = 0
+        self.seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total_ms': round(self.seconds * 1000, 3),
+            'mean_ms': round(self.seconds * 1000 / self.calls, 3) if self.calls else None,
+        }
+
+
+class StatementRegistry:
+    """
+    Statements keyed by their shape (builder, schema, table, columns). Each is
+    PREPAREd the first time a connection runs it; later calls on that
+    connection send only EXECUTE name (values), so PostgreSQL parses and plans
+    it once instead of on every call.
+    """
+
+    def __init__(self, prefix: str = 'query_data'):
+        self.prefix = prefix
+        self._statements: dict = {}
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> names prepared there
+        self._lock = threading.Lock()
+
+    def register(self, key: tuple, build) -> PreparedStatement:
+        """The statement for key; build() makes its SQL the first time key is seen."""
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is None:
+                statement = PreparedStatement(f"{self.prefix}_{len(self._statements) + 1}",
+                                              build())
+                self._statements[key] = statement
+            return statement
+
+    def execute(self, conn, statement: PreparedStatement, params: tuple = ()):
+        """
+        Run statement on conn with params. If it returns rows, fetchall;
+        otherwise commit.
+        """
+        with conn.cursor() as cur:
+            with self._lock:
+                prepared = self._prepared.setdefault(conn, set())
+                is_prepared = statement.name in prepared
+            if not is_prepared:
+                text = statement.query.as_string(conn).strip().rstrip(';')
+                numbered = text.split('%s')
+                text = numbered[0] + ''.join(
+                    f"${i}{part}" for i, part in enumerate(numbered[1:], start=1)
+                )
+                cur.execute(sql.SQL("PREPARE {} AS ").format(sql.Identifier(statement.name))
+                            + sql.SQL(text))
+                with self._lock:
+                    prepared.add(statement.name)
+            execute = sql.SQL("EXECUTE {}").format(sql.Identifier(statement.name))
+            if params:
+                execute += sql.SQL(" ({})").format(
+                    sql.SQL(', ').join([sql.Placeholder()] * len(params)))
+            start = time.perf_counter()
+            cur.execute(execute, tuple(params))
+            result = cur.fetchall() if statement.returns_rows else None
+            elapsed = time.perf_counter() - start
+        with self._lock:
+            statement.calls += 1
+            statement.seconds += elapsed
+        if statement.returns_rows:
+            return result
+        conn.commit()
+        return None
+
+    def stats(self) -> dict:
+        """Call count and timings per statement, keyed by statement name."""
+        with self._lock:
+            return {s.name: {'key': key, **s.stats()} for key, s in self._statements.items()}
+
+
+STATEMENTS = StatementRegistry()
+
+# ─── 4. CONVENIENCE WRAPPERS ────────────────────────────────────────────────
 
 def fetch_stats(
     conn,
@@ -109,8 +227,14 @@ def fetch_stats(
     pk_value,
     limit: int | None = None
 ):
-    q = build_fetch_stats_query(schema, table, pk_col, pk_value, limit)
-    return execute_query(conn, q)
+    has_limit = limit is not None
+    statement = STATEMENTS.register(
+        ('fetch_stats', schema, table, pk_col, has_limit),
+        lambda: build_fetch_stats_query(schema, table, pk_col, sql.Placeholder(),
+                                        sql.Placeholder() if has_limit else None)
+    )
+    params = (pk_value, limit) if has_limit else (pk_value,)
+    return STATEMENTS.execute(conn, statement, params)
 
 
 def insert_user(
@@ -119,8 +243,12 @@ def insert_user(
     table: str,
     data: dict
 ):
-    q = build_insert_user_query(schema, table, data)
-    return execute_query(conn, q)
+    cols = tuple(data)
+    statement = STATEMENTS.register(
+        ('insert_user', schema, table, cols),
+        lambda: build_insert_user_query(schema, table, dict.fromkeys(cols, sql.Placeholder()))
+    )
+    return STATEMENTS.execute(conn, statement, tuple(data.values()))
 
 
 def update_status(
@@ -131,5 +259,87 @@ def update_status(
     id_val,
     updates: dict
 ):
-    q = build_update_status_query(schema, table, id_col, id_val, updates)
-    return execute_query(conn, q)
+    cols = tuple(updates)
+    statement = STATEMENTS.register(
+        ('update_status', schema, table, id_col, cols),
+        lambda: build_update_status_query(schema, table, id_col, sql.Placeholder(),
+                                          dict.fromkeys(cols, sql.Placeholder()))
+    )
+    # the SET values come before the WHERE value in the statement
+    return STATEMENTS.execute(conn, statement, tuple(updates.values()) + (id_val,))
+
+# ─── 5. DASHBOARD SUMMARY ───────────────────────────────────────────────────
+
+# Every dashboard metric as (alias, aggregate, FILTER condition or None).
+# Cheap tests come first in each condition; identical aggregates are only
+# computed once by PostgreSQL.
+DASHBOARD_METRICS = [
+    ('total_entries', 'COUNT(*)', None),
+    ('fall_2024_count', 'COUNT(*)', "term = 'Fall 2024'"),
+    ('total_fall2024', 'COUNT(*)', "term = 'Fall 2024'"),
+    ('international_entries', 'COUNT(*)', "us_or_international = 'International'"),
+    ('acceptances', 'COUNT(*)', "term = 'Fall 2024' AND status LIKE '%Accept%'"),
+    ('avg_gpa', 'AVG(gpa)', None),
+    ('avg_gre_quant', 'AVG(gre)', None),
+    ('avg_gre_verbal', 'AVG(gre_v)', None),
+    ('avg_gre_writing', 'AVG(gre_aw)', None),
+    ('avg_gpa_american_fall2024', 'AVG(gpa)',
+     "term = 'Fall 2024' AND us_or_international = 'American'"),
+    ('avg_gpa_accepted_fall2024', 'AVG(gpa)', "term = 'Fall 2024' AND status LIKE '%Accept%'"),
+    ('jhu_cs_masters_count', 'COUNT(*)',
+     "degree ILIKE '%masters%' AND program ILIKE '%computer science%' "
+     "AND (program ILIKE '%johns hopkins%' OR program ILIKE '%jhu%')"),
+]
+
+# (alias, numerator metric, denominator metric), as a percentage to 2 places
+DASHBOARD_PERCENTAGES = [
+    ('international_percentage', 'international_entries', 'total_entries'),
+    ('acceptance_percentage', 'acceptances', 'total_fall2024'),
+]
+
+
+def build_dashboard_query(
+    schema: str,
+    table: str
+) -> sql.Composed:
+    """
+    Build one SELECT that computes every dashboard metric in a single pass:
+      SELECT totals.*, ROUND(num * 100.0 / NULLIF(den, 0), 2) AS pct, ...
+        FROM (SELECT COUNT(*) FILTER (WHERE ...) AS alias, ...
+                FROM schema.table) AS totals;
+    Averages are rounded to 2 places.
+    """
+    aggregates = []
+    for alias, aggregate, condition in DASHBOARD_METRICS:
+        expr = sql.SQL(aggregate)
+        if condition is not None:
+            expr = sql.SQL("{} FILTER (WHERE {})").format(expr, sql.SQL(condition))
+        if aggregate.startswith('AVG'):
+            expr = sql.SQL("ROUND(({})::NUMERIC, 2)").format(expr)
+        aggregates.append(sql.SQL("{} AS {}").format(expr, sql.Identifier(alias)))
+    percentages = [
+        sql.SQL("ROUND({} * 100.0 / NULLIF({}, 0), 2) AS {}").format(
+            sql.Identifier(num), sql.Identifier(den), sql.Identifier(alias))
+        for alias, num, den in DASHBOARD_PERCENTAGES
+    ]
+    return sql.Composed([
+        sql.SQL("SELECT totals.*, "),
+        sql.SQL(', ').join(percentages),
+        sql.SQL(" FROM (SELECT "),
+        sql.SQL(', ').join(aggregates),
+        sql.SQL(" FROM "),
+        sql.Identifier(schema), sql.SQL('.'), sql.Identifier(table),
+        sql.SQL(") AS totals;")
+    ])
+
+
+def fetch_dashboard_summary(
+    conn,
+    schema: str,
+    table: str
+) -> dict:
+    """Every dashboard metric, keyed by alias, from one query."""
+    with conn.cursor() as cur:
+        cur.execute(build_dashboard_query(schema, table))
+        names = [col.name for col in cur.description]
+        return dict(zip(names, cur.fetchone()))
@@ -0,0 +1,110 @@
+"""Latency of /api/stats at 100 concurrent clients: queried, cached and revalidated.
+
+    python bench_api.py [--clients 100] [--requests 20]
+
+The Flask app is driven in-process through its test client, one client per
+thread, against the database configured in graduate_analysis_app/app.py.
+Each client walks a fixed list of filter combinations three times:
+
+- queried: the result cache is bypassed, so every request runs its query;
+- cached: the app's result cache answers after the first miss per URL;
+- revalidated: each request sends the ETag it got before, expecting a 304.
+
+Every response must be a 200 (or a 304 when revalidating).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "graduate_analysis_app"))
+
+# pylint: disable=wrong-import-position
+import app as dashboard_app  # noqa: E402
+from bench_pool import NoCache  # noqa: E402
+
+URLS = [
+    "/api/stats",
+    "/api/stats?term=Fall%202024",
+    "/api/stats?term=Fall%202024&nationality=American",
+    "/api/stats?degree=Masters&status=Accepted",
+    "/api/stats?institution=hopkins",
+    "/api/stats/by/term",
+    "/api/stats/by/nationality?term=Fall%202024&degree=PhD",
+    "/api/stats/by/degree?institution=toronto",
+]
+
+
+def run_clients(clients, requests, etags=None, revalidate=False):
+    """Latencies in ms of clients x requests GETs.
+
+    Without revalidate the ETag of every response is recorded in etags (if
+    given); with it, the recorded ETags are sent back and 304s expected.
+    """
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def client(offset):
+        mine = []
+        with dashboard_app.app.test_client() as http:
+            for i in range(requests):
+                url = URLS[(offset + i) % len(URLS)]
+                headers = {"If-None-Match": etags[url]} if revalidate else {}
+                start = time.perf_counter()
+                response = http.get(url, headers=headers)
+                mine.append((time.perf_counter() - start) * 1000)
+                expected = 304 if headers else 200
+                if response.status_code != expected:
+                    failures.append(f"{url}: {response.status_code}")
+                elif etags is not None and not headers:
+                    with lock:
+                        etags[url] = response.headers["ETag"]
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise RuntimeError(f"{len(failures)} unexpected responses, e.g. {failures[0]}")
+    return sorted(latencies)
+
+
+def percentile(values, fraction):
+    """The value at fraction of the way through sorted values."""
+    return values[int(fraction * (len(values) - 1))]
+
+
+def main():
+    """Print p50/p95/p99 latency and throughput for each scenario."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20, help="per client")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    cache = dashboard_app.CACHE
+    etags = {}
+    try:
+        for label in ("queried", "cached", "revalidated"):
+            dashboard_app.CACHE = NoCache() if label == "queried" else cache
+            start = time.perf_counter()
+            latencies = run_clients(args.clients, args.requests,
+                                    None if label == "queried" else etags,
+                                    revalidate=label == "revalidated")
+            elapsed = time.perf_counter() - start
+            print(f"{label:<12} {statistics.median(latencies):>8.1f} "
+                  f"{percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f} "
+                  f"{len(latencies) / elapsed:>8.0f}")
+    finally:
+        dashboard_app.CACHE = cache
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# module_5/bench_dashboard.py
+"""Dashboard latency from the rollups against a full scan, as the table grows.
+
+    python bench_dashboard.py [--rows 100000 1000000] [--refresh 1000] [--repeat 10]
+
+For each size a scratch table is filled with bench_search's synthetic
+records and migrated, which builds its rollups. The dashboard statement is
+then timed reading the rollups and, for comparison, reading the table in a
+single FILTER-aggregate pass; both must give the same answers. Finally
+--refresh new records go through the loader's staging and merge, which
+updates the rollups from those rows alone. The scratch table and its
+rollups are dropped afterwards; application_data is never touched.
+"""
+
+import argparse
+import itertools
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from bench_search import close_scratch, drop_scratch_table, synthetic_records, timed
+from graduate_analysis_app.queries import build_dashboard_query
+from load_data import (DB_CONFIG, STAGING_TABLE, ParseReport, copy_rows, create_staging_table,
+                       create_table, iter_parsed_rows, merge_staged)
+from schema import migrate, refresh_statistics
+
+SCRATCH_TABLE = "bench_dashboard_application_data"
+
+
+def build_table(conn, rows):
+    """Create, fill and migrate the scratch table, rollups included."""
+    with conn.cursor() as cur:
+        drop_scratch_table(cur, SCRATCH_TABLE)
+        create_table(cur, SCRATCH_TABLE)
+        copy_rows(cur, iter_parsed_rows(synthetic_records(rows), ParseReport()),
+                  table=SCRATCH_TABLE)
+        cur.execute(f"CREATE UNIQUE INDEX ON {SCRATCH_TABLE} (result_id);")
+        migrate(cur, SCRATCH_TABLE)
+    conn.commit()
+    refresh_statistics(conn, SCRATCH_TABLE, vacuum=True)
+
+
+def refresh(conn, first, count):
+    """Stage and merge `count` new synthetic records; returns the merge's seconds."""
+    records = itertools.islice(synthetic_records(first + count), first, None)
+    with conn.cursor() as cur:
+        create_staging_table(cur, SCRATCH_TABLE)
+        copy_rows(cur, iter_parsed_rows(records, ParseReport()), table=STAGING_TABLE)
+        start = time.perf_counter()
+        merge_staged(cur, SCRATCH_TABLE)
+        elapsed = time.perf_counter() - start
+    conn.commit()
+    return elapsed
+
+
+def dashboard(conn, rollups):
+    """A function running the dashboard statement once and returning its row."""
+    statement, params = build_dashboard_query(rollups=rollups, table=SCRATCH_TABLE)
+
+    def run():
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(statement, params)
+            return cur.fetchone()
+    return run
+
+
+def main():
+    """Print one line of dashboard timings per table size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--refresh", type=int, default=1000,
+                        help="new records merged after the build, through the loader")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    print(f"{'rows':>10} {'rollup groups':>14} {'rollups ms':>11} {'scan ms':>9} "
+          f"{'merge ' + str(args.refresh) + ' ms':>14}")
+    try:
+        for rows in args.rows:
+            build_table(conn, rows)
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT (SELECT COUNT(*) FROM {SCRATCH_TABLE}_rollup) + "
+                            f"(SELECT COUNT(*) FROM {SCRATCH_TABLE}_program_rollup);")
+                groups = cur.fetchone()[0]
+            from_rollups, _, answers = timed(dashboard(conn, True), args.repeat)
+            from_table, _, expected = timed(dashboard(conn, False), args.repeat)
+            if answers != expected:
+                raise RuntimeError(f"rollups disagree with the table: {answers} != {expected}")
+            merge_ms = refresh(conn, rows, args.refresh) * 1000
+            if dashboard(conn, True)() != dashboard(conn, False)():
+                raise RuntimeError("rollups disagree with the table after the refresh")
+            print(f"{rows:>10,} {groups:>14,} {from_rollups:>11.1f} {from_table:>9.1f} "
+                  f"{merge_ms:>14.1f}")
+    finally:
+        close_scratch(conn, SCRATCH_TABLE)
+
+
+if __name__ == "__main__":
+    main()
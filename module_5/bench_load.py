@@ -0,0 +1,89 @@
+# module_5/bench_load.py
+"""Rows/sec of the three load strategies against a local PostgreSQL.
+
+    python bench_load.py [--rows 100000] [--batch-sizes 1000 5000 20000]
+
+Synthetic records go through record_to_row() and then COPY, execute_values
+or one INSERT per row into a scratch table that is dropped afterwards, so
+application_data is never touched. The per-row strategy is only run at
+the first batch size, since batching does not apply to it.
+"""
+
+import argparse
+import random
+import time
+
+import psycopg2
+
+from load_data import DB_CONFIG, STRATEGIES, create_table, load_rows, record_to_row
+
+SCRATCH_TABLE = "bench_application_data"
+
+
+def synthetic_records(count, seed=7):
+    """Yield raw records shaped like the scraper's output, GPA/GRE included."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "program": f"Program {i % 900}, University {i % 317}",
+            "comments": rng.choice(["", "Funding\tdecided it.", "Visited the lab\nin March"]),
+            "date_added": f"Added on March {1 + i % 28}, 2025",
+            "url": f"https://www.thegradcafe.com/result/{900000 + i}",
+            "status": rng.choice(["Accepted", "Rejected", "Wait listed", "Interview"]),
+            "term": rng.choice(["Fall 2024", "Fall 2025", "Spring 2025"]),
+            "US/International": rng.choice(["American", "International", "Other"]),
+            "GPA": rng.choice(["", f"GPA {rng.uniform(2.5, 4.0):.2f}"]),
+            "GRE": rng.choice(["", f"GRE {rng.randint(140, 170)}"]),
+            "GRE V": rng.choice(["", f"GRE V {rng.randint(140, 170)}"]),
+            "GRE AW": rng.choice(["", f"GRE AW {rng.randint(2, 12) / 2:.2f}"]),
+            "Degree": rng.choice(["Masters", "PhD"]),
+        }
+
+
+def run_once(conn, strategy, records, batch_size):
+    """Load records into a fresh scratch table; returns (rows, seconds)."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+        create_table(cur, SCRATCH_TABLE)
+        conn.commit()
+        start = time.perf_counter()
+        rows = (record_to_row(record) for record in records)
+        loaded = load_rows(cur, rows, strategy, batch_size, table=SCRATCH_TABLE)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        cur.execute(f"SELECT COUNT(*) FROM {SCRATCH_TABLE}")
+        assert cur.fetchone()[0] == loaded == len(records)
+    return loaded, elapsed
+
+
+def main():
+    """Run every strategy and print a rows/sec table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    records = list(synthetic_records(args.rows))
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        print(f"{args.rows:,} rows into {SCRATCH_TABLE}\n")
+        print(f"{'strategy':<8} {'batch':>7} {'seconds':>8} {'rows/sec':>10}")
+        baseline = None
+        for strategy in reversed(STRATEGIES):          # row first, as the baseline
+            sizes = args.batch_sizes[:1] if strategy == "row" else args.batch_sizes
+            for batch_size in sizes:
+                loaded, elapsed = run_once(conn, strategy, records, batch_size)
+                rate = loaded / elapsed
+                baseline = baseline or rate
+                batch = "-" if strategy == "row" else f"{batch_size:,}"
+                print(f"{strategy:<8} {batch:>7} {elapsed:>8.2f} {rate:>10,.0f}"
+                      f"  ({rate / baseline:.1f}x)")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# module_5/bench_parse.py
+"""Records/sec of the loader's field parsing, before and after.
+
+    python bench_parse.py [--sizes 10000 100000 1000000]
+
+Synthetic records (see bench_load.py) are turned into row tuples by:
+
+    legacy     record_to_row() with strptime() on every date, as it used to be
+    record     record_to_row(), dates cached by parse_date()
+    columnar   iter_parsed_rows(), chunks parsed column by column
+
+No database is needed. The script exits non-zero if any parser's rows
+differ from legacy's.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import load_data
+from bench_load import synthetic_records
+from load_data import (ParseReport, iter_parsed_rows, parse_gpa, parse_gre_score,
+                       parse_result_id, record_to_row, split_program)
+
+
+def legacy_parse_date(date_str):
+    """parse_date() without the cache."""
+    if not date_str or not date_str.startswith("Added on "):
+        return None
+    try:
+        _, date_part = date_str.split("Added on ", 1)
+        return datetime.strptime(date_part, "%B %d, %Y").date()
+    except (ValueError, IndexError):
+        return None
+
+
+def legacy_rows(records):
+    """One record_to_row() per record, every field parsed from scratch."""
+    for record in records:
+        program = record.get("program", "").strip()
+        yield (
+            program,
+            record.get("comments", ""),
+            legacy_parse_date(record.get("date_added", "")),
+            record.get("url", ""),
+            record.get("status", ""),
+            record.get("term", ""),
+            record.get("US/International", ""),
+            parse_gpa(record.get("GPA", "")),
+            parse_gre_score(record.get("GRE", ""), "GRE "),
+            parse_gre_score(record.get("GRE V", ""), "GRE V "),
+            parse_gre_score(record.get("GRE AW", ""), "GRE AW "),
+            record.get("Degree", ""),
+            parse_result_id(record.get("url", "")),
+        ) + split_program(program)
+
+
+def columnar_rows(records):
+    """iter_parsed_rows() with a throwaway report."""
+    return iter_parsed_rows(records, ParseReport())
+
+
+def main():
+    """Time every parser on each size and print a records/sec table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    parsers = [
+        ("legacy", legacy_rows),
+        ("record", lambda records: map(record_to_row, records)),
+        ("columnar", columnar_rows),
+    ]
+    mismatches = 0
+    for size in args.sizes:
+        records = list(synthetic_records(size))
+        print(f"\n{size:,} records")
+        print(f"  {'parser':<20} {'seconds':>8} {'records/sec':>12} {'speed-up':>9}")
+        reference, base = None, None
+        for name, rows in parsers:
+            load_data.parse_date.cache_clear()
+            start = time.perf_counter()
+            parsed = list(rows(records))
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference, base = parsed, elapsed
+            same = parsed == reference
+            mismatches += not same
+            print(f"  {name:<20} {elapsed:>8.2f} {size / elapsed:>12,.0f} "
+                  f"{base / elapsed:>8.2f}x{'' if same else '  ROWS DIFFER'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
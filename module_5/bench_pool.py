@@ -0,0 +1,93 @@
+"""Requests per second for the dashboard route with and without the connection pool.
+
+    python bench_pool.py [--clients 1 8 32] [--seconds 10] [--max-size 10]
+
+The Flask app is driven in-process through its test client, one client per
+thread, so the numbers measure the app and the database rather than an
+HTTP server. Each round swaps app.POOL: first for DirectConnections, which
+opens and closes a connection per query as the app used to, then for a
+ConnectionPool of --max-size connections. The result cache is bypassed, so
+every request runs its query. Every response must be a 200.
+The app reads the database configured in graduate_analysis_app/app.py.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "graduate_analysis_app"))
+
+# pylint: disable=wrong-import-position
+import app as dashboard_app  # noqa: E402
+from pool import ConnectionPool, DirectConnections  # noqa: E402
+
+
+class NoCache:
+    """Stands in for app.CACHE: every request computes its result."""
+
+    @staticmethod
+    def version(fresh=False):  # pylint: disable=unused-argument
+        """No data version, so no ETags either."""
+        return None
+
+    @staticmethod
+    def get_or_compute(_name, compute):
+        """compute(), uncached."""
+        return compute()
+
+
+def hammer(clients, seconds):
+    """Run `clients` threads requesting / for `seconds`; returns (requests, failures)."""
+    stop = time.perf_counter() + seconds
+    counts = [[0, 0] for _ in range(clients)]
+
+    def client(count):
+        with dashboard_app.app.test_client() as http:
+            while time.perf_counter() < stop:
+                response = http.get("/")
+                count[0 if response.status_code == 200 else 1] += 1
+
+    threads = [threading.Thread(target=client, args=(count,)) for count in counts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(count[0] for count in counts), sum(count[1] for count in counts)
+
+
+def measure(connections, clients, seconds):
+    """Requests per second with connections installed as the app's pool."""
+    previous = dashboard_app.POOL, dashboard_app.CACHE
+    dashboard_app.POOL, dashboard_app.CACHE = connections, NoCache()
+    try:
+        hammer(1, min(1.0, seconds))  # warm up: templates, first connections
+        done, failed = hammer(clients, seconds)
+    finally:
+        dashboard_app.POOL, dashboard_app.CACHE = previous
+        connections.close()
+    if failed:
+        raise RuntimeError(f"{failed} of {done + failed} requests did not return 200")
+    return done / seconds
+
+
+def main():
+    """Print one line of throughput per client count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--max-size", type=int, default=10)
+    args = parser.parse_args()
+
+    config = dashboard_app.DB_CONFIG
+    print(f"{'clients':>8} {'direct req/s':>13} {'pooled req/s':>13} {'speedup':>8}")
+    for clients in args.clients:
+        direct = measure(DirectConnections(config), clients, args.seconds)
+        pooled = measure(ConnectionPool(config, max_size=args.max_size), clients, args.seconds)
+        print(f"{clients:>8} {direct:>13.1f} {pooled:>13.1f} {pooled / direct:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
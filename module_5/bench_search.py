@@ -0,0 +1,162 @@
+# module_5/bench_search.py
+"""Latency of program/institution search on a large synthetic table.
+
+    python bench_search.py [--rows 1000000] [--repeat 20]
+
+Synthetic records go through the loader's parsing (so program is split into
+program_name and institution) into a scratch table. schema.py then migrates
+it, with trigram indexes if pg_trgm is available. Each search is timed
+through query_data.search_programs(), checkout from the pool included, next to the
+original query 7 pattern, a leading-wildcard ILIKE over program. The
+scratch table and its rollups are dropped afterwards; application_data is
+never touched.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import psycopg2
+
+from load_data import DB_CONFIG, ParseReport, copy_rows, create_table, iter_parsed_rows
+from query_data import search_programs
+from schema import drop_rollups, migrate, refresh_statistics
+
+SCRATCH_TABLE = "bench_search_application_data"
+
+INSTITUTIONS = [
+    "Johns Hopkins University", "Johns Hopkins Bloomberg School of Public Health", "JHU",
+    "Johns Hopkins", "Massachusetts Institute of Technology", "MIT", "Stanford University",
+    "Carnegie Mellon University", "University of Toronto", "University of California, Berkeley",
+    "University of California, Los Angeles", "University of Maryland, College Park",
+    "University of Washington, Seattle", "Georgia Institute of Technology", "Harvard University",
+    "Princeton University", "New York University", "Columbia University", "Yale University",
+    "University of Michigan", "University of Illinois Urbana-Champaign", "Cornell University",
+    "University of Pennsylvania", "Duke University", "University of Chicago", "Boston University",
+    "Northwestern University", "University of British Columbia", "McGill University",
+    "UNC Chapel Hill", "UT Austin", "Virginia Tech", "KU Leuven", "University College London",
+] + [f"{city} State University" for city in (
+    "Ohio", "Michigan", "Iowa", "Kansas", "Oregon", "Arizona", "Colorado", "Florida",
+    "Georgia", "Washington", "Oklahoma", "Utah", "Kent", "Portland", "Wayne", "Boise",
+)]
+PROGRAMS = [
+    "Computer Science", "Statistics", "Economics", "Electrical and Computer Engineering",
+    "Mechanical Engineering", "Biostatistics", "Public Health", "Neuroscience",
+    "Cognitive Neuroscience", "Clinical Psychology", "History", "English", "Philosophy",
+    "Physics", "Chemistry", "Mathematics", "Applied Mathematics", "Data Science",
+    "Molecular Biology, Cell Biology, and Biochemistry", "Sociology", "Political Science",
+    "Information Science", "Human-Computer Interaction", "Materials Science and Engineering",
+]
+
+# (label, search_programs() arguments)
+SEARCHES = [
+    ("JHU computer science masters", {"institution": "JHU", "program": "computer science",
+                                      "degree": "Masters"}),
+    ("Toronto statistics", {"institution": "University of Toronto", "program": "statistics"}),
+    ("any neuroscience", {"program": "neuro"}),
+    ("MIT, all programs", {"institution": "MIT"}),
+    ("College Park", {"institution": "college park"}),
+]
+# query 7 as the dashboard first wrote it, for comparison
+LEGACY_QUERY = (
+    f"SELECT COUNT(*) FROM {SCRATCH_TABLE} "
+    "WHERE (program ILIKE %s OR program ILIKE %s) AND program ILIKE %s AND degree ILIKE %s"
+)
+LEGACY_PARAMS = ("%johns hopkins%", "%jhu%", "%computer science%", "%masters%")
+
+
+def synthetic_records(count, seed=11):
+    """Yield raw records with realistic "Program, Institution" strings."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(INSTITUTIONS))]
+    for i in range(count):
+        institution = rng.choices(INSTITUTIONS, weights)[0]
+        yield {
+            "program": f"{rng.choice(PROGRAMS)}, {institution}",
+            "comments": "",
+            "date_added": f"Added on March {1 + i % 28}, 2025",
+            "url": f"https://www.thegradcafe.com/result/{i + 1}",
+            "status": rng.choice(["Accepted", "Rejected", "Wait listed", "Interview"]),
+            "term": rng.choice(["Fall 2024", "Fall 2025", "Spring 2025"]),
+            "US/International": rng.choice(["American", "International"]),
+            "Degree": rng.choice(["Masters", "PhD"]),
+        }
+
+
+def drop_scratch_table(cur, table):
+    """Drop a scratch table and the rollups migrate() gave it."""
+    cur.execute(f"DROP TABLE IF EXISTS {table};")
+    drop_rollups(cur, table)
+
+
+def close_scratch(conn, table):
+    """Abandon any open transaction, drop the scratch table and close conn."""
+    conn.rollback()
+    with conn.cursor() as cur:
+        drop_scratch_table(cur, table)
+    conn.commit()
+    conn.close()
+
+
+def build_table(conn, rows):
+    """Create, fill, migrate and vacuum the scratch table."""
+    with conn.cursor() as cur:
+        drop_scratch_table(cur, SCRATCH_TABLE)
+        create_table(cur, SCRATCH_TABLE)
+        loaded = copy_rows(cur, iter_parsed_rows(synthetic_records(rows), ParseReport()),
+                           table=SCRATCH_TABLE)
+        migrate(cur, SCRATCH_TABLE)
+        cur.execute("SELECT COUNT(*) FROM pg_extension WHERE extname = 'pg_trgm';")
+        trigrams = cur.fetchone()[0] > 0
+    conn.commit()
+    refresh_statistics(conn, SCRATCH_TABLE, vacuum=True)
+    return loaded, trigrams
+
+
+def timed(run, repeat):
+    """(median ms, p95 ms, last result) of repeat calls to run()."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(0.95 * (len(times) - 1))], result
+
+
+def main():
+    """Build the scratch table and print a latency table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        start = time.perf_counter()
+        loaded, trigrams = build_table(conn, args.rows)
+        print(f"{loaded:,} rows in {SCRATCH_TABLE} ({time.perf_counter() - start:.0f}s), "
+              f"pg_trgm {'installed' if trigrams else 'unavailable'}\n")
+        print(f"{'search':<32} {'median ms':>10} {'p95 ms':>8} {'applications':>13}")
+
+        def legacy():
+            with conn.cursor() as cur:
+                cur.execute(LEGACY_QUERY, LEGACY_PARAMS)
+                return cur.fetchone()[0]
+
+        median, p95, count = timed(legacy, args.repeat)
+        print(f"{'query 7, ILIKE over program':<32} {median:>10.1f} {p95:>8.1f} {count:>13,}")
+        for label, kwargs in SEARCHES:
+            median, p95, results = timed(
+                lambda kwargs=kwargs: search_programs(**kwargs, table=SCRATCH_TABLE),
+                args.repeat,
+            )
+            total = sum(row["applications"] for row in results or [])
+            print(f"{label:<32} {median:>10.1f} {p95:>8.1f} {total:>13,}")
+    finally:
+        close_scratch(conn, SCRATCH_TABLE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# module_5/check_plans.py
+"""EXPLAIN each dashboard query and fail if any of them scans application_data.
+
+    python check_plans.py [--analyze]
+
+Every query in graduate_analysis_app/queries.py is planned against the live
+database. A query passes when its plan reads application_data through one
+of its indexes and never with a sequential scan. The script exits non-zero
+if any query fails, so it can sit in CI next to the loader. With --analyze
+the queries are also run and their actual times shown.
+"""
+
+import argparse
+import json
+import sys
+
+import psycopg2
+from psycopg2 import sql
+
+from graduate_analysis_app.queries import DASHBOARD_QUERIES
+from load_data import DB_CONFIG, TABLE
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def plan_nodes(node):
+    """Yield a plan node and all of its descendants."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def scans_of(plan, table=TABLE):
+    """(node type, index name or None) of every scan of table in plan."""
+    indexes = set()
+    scans = []
+    for node in plan_nodes(plan):
+        if node.get("Relation Name") == table or node.get("Index Name", "").startswith(table):
+            scans.append((node["Node Type"], node.get("Index Name")))
+            if node.get("Index Name"):
+                indexes.add(node["Index Name"])
+    return scans, indexes
+
+
+def explain(cur, statement, params, analyze=False):
+    """The top plan node (and execution ms with analyze) of statement."""
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    cur.execute(sql.SQL(f"EXPLAIN ({options}) ") + statement, params)
+    result = cur.fetchone()[0]
+    result = json.loads(result) if isinstance(result, str) else result
+    return result[0]["Plan"], result[0].get("Execution Time")
+
+
+def check(cur, description, statement, params, analyze=False):
+    """Plan one query; returns (passed, report line)."""
+    try:
+        plan, elapsed = explain(cur, statement, params, analyze)
+    except psycopg2.Error as error:
+        cur.connection.rollback()
+        return False, f"FAIL {description:<26} {str(error).splitlines()[0]}"
+    scans, indexes = scans_of(plan)
+    passed = bool(indexes) and all(node_type != "Seq Scan" for node_type, _ in scans)
+    timing = f"{elapsed:>9.2f} ms " if elapsed is not None else ""
+    node_types = "/".join(sorted({node_type for node_type, _ in scans}))
+    return passed, (f"{'ok  ' if passed else 'FAIL'} {description:<26} {timing}"
+                    f"{node_types}: {', '.join(sorted(indexes)) or '-'}")
+
+
+def main():
+    """Check every dashboard query's plan and print one line per query."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyze", action="store_true",
+                        help="run the queries too and report their execution time")
+    args = parser.parse_args()
+
+    failures = 0
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            for description, statement, params in DASHBOARD_QUERIES:
+                passed, line = check(cur, description, statement, params, args.analyze)
+                failures += not passed
+                print(line)
+    finally:
+        conn.close()
+    print(f"\n{len(DASHBOARD_QUERIES) - failures}/{len(DASHBOARD_QUERIES)} queries use an index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 """Flask application for graduate analysis data visualizations."""
 
-from flask import Flask, render_template
+import csv
+import hashlib
+import io
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from flask import Flask, Response, jsonify, render_template, request
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2 import sql
+
+from cache import MemoryBackend, ResultCache, SQLiteBackend
+from distributions import histogram, percentiles
+from pool import ConnectionPool
+from queries import (DASHBOARD_COLUMNS, DASHBOARD_QUERIES, DASHBOARD_QUERY_COLUMNS,
+                     DASHBOARD_SUMMARY_PARAMS, DATA_VERSION_PARAMS, SQL_DASHBOARD_SUMMARY,
+                     SQL_DATA_VERSION, STATS_DIMENSIONS, RECORD_COLUMNS, SCORE_BINS,
+                     DISTRIBUTION_DIMENSIONS, build_distribution_query, build_records_query,
+                     build_stats_query)
+from statements import StatementRegistry
 
 app = Flask(__name__)
 
@@ -15,155 +32,116 @@ DB_CONFIG = {
     'port': '5432'
 }
 
-
-def get_connection():
-    """Create and return a database connection."""
+# Set to a file path to share cached results between worker processes
+CACHE_PATH = None
+# 'summary': one statement over the rollups; 'fanout': the seven queries over
+# application_data, run concurrently on pooled connections
+DASHBOARD_MODE = 'summary'
+# Per dashboard query: the statement_timeout the server counts from when it starts
+QUERY_TIMEOUT_MS = 2000
+# /records page sizes, and rows fetched per round trip by /export.csv
+RECORDS_PAGE_SIZE = 50
+RECORDS_MAX_PAGE_SIZE = 1000
+EXPORT_FETCH_SIZE = 2000
+
+
+# Shared by every request; connections are opened on first use
+POOL = ConnectionPool(DB_CONFIG)
+# Prepared once on each pooled connection, then executed by name
+STATEMENTS = StatementRegistry()
+# Runs the fan-out queries of every request, one thread per pooled connection.
+# When more are submitted than the pool has connections they queue here;
+# time in the queue does not count against QUERY_TIMEOUT_MS.
+FANOUT = ThreadPoolExecutor(max_workers=POOL.max_size, thread_name_prefix="dashboard")
+
+
+def execute_query(name, query, params=None, description="Query", timeout_ms=None):
+    """Execute a SQL object as prepared statement name and return results with error handling.
+
+    timeout_ms, if given, replaces the pool's statement_timeout for this query.
+    """
+    STATEMENTS.register(name, query)
     try:
-        return psycopg2.connect(**DB_CONFIG)
+        with POOL.connection() as conn:
+            if timeout_ms is not None:
+                with conn.cursor() as cur:
+                    cur.execute("SET LOCAL statement_timeout = %s;", (int(timeout_ms),))
+            return STATEMENTS.execute(conn, name, params, RealDictCursor)
     except psycopg2.Error as err:
-        print(f"Error connecting to database: {err}")
+        print(f"Error executing {description}: {err}")
         return None
 
 
-def execute_query(query, params=None, description="Query"):
-    """Execute a SQL object with optional parameters and return results with error handling."""
-    conn = None
-    try:
-        conn = get_connection()
-        if not conn:
-            return None
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(query, params)
-        return cur.fetchall()
-    except psycopg2.Error as err:
-        print(f"Error executing {description}: {err}")
-        return None
-    finally:
-        if conn:
-            conn.close()
-
-
-# Composed SQL statements with identifiers, placeholders, and inherent limits
-TABLE = sql.Identifier('application_data')
-
-SQL_FALL_2024_COUNT = sql.SQL(
-    "SELECT COUNT(*) AS fall_2024_count FROM {tbl} WHERE term = %s LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_INTERNATIONAL_PERCENTAGE = sql.SQL(
-    "SELECT "
-    "COUNT(*) AS total_entries, "
-    "COUNT(CASE WHEN us_or_international = %s THEN 1 END) AS international_entries, "
-    "ROUND((COUNT(CASE WHEN us_or_international = %s THEN 1 END) * 100.0 / COUNT(*)), 2) "
-    "AS international_percentage FROM {tbl} LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_AVERAGE_SCORES = sql.SQL(
-    "SELECT "
-    "ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa, "
-    "ROUND(AVG(gre)::NUMERIC, 2) AS avg_gre_quant, "
-    "ROUND(AVG(gre_v)::NUMERIC, 2) AS avg_gre_verbal, "
-    "ROUND(AVG(gre_aw)::NUMERIC, 2) AS avg_gre_writing "
-    "FROM {tbl} LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_AVG_GPA_AMERICAN_FALL2024 = sql.SQL(
-    "SELECT ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa_american_fall2024 "
-    "FROM {tbl} WHERE us_or_international = %s AND term = %s AND gpa IS NOT NULL LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_ACCEPTANCE_RATE = sql.SQL(
-    "SELECT ROUND((COUNT(CASE WHEN status LIKE %s THEN 1 END) * 100.0 / COUNT(*))::NUMERIC, 2) "
-    "AS acceptance_percentage FROM {tbl} WHERE term = %s LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_AVG_GPA_ACCEPTED_FALL2024 = sql.SQL(
-    "SELECT ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa_accepted_fall2024 "
-    "FROM {tbl} WHERE term = %s AND status LIKE %s AND gpa IS NOT NULL LIMIT 1"
-).format(tbl=TABLE)
-
-SQL_JHU_CS_MASTERS_COUNT = sql.SQL(
-    "SELECT COUNT(*) AS jhu_cs_masters_count FROM {tbl}"
-    "WHERE (program ILIKE %s OR program ILIKE %s)"
-    "AND program ILIKE %s AND degree ILIKE %s LIMIT 1"
-).format(tbl=TABLE)
+def read_data_version():
+    """application_data's version from data_version, or None if it cannot be read."""
+    results = execute_query("data_version", SQL_DATA_VERSION, DATA_VERSION_PARAMS,
+                            "Data Version")
+    return results[0]['version'] if results else None
+
+
+# Dashboard answers, kept until the next load (or the TTL) changes them
+CACHE = ResultCache(SQLiteBackend(CACHE_PATH) if CACHE_PATH else MemoryBackend(),
+                    version=read_data_version)
+
+
+def dashboard_queries(mode=DASHBOARD_MODE):
+    """(statement name, description, statement, params, columns) for each query of mode."""
+    if mode == 'fanout':
+        return [
+            (f"query_{number}", description, statement, params,
+             DASHBOARD_QUERY_COLUMNS[description])
+            for number, (description, statement, params) in enumerate(DASHBOARD_QUERIES, 1)
+        ]
+    return [("summary", "Dashboard Summary", SQL_DASHBOARD_SUMMARY, DASHBOARD_SUMMARY_PARAMS,
+             DASHBOARD_COLUMNS)]
+
+
+def run_dashboard_queries(queries, timeout_ms=QUERY_TIMEOUT_MS):
+    """Run queries concurrently; returns (answers, whether every query answered).
+
+    Each query runs with statement_timeout set to timeout_ms, so the server
+    cancels it that long after it starts, however long it queued for a
+    thread or a connection. A query that fails or is cancelled leaves its
+    columns at 0. A single query runs on the calling thread.
+    """
+    data = dict.fromkeys(DASHBOARD_COLUMNS, 0)
+    if len(queries) == 1:
+        name, description, statement, params, _ = queries[0]
+        results = execute_query(name, statement, params, description, timeout_ms)
+        if results:
+            data.update(results[0])
+        return data, bool(results)
+    futures = {
+        FANOUT.submit(execute_query, name, statement, params, description, timeout_ms):
+            (description, columns)
+        for name, description, statement, params, columns in queries
+    }
+    complete = True
+    for future, (_, columns) in futures.items():
+        results = future.result()
+        if results:
+            data.update((column, results[0][column]) for column in columns)
+        else:
+            complete = False
+    return data, complete
 
 
 def get_all_analysis_data():
-    """Get all analysis data by running each composed SQL statement with placeholders."""
-    data = {}
-
-    # Query 1
-    res1 = execute_query(SQL_FALL_2024_COUNT, ('Fall 2024',), "Fall 2024 Count")
-    data['fall_2024_count'] = res1[0]['fall_2024_count'] if res1 else 0
-
-    # Query 2
-    res2 = execute_query(
-        SQL_INTERNATIONAL_PERCENTAGE,
-        ('International', 'International'),
-        "International Percentage"
-    )
-    if res2:
-        data['total_entries'] = res2[0]['total_entries']
-        data['international_entries'] = res2[0]['international_entries']
-        data['international_percentage'] = res2[0]['international_percentage']
-    else:
-        data.update({
-            'total_entries': 0,
-            'international_entries': 0,
-            'international_percentage': 0
-        })
-
-    # Query 3
-    res3 = execute_query(SQL_AVERAGE_SCORES, None, "Average Scores")
-    if res3:
-        data.update({
-            'avg_gpa': res3[0]['avg_gpa'],
-            'avg_gre_quant': res3[0]['avg_gre_quant'],
-            'avg_gre_verbal': res3[0]['avg_gre_verbal'],
-            'avg_gre_writing': res3[0]['avg_gre_writing']
-        })
-    else:
-        data.update({
-            'avg_gpa': 0,
-            'avg_gre_quant': 0,
-            'avg_gre_verbal': 0,
-            'avg_gre_writing': 0
-        })
-
-    # Query 4
-    res4 = execute_query(
-        SQL_AVG_GPA_AMERICAN_FALL2024,
-        ('American', 'Fall 2024'),
-        "American GPA Fall 2024"
-    )
-    data['avg_gpa_american_fall2024'] = res4[0]['avg_gpa_american_fall2024'] if res4 else 0
-
-    # Query 5
-    res5 = execute_query(
-        SQL_ACCEPTANCE_RATE,
-        ('%Accept%', 'Fall 2024'),
-        "Fall 2024 Acceptance Rate"
-    )
-    data['acceptance_percentage'] = res5[0]['acceptance_percentage'] if res5 else 0
-
-    # Query 6
-    res6 = execute_query(
-        SQL_AVG_GPA_ACCEPTED_FALL2024,
-        ('Fall 2024', '%Accept%'),
-        "Accepted GPA Fall 2024"
-    )
-    data['avg_gpa_accepted_fall2024'] = res6[0]['avg_gpa_accepted_fall2024'] if res6 else 0
-
-    # Query 7
-    res7 = execute_query(
-        SQL_JHU_CS_MASTERS_COUNT,
-        ('%johns hopkins%', '%jhu%', '%computer science%', '%masters%'),
-        "JHU CS Masters"
-    )
-    data['jhu_cs_masters_count'] = res7[0]['jhu_cs_masters_count'] if res7 else 0
-
-    return data
+    """Get all analysis data, from the cache unless a load has changed it.
+
+    Answers from a page where some query failed are shown but not cached.
+    """
+    partial = {}
+
+    def fetch():
+        data, complete = run_dashboard_queries(dashboard_queries())
+        if complete:
+            return data
+        partial.update(data)
+        return None
+
+    return (CACHE.get_or_compute(DASHBOARD_MODE, fetch) or partial
+            or dict.fromkeys(DASHBOARD_COLUMNS, 0))
 
 
 @app.route('/')
@@ -176,6 +154,267 @@ def index():
         return f"Error loading data: {err}", 500
 
 
+@app.route('/statements')
+def statement_stats():
+    """Call counts and timings of the prepared statements, and cache hits, as JSON."""
+    return jsonify({**STATEMENTS.stats(),
+                    'cache': {'hits': CACHE.hits, 'misses': CACHE.misses}})
+
+
+def json_response(body, status=200):
+    """Compact JSON, with NUMERIC values as numbers."""
+    def encode(value):
+        return float(value) if isinstance(value, Decimal) else str(value)
+    text = json.dumps(body, separators=(',', ':'), default=encode)
+    return Response(text, status=status, mimetype='application/json')
+
+
+def stats_filters(args):
+    """{dimension: value} from the query string; raises ValueError for a bad one."""
+    filters = {}
+    for name, value in args.items():
+        if name not in STATS_DIMENSIONS:
+            raise ValueError(f"unknown filter {name!r}; use {', '.join(STATS_DIMENSIONS)}")
+        allowed = STATS_DIMENSIONS[name][1]
+        if allowed is not None and value not in allowed:
+            raise ValueError(f"{name} must be one of {', '.join(allowed)}")
+        if not value.strip():
+            raise ValueError(f"{name} is empty")
+        filters[name] = value
+    return filters
+
+
+def revalidate(key):
+    """(data version, strong ETag for key at it, 304 response if the client has it).
+
+    A request with If-None-Match reads the data version afresh rather than
+    trusting the one the cache keeps for up to cache.VERSION_TTL, so it is never
+    told 304 for data a load has just changed. Without a readable data
+    version there is no ETag and nothing is 304.
+    """
+    version = CACHE.version(fresh=bool(request.if_none_match))
+    if version is None:
+        return None, None, None
+    etag = f"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return version, etag, response
+    return version, etag, None
+
+
+def tagged(response, etag):
+    """response with etag, to be revalidated before each reuse."""
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/stats')
+@app.route('/api/stats/by/<dimension>')
+def api_stats(dimension=None):
+    """Application counts, acceptance and nationality shares and average scores, as JSON.
+
+    Filters are query parameters (term, status, nationality, degree,
+    institution); /api/stats/by/<dimension> returns one object per value
+    of that dimension. The strong ETag changes only when the data version
+    does, so If-None-Match revalidation is answered without a query.
+    """
+    try:
+        if dimension is not None and dimension not in STATS_DIMENSIONS:
+            raise ValueError(f"cannot group by {dimension!r}; use {', '.join(STATS_DIMENSIONS)}")
+        filters = stats_filters(request.args)
+    except ValueError as err:
+        return json_response({'error': str(err)}, 400)
+
+    key = json.dumps([dimension, sorted(filters.items())], separators=(',', ':'))
+    version, etag, not_modified = revalidate(key)
+    if not_modified:
+        return not_modified
+
+    name = '_'.join(['stats', *sorted(filters)] + (['by', dimension] if dimension else []))
+    statement, params = build_stats_query(filters, dimension)
+    rows = CACHE.get_or_compute(f"api:{key}", lambda: execute_query(
+        name, statement, params, "Stats API", QUERY_TIMEOUT_MS))
+    if rows is None:
+        return json_response({'error': 'statistics are unavailable'}, 503)
+    body = {'filters': filters, 'version': version}
+    if dimension:
+        body['groups'] = [dict(row) for row in rows]
+    else:
+        body['stats'] = dict(rows[0])
+    return tagged(json_response(body), etag)
+
+
+def distribution_args(score, args):
+    """(filters, percentile points, bin width) for /api/distribution; raises ValueError."""
+    args = dict(args)
+    if score not in SCORE_BINS:
+        raise ValueError(f"unknown score {score!r}; use {', '.join(SCORE_BINS)}")
+    fine_width, width = SCORE_BINS[score][0], args.pop('width', SCORE_BINS[score][1])
+    try:
+        points = [float(point) for point in args.pop('percentiles', '10,25,50,75,90').split(',')]
+    except ValueError as err:
+        raise ValueError("percentiles must be comma-separated numbers") from err
+    if not all(0 <= point <= 100 for point in points):
+        raise ValueError("percentiles must be between 0 and 100")
+    filters = stats_filters(args)
+    if set(filters) - set(DISTRIBUTION_DIMENSIONS):
+        raise ValueError(f"distributions are kept per {', '.join(DISTRIBUTION_DIMENSIONS)}")
+    histogram(((0, 0),), fine_width, width)  # checks width
+    return filters, points, width
+
+
+@app.route('/api/distribution/<score>')
+def api_distribution(score):
+    """Percentiles and a histogram of one score (gpa, gre, gre_v, gre_aw), as JSON.
+
+    Filters are term, status and degree. percentiles is a comma-separated
+    list (default 10,25,50,75,90) and width the histogram's bin width. The
+    answer is merged from the precomputed histogram segments, so no
+    application row is read; percentiles are exact to one fine bin.
+    """
+    try:
+        filters, points, width = distribution_args(score, request.args)
+    except ValueError as err:
+        return json_response({'error': str(err)}, 400)
+
+    key = json.dumps([score, sorted(filters.items())], separators=(',', ':'))
+    version, etag, not_modified = revalidate(f"{key}:{points}:{width}")
+    if not_modified:
+        return not_modified
+    statement, params = build_distribution_query(score, filters)
+    name = '_'.join(['distribution', *sorted(filters)])
+    rows = CACHE.get_or_compute(f"distribution:{key}", lambda: execute_query(
+        name, statement, params, "Distribution API", QUERY_TIMEOUT_MS))
+    if rows is None:
+        return json_response({'error': 'distributions are unavailable'}, 503)
+    bins = [(row['bin'], row['count']) for row in rows]
+    fine_width = SCORE_BINS[score][0]
+    return tagged(json_response({
+        'score': score,
+        'filters': filters,
+        'version': version,
+        'count': sum(count for _, count in bins),
+        'percentiles': {f"p{point:g}": value
+                        for point, value in percentiles(bins, fine_width, points).items()},
+        'histogram': histogram(bins, fine_width, width),
+    }), etag)
+
+
+def paging_args(args):
+    """(filters, after, limit) from the /records query string; raises ValueError."""
+    try:
+        after = int(args.get('after', 0))
+        limit = int(args.get('limit', RECORDS_PAGE_SIZE))
+    except ValueError as err:
+        raise ValueError("after and limit must be integers") from err
+    if not 1 <= limit <= RECORDS_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {RECORDS_MAX_PAGE_SIZE}")
+    filters = stats_filters({name: value for name, value in args.items()
+                             if name not in ('after', 'limit')})
+    return filters, after, limit
+
+
+@app.route('/records')
+def records():
+    """One page of application rows as JSON, in p_id order.
+
+    Takes the /api/stats filters plus after (the last p_id already seen)
+    and limit. next_after is the value of after for the following page, or
+    null on the last one.
+    """
+    try:
+        filters, after, limit = paging_args(request.args)
+    except ValueError as err:
+        return json_response({'error': str(err)}, 400)
+    statement, params = build_records_query(filters, limit=True)
+    name = '_'.join(['records', *sorted(filters)])
+    rows = execute_query(name, statement, (after,) + params + (limit,), "Records",
+                         QUERY_TIMEOUT_MS)
+    if rows is None:
+        return json_response({'error': 'records are unavailable'}, 503)
+    return json_response({
+        'records': [dict(row) for row in rows],
+        'next_after': rows[-1]['p_id'] if len(rows) == limit else None,
+    })
+
+
+def csv_chunks(cur):
+    """CSV text for the rows of an executed cursor, a fetch at a time, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RECORD_COLUMNS)
+    while True:
+        rows = cur.fetchmany(EXPORT_FETCH_SIZE)
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if not rows:
+            return
+
+
+def gzip_chunks(chunks):
+    """chunks of text as one gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip header
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode())
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+
+@app.route('/export.csv')
+def export_csv():
+    """Every row matching the /api/stats filters as CSV, streamed in p_id order.
+
+    Rows come from a server-side cursor EXPORT_FETCH_SIZE at a time, so
+    memory use does not depend on the size of the export. The body is
+    gzip-compressed for clients that accept it.
+    """
+    try:
+        filters = stats_filters(request.args)
+    except ValueError as err:
+        return json_response({'error': str(err)}, 400)
+    statement, params = build_records_query(filters)
+    try:
+        conn = POOL.getconn()
+    except psycopg2.Error as err:
+        print(f"Error exporting records: {err}")
+        return json_response({'error': 'export is unavailable'}, 503)
+    # the connection stays checked out until the last row has been sent
+    cur = conn.cursor(name='records_export')
+    try:
+        cur.execute(statement, (0,) + params)
+    except psycopg2.Error as err:
+        print(f"Error exporting records: {err}")
+        POOL.putconn(conn)
+        return json_response({'error': 'export is unavailable'}, 503)
+
+    def rows():
+        try:
+            yield from csv_chunks(cur)
+        except psycopg2.Error as err:
+            # too late for an error status; the client sees a truncated file
+            print(f"Error exporting records: {err}")
+
+    headers = {'Content-Disposition': 'attachment; filename=application_data.csv',
+               'Vary': 'Accept-Encoding'}
+    body = rows()
+    if 'gzip' in request.accept_encodings:
+        body = gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+    response = Response(body, mimetype='text/csv', headers=headers)
+    # also called when the client goes away mid-stream or before it starts
+    response.call_on_close(lambda: POOL.putconn(conn))
+    return response
+
+
 @app.errorhandler(404)
 def not_found(_error):
     """Handle 404 errors."""
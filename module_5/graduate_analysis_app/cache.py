@@ -0,0 +1,192 @@
+"""Dashboard result cache, invalidated by the data version load_data.py bumps.
+
+Results are cached under their name and the current data version, so a load
+makes every older entry unreachable at once; a TTL bounds how long a result
+can be served regardless. The version itself is read through a callable
+and remembered for version_ttl seconds (see DataVersion), so a burst of
+requests costs one version lookup, not one each.
+
+Two backends share one interface (get, set, clear):
+
+- MemoryBackend: per process, LRU-bounded to max_entries.
+- SQLiteBackend: one file shared by every worker process on the host, so
+  several app workers compute a result once between them.
+
+Misses are single-flight within a process: while one thread computes a
+result the others asking for it wait for that result instead of running the
+queries again.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+TTL = 300.0  # seconds a result may be served
+VERSION_TTL = 2.0  # seconds the data version is trusted before it is read again
+MAX_ENTRIES = 128
+
+
+class MemoryBackend:
+    """An in-process LRU map of key -> (expiry time, value)."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The value stored under key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """Entries in a SQLite file that worker processes on one host share."""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL)"
+            )
+
+    def _connect(self):
+        """This thread's connection to the cache file."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """The value stored under key, or None if it is missing or expired."""
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds; expired and surplus entries go."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, now + ttl, pickle.dumps(value)),
+            )
+            conn.execute(
+                "DELETE FROM cache WHERE expires <= ? OR key NOT IN "
+                "(SELECT key FROM cache ORDER BY expires DESC LIMIT ?)",
+                (now, self.max_entries),
+            )
+
+    def clear(self):
+        """Drop every entry."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class DataVersion:
+    """A data version read through a callable and trusted for ttl seconds."""
+
+    def __init__(self, read=None, ttl=VERSION_TTL):
+        self.read = read
+        self.ttl = ttl
+        self._value = (None, 0.0)  # (version, monotonic time it was read)
+
+    def get(self, fresh=False):
+        """The version, read again once ttl has passed or now if fresh; None without a callable."""
+        value, read_at = self._value
+        if self.read is None:
+            return None
+        if fresh or time.monotonic() - read_at >= self.ttl:
+            value = self.read()
+            self._value = (value, time.monotonic())
+        return value
+
+    def forget(self):
+        """Read the version again on the next get()."""
+        self._value = (None, 0.0)
+
+
+class ResultCache:
+    """Results keyed by name and data version, computed once per miss."""
+
+    def __init__(self, backend, version=None, ttl=TTL, version_ttl=VERSION_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._version = DataVersion(version, version_ttl)
+        self._flights = {}  # key -> Event set when the computing thread is done
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def version(self, fresh=False):
+        """The data version, read again once version_ttl has passed, or now if fresh."""
+        return self._version.get(fresh)
+
+    def get_or_compute(self, name, compute):
+        """The cached result for name at the current data version, else compute().
+
+        A compute() returning None (a failed query) is passed on but not
+        cached, so the next request tries again.
+        """
+        key = f"{name}@{self.version()}"
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = threading.Event()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            flight.wait()
+            value = self.backend.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            # the leader's query failed; try once more rather than queue behind it
+            return compute()
+        try:
+            self.misses += 1
+            value = compute()
+            if value is not None:
+                self.backend.set(key, value, self.ttl)
+            return value
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.set()
+
+    def invalidate(self):
+        """Forget every result and re-read the data version on the next request."""
+        self._version.forget()
+        self.backend.clear()
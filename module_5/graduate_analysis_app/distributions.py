@@ -0,0 +1,49 @@
+"""Percentiles and histograms from the fine score bins of application_data_histogram.
+
+The loader keeps a count of scores per bin of width w (bin b holds scores
+in [b*w, (b+1)*w)) for every term, decision and degree level. Merging any
+set of those segments is adding counts bin by bin, and the functions here
+work on the merged (bin, count) pairs, sorted by bin. A percentile is
+interpolated within the bin it falls in, so it is exact to within one
+bin width; a histogram regroups the bins into wider ones.
+"""
+
+from decimal import Decimal
+
+
+def percentile(bins, width, fraction):
+    """The score below which fraction (0 to 1) of the counted scores fall, or None."""
+    total = sum(count for _, count in bins)
+    if not total:
+        return None
+    target = Decimal(str(fraction)) * total
+    below = 0
+    for number, count in bins:
+        if count and below + count >= target:
+            return round(float((number + (target - below) / count) * Decimal(width)), 4)
+        below += count
+    number = bins[-1][0]
+    return float((number + 1) * Decimal(width))
+
+
+def percentiles(bins, width, points):
+    """{point: score} for percentile points between 0 and 100."""
+    return {point: percentile(bins, width, Decimal(str(point)) / 100) for point in points}
+
+
+def histogram(bins, width, out_width):
+    """[{'from', 'to', 'count'}] in out_width bins; out_width is a multiple of width."""
+    try:
+        width, out_width = Decimal(width), Decimal(out_width)
+        factor = out_width / width
+    except ArithmeticError as err:
+        raise ValueError(f"histogram width must be a number, got {out_width!r}") from err
+    if not factor.is_finite() or factor < 1 or factor != factor.to_integral_value():
+        raise ValueError(f"histogram width must be a multiple of {width}")
+    merged = {}
+    for number, count in bins:
+        merged[number // int(factor)] = merged.get(number // int(factor), 0) + count
+    return [
+        {"from": float(group * out_width), "to": float((group + 1) * out_width), "count": count}
+        for group, count in sorted(merged.items()) if count
+    ]
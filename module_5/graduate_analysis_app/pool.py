@@ -0,0 +1,207 @@
+"""Thread-safe PostgreSQL connection pool shared by app.py and query_data.py.
+
+Connections are opened on demand up to max_size and kept for reuse, at
+least min_size of them once the pool has been used. Each is opened with a
+server-side statement_timeout, so a runaway query fails with an error the
+callers already handle instead of holding a connection indefinitely. A
+connection that has sat idle longer than ping_after seconds is checked
+with SELECT 1 before it is handed out, and replaced if the check fails.
+
+    POOL = ConnectionPool(DB_CONFIG)
+    with POOL.connection() as conn:
+        ...
+
+DirectConnections has the same interface but opens and closes a
+connection on every use, as the app did before; bench_pool.py compares
+the two.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+MIN_SIZE = 1
+MAX_SIZE = 10
+STATEMENT_TIMEOUT_MS = 5000
+CHECKOUT_TIMEOUT = 10.0  # seconds to wait for a free connection
+PING_AFTER = 30.0  # idle seconds after which a connection is checked on checkout
+
+
+def connect(config, statement_timeout_ms=STATEMENT_TIMEOUT_MS):
+    """Open a connection with statement_timeout set for its whole session."""
+    if statement_timeout_ms is None:
+        return psycopg2.connect(**config)
+    options = f"{config.get('options', '')} -c statement_timeout={int(statement_timeout_ms)}"
+    return psycopg2.connect(**{**config, "options": options.strip()})
+
+
+def is_healthy(conn):
+    """True if conn is open and answers SELECT 1."""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+            cur.fetchone()
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _close_quietly(conn):
+    """Close conn, ignoring errors from a connection that is already broken."""
+    try:
+        conn.close()
+    except psycopg2.Error:
+        pass
+
+
+class ConnectionPool:
+    """A bounded pool of connections to one database, safe to share between threads."""
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, config, *, min_size=MIN_SIZE, max_size=MAX_SIZE,
+                 statement_timeout_ms=STATEMENT_TIMEOUT_MS, checkout_timeout=CHECKOUT_TIMEOUT,
+                 ping_after=PING_AFTER):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"need 0 <= min_size <= max_size and max_size >= 1, "
+                             f"got {min_size} and {max_size}")
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_timeout_ms = statement_timeout_ms
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self._idle = deque()  # (connection, time it was returned)
+        self._size = 0  # connections open, idle or checked out
+        self._closed = False
+        self._lock = threading.Condition()
+
+    def _open(self):
+        """A new connection for a slot already counted in _size."""
+        try:
+            return connect(self.config, self.statement_timeout_ms)
+        except psycopg2.Error:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def _discard(self, conn):
+        """Close conn and free its slot."""
+        _close_quietly(conn)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to checkout_timeout for one.
+
+        Raises psycopg2.pool.PoolError if none frees up in time, or the
+        psycopg2.Error from connecting.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            with self._lock:
+                while not self._idle and self._size >= self.max_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(f"no connection free within {self.checkout_timeout}s "
+                                        f"({self.max_size} in use)")
+                    self._lock.wait(remaining)
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn, returned = self._idle.pop()
+                else:
+                    self._size += 1  # a slot for the connection opened below
+                    conn, returned = None, None
+            if conn is None:
+                return self._open()
+            if not conn.closed and (time.monotonic() - returned < self.ping_after
+                                    or is_healthy(conn)):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn):
+        """Return a checked-out connection; broken ones are closed instead of kept."""
+        try:
+            if not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            pass
+        if conn.closed or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            self._discard(conn)
+            return
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    def fill(self):
+        """Open connections until min_size are open."""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            self.putconn(self._open())
+
+    @contextmanager
+    def connection(self):
+        """A pooled connection for the duration of a with block.
+
+        Whatever transaction the block leaves open is rolled back when the
+        connection goes back to the pool, so commit anything to be kept.
+        """
+        if self._size < self.min_size:
+            self.fill()
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def stats(self):
+        """(connections open, connections idle)."""
+        with self._lock:
+            return self._size, len(self._idle)
+
+    def close(self):
+        """Close the idle connections; checked-out ones are closed as they come back."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+
+class DirectConnections:
+    """ConnectionPool's interface without the pool: a new connection for every use."""
+
+    def __init__(self, config, statement_timeout_ms=STATEMENT_TIMEOUT_MS):
+        self.config = config
+        self.statement_timeout_ms = statement_timeout_ms
+
+    @contextmanager
+    def connection(self):
+        """A fresh connection, closed after the with block."""
+        conn = connect(self.config, self.statement_timeout_ms)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        """Nothing is kept open."""
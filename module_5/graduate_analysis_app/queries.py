@@ -0,0 +1,320 @@
+"""Composed SQL for the seven dashboard answers, shared by app.py, check_plans.py, query_data.py.
+
+The filters use the coded columns added by schema.py (decision, origin,
+degree_level), which the dashboard indexes are built on, instead of LIKE
+patterns over the free-text columns, and the program_name / institution
+columns the loader splits out of program.
+
+The page itself gets every answer from one statement built by
+build_dashboard_query(), which reads the rollups load_data.py maintains,
+so its cost does not grow with application_data. The seven SQL_*
+statements stay available for ad-hoc use and plan checks.
+"""
+
+from psycopg2 import sql
+
+# Composed SQL statements with identifiers, placeholders, and inherent limits
+TABLE = sql.Identifier('application_data')
+
+FALL_2024 = 'Fall 2024'
+INTERNATIONAL = 'International'
+AMERICAN = 'American'
+ACCEPTED = 'Accepted'
+MASTERS = 'Masters'
+JHU_PATTERNS = ('%johns hopkins%', '%jhu%')
+CS_PATTERN = '%computer science%'
+JHU_CS_PATTERNS = JHU_PATTERNS + (CS_PATTERN,)
+
+SQL_FALL_2024_COUNT = sql.SQL(
+    "SELECT COUNT(*) AS fall_2024_count FROM {tbl} WHERE term = %s LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_INTERNATIONAL_PERCENTAGE = sql.SQL(
+    "SELECT "
+    "COUNT(*) AS total_entries, "
+    "COUNT(CASE WHEN origin = %s THEN 1 END) AS international_entries, "
+    "ROUND((COUNT(CASE WHEN origin = %s THEN 1 END) * 100.0 / COUNT(*)), 2) "
+    "AS international_percentage FROM {tbl} LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_AVERAGE_SCORES = sql.SQL(
+    "SELECT "
+    "ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa, "
+    "ROUND(AVG(gre)::NUMERIC, 2) AS avg_gre_quant, "
+    "ROUND(AVG(gre_v)::NUMERIC, 2) AS avg_gre_verbal, "
+    "ROUND(AVG(gre_aw)::NUMERIC, 2) AS avg_gre_writing "
+    "FROM {tbl} LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_AVG_GPA_AMERICAN_FALL2024 = sql.SQL(
+    "SELECT ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa_american_fall2024 "
+    "FROM {tbl} WHERE origin = %s AND term = %s AND gpa IS NOT NULL LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_ACCEPTANCE_RATE = sql.SQL(
+    "SELECT ROUND((COUNT(CASE WHEN decision = %s THEN 1 END) * 100.0 / COUNT(*))::NUMERIC, 2) "
+    "AS acceptance_percentage FROM {tbl} WHERE term = %s LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_AVG_GPA_ACCEPTED_FALL2024 = sql.SQL(
+    "SELECT ROUND(AVG(gpa)::NUMERIC, 2) AS avg_gpa_accepted_fall2024 "
+    "FROM {tbl} WHERE term = %s AND decision = %s AND gpa IS NOT NULL LIMIT 1"
+).format(tbl=TABLE)
+
+SQL_JHU_CS_MASTERS_COUNT = sql.SQL(
+    "SELECT COUNT(*) AS jhu_cs_masters_count FROM {tbl} "
+    "WHERE (institution ILIKE %s OR institution ILIKE %s) "
+    "AND program_name ILIKE %s AND degree_level = %s LIMIT 1"
+).format(tbl=TABLE)
+
+# (description, statement, parameters), in the order the page shows them
+DASHBOARD_QUERIES = (
+    ("Fall 2024 Count", SQL_FALL_2024_COUNT, (FALL_2024,)),
+    ("International Percentage", SQL_INTERNATIONAL_PERCENTAGE, (INTERNATIONAL, INTERNATIONAL)),
+    ("Average Scores", SQL_AVERAGE_SCORES, None),
+    ("American GPA Fall 2024", SQL_AVG_GPA_AMERICAN_FALL2024, (AMERICAN, FALL_2024)),
+    ("Fall 2024 Acceptance Rate", SQL_ACCEPTANCE_RATE, (ACCEPTED, FALL_2024)),
+    ("Accepted GPA Fall 2024", SQL_AVG_GPA_ACCEPTED_FALL2024, (FALL_2024, ACCEPTED)),
+    ("JHU CS Masters", SQL_JHU_CS_MASTERS_COUNT, JHU_CS_PATTERNS + (MASTERS,)),
+)
+
+# description -> the dashboard columns that query answers
+DASHBOARD_QUERY_COLUMNS = {
+    "Fall 2024 Count": ("fall_2024_count",),
+    "International Percentage": ("total_entries", "international_entries",
+                                 "international_percentage"),
+    "Average Scores": ("avg_gpa", "avg_gre_quant", "avg_gre_verbal", "avg_gre_writing"),
+    "American GPA Fall 2024": ("avg_gpa_american_fall2024",),
+    "Fall 2024 Acceptance Rate": ("acceptance_percentage",),
+    "Accepted GPA Fall 2024": ("avg_gpa_accepted_fall2024",),
+    "JHU CS Masters": ("jhu_cs_masters_count",),
+}
+
+# Every dashboard metric as (alias, score to average or None to count applications,
+# FILTER condition or None, condition parameters), under the suffix of the rollup
+# whose keys the conditions use: {table}_rollup and {table}_program_rollup, created
+# by schema.py and kept current by load_data.py. The conditions hold on the table too.
+DASHBOARD_METRICS = {
+    "rollup": (
+        ("total_entries", None, None, ()),
+        ("fall_2024_count", None, "term = %s", (FALL_2024,)),
+        ("international_entries", None, "origin = %s", (INTERNATIONAL,)),
+        ("fall_2024_accepted", None, "decision = %s AND term = %s", (ACCEPTED, FALL_2024)),
+        ("avg_gpa", "gpa", None, ()),
+        ("avg_gre_quant", "gre", None, ()),
+        ("avg_gre_verbal", "gre_v", None, ()),
+        ("avg_gre_writing", "gre_aw", None, ()),
+        ("avg_gpa_american_fall2024", "gpa", "origin = %s AND term = %s", (AMERICAN, FALL_2024)),
+        ("avg_gpa_accepted_fall2024", "gpa", "decision = %s AND term = %s",
+         (ACCEPTED, FALL_2024)),
+    ),
+    "program_rollup": (
+        ("jhu_cs_masters_count", None,
+         "degree_level = %s AND program_name ILIKE %s "
+         "AND (institution ILIKE %s OR institution ILIKE %s)",
+         (MASTERS, CS_PATTERN) + JHU_PATTERNS),
+    ),
+}
+
+# (alias, numerator metric, denominator metric), as a percentage to two places
+DASHBOARD_PERCENTAGES = (
+    ("international_percentage", "international_entries", "total_entries"),
+    ("acceptance_percentage", "fall_2024_accepted", "fall_2024_count"),
+)
+
+DASHBOARD_COLUMNS = tuple(
+    [metric[0] for metrics in DASHBOARD_METRICS.values() for metric in metrics]
+    + [percentage[0] for percentage in DASHBOARD_PERCENTAGES]
+)
+
+
+def metric_expression(score, condition, values, rollup):
+    """(aggregate, params) for one metric, over a rollup or over application_data rows."""
+    if condition:
+        where, values = sql.SQL(" FILTER (WHERE {})").format(sql.SQL(condition)), tuple(values)
+    else:
+        where, values = sql.SQL(""), ()
+    if score is None and rollup:
+        return sql.SQL("COALESCE(SUM(applications){}, 0)::BIGINT").format(where), values
+    if score is None:
+        return sql.SQL("COUNT(*){}").format(where), values
+    if rollup:
+        # the condition filters both the sum and the count
+        return sql.SQL("ROUND(SUM({total}){where} / NULLIF(SUM({count}){where}, 0), 2)").format(
+            total=sql.Identifier(f"{score}_sum"), count=sql.Identifier(f"{score}_count"),
+            where=where), values * 2
+    return sql.SQL("ROUND((AVG({}){})::NUMERIC, 2)").format(sql.Identifier(score), where), values
+
+
+def metric_columns(metrics, rollup):
+    """(["aggregate AS alias", ...], params) for (alias, score, condition, values) metrics."""
+    columns, params = [], []
+    for alias, score, condition, values in metrics:
+        expression, values = metric_expression(score, condition, values, rollup)
+        columns.append(sql.SQL("{} AS {}").format(expression, sql.Identifier(alias)))
+        params.extend(values)
+    return columns, params
+
+
+def percentage_columns(percentages):
+    """", ROUND(...) AS alias" for each (alias, numerator, denominator), joined."""
+    return sql.SQL("").join(
+        sql.SQL(", ROUND({} * 100.0 / NULLIF({}, 0), 2) AS {}").format(
+            sql.Identifier(numerator), sql.Identifier(denominator), sql.Identifier(alias))
+        for alias, numerator, denominator in percentages
+    )
+
+
+def build_dashboard_query(metrics=None, percentages=DASHBOARD_PERCENTAGES, rollups=True,
+                          table="application_data"):
+    """(statement, params) computing every dashboard metric in one statement.
+
+    Each group of metrics is read from its rollup of table, so the cost depends
+    on the number of groups rather than of applications. With rollups=False they all
+    come from a single pass over application_data instead, each an aggregate
+    with its own FILTER clause. Percentages are derived in the outer SELECT.
+    """
+    metrics = DASHBOARD_METRICS if metrics is None else metrics
+    if rollups:
+        sources = [(f"{table}_{suffix}", group) for suffix, group in metrics.items()]
+    else:
+        sources = [(table, [metric for group in metrics.values() for metric in group])]
+    subqueries, params = [], []
+    for position, (source, group) in enumerate(sources):
+        columns, values = metric_columns(group, rollups)
+        subqueries.append(sql.SQL("(SELECT {} FROM {}) AS {}").format(
+            sql.SQL(", ").join(columns), sql.Identifier(source),
+            sql.Identifier(f"totals_{position}")))
+        params.extend(values)
+    statement = sql.SQL("SELECT *{} FROM {}").format(
+        percentage_columns(percentages), sql.SQL(", ").join(subqueries))
+    return statement, tuple(params)
+
+
+SQL_DASHBOARD_SUMMARY, DASHBOARD_SUMMARY_PARAMS = build_dashboard_query()
+
+# /api/stats: filter or group name -> (column, allowed values or None for any).
+# The first four are keys of {table}_rollup; institution is only in the table.
+STATS_DIMENSIONS = {
+    "term": ("term", None),
+    "status": ("decision", ("Accepted", "Rejected", "Wait listed", "Interview", "Other")),
+    "nationality": ("origin", ("American", "International", "Other")),
+    "degree": ("degree_level", ("Masters", "PhD", "Other")),
+    "institution": ("institution", None),
+}
+ROLLUP_DIMENSIONS = {"term", "status", "nationality", "degree"}
+
+# Every /api/stats metric, as in DASHBOARD_METRICS, within the filtered rows
+STATS_METRICS = (
+    ("applications", None, None, ()),
+    ("accepted", None, "decision = %s", (ACCEPTED,)),
+    ("international", None, "origin = %s", (INTERNATIONAL,)),
+    ("avg_gpa", "gpa", None, ()),
+    ("avg_gre_quant", "gre", None, ()),
+    ("avg_gre_verbal", "gre_v", None, ()),
+    ("avg_gre_writing", "gre_aw", None, ()),
+)
+STATS_PERCENTAGES = (
+    ("acceptance_percentage", "accepted", "applications"),
+    ("international_percentage", "international", "applications"),
+)
+
+
+def like_pattern(term):
+    """'%term%' for ILIKE, with LIKE wildcards in term matched literally."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def filter_condition(filters):
+    """(condition, params) matching the rows selected by STATS_DIMENSIONS filters."""
+    conditions, params = [], []
+    for name in sorted(filters):
+        column = sql.Identifier(STATS_DIMENSIONS[name][0])
+        if name == "institution":
+            conditions.append(sql.SQL("{} ILIKE %s").format(column))
+            params.append(like_pattern(filters[name]))
+        else:
+            conditions.append(sql.SQL("{} = %s").format(column))
+            params.append(filters[name])
+    return sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("TRUE"), params
+
+
+def build_stats_query(filters, group_by=None, table="application_data"):
+    """(statement, params) for STATS_METRICS over the rows matching filters.
+
+    filters maps STATS_DIMENSIONS names to values (institution is matched as
+    a case-insensitive substring); with group_by, one row per value of that
+    dimension, in its order. The query reads table's rollup unless a filter
+    or the grouping needs the institution column.
+    """
+    rollup = set(filters).union([group_by] if group_by else []) <= ROLLUP_DIMENSIONS
+    where, params = filter_condition(filters)
+    columns, metric_params = metric_columns(STATS_METRICS, rollup)
+    if group_by:
+        columns.insert(0, sql.SQL("COALESCE({}::TEXT, '') AS {}").format(
+            sql.Identifier(STATS_DIMENSIONS[group_by][0]), sql.Identifier(group_by)))
+    statement = sql.SQL("SELECT *{} FROM (SELECT {} FROM {} WHERE {}{}) AS totals{}").format(
+        percentage_columns(STATS_PERCENTAGES),
+        sql.SQL(", ").join(columns),
+        sql.Identifier(f"{table}_rollup" if rollup else table),
+        where,
+        sql.SQL(" GROUP BY 1") if group_by else sql.SQL(""),
+        sql.SQL(" ORDER BY 1") if group_by else sql.SQL(""),
+    )
+    # the metrics' FILTER parameters come before the WHERE clause's
+    return statement, tuple(metric_params + params)
+
+# The change counter load_data.py bumps with every load, for the result cache
+SQL_DATA_VERSION = sql.SQL("SELECT version FROM data_version WHERE table_name = %s")
+DATA_VERSION_PARAMS = ('application_data',)
+
+
+# /records and /export.csv: what each application row shows, p_id first
+RECORD_COLUMNS = (
+    "p_id", "program_name", "institution", "degree", "term", "status", "us_or_international",
+    "gpa", "gre", "gre_v", "gre_aw", "date_added", "url", "comments",
+)
+
+
+def build_records_query(filters, limit=False, table="application_data"):
+    """(statement, params) for RECORD_COLUMNS of rows matching filters, in p_id order.
+
+    Rows start after a given p_id (keyset pagination, served by the primary
+    key). The params returned are the filter values only: callers put that
+    p_id before them and, with limit, the page size after them.
+    """
+    where, params = filter_condition(filters)
+    statement = sql.SQL("SELECT {} FROM {} WHERE p_id > %s AND {} ORDER BY p_id{}").format(
+        sql.SQL(", ").join(map(sql.Identifier, RECORD_COLUMNS)),
+        sql.Identifier(table),
+        where,
+        sql.SQL(" LIMIT %s") if limit else sql.SQL(""),
+    )
+    return statement, tuple(params)
+
+
+# /api/distribution: score -> (bin width of {table}_histogram, as schema.HISTOGRAM_BINS;
+# default width of the histograms served, a multiple of it)
+SCORE_BINS = {
+    "gpa": ("0.01", "0.1"),
+    "gre": ("1", "5"),
+    "gre_v": ("1", "5"),
+    "gre_aw": ("0.1", "0.5"),
+}
+# the keys of {table}_histogram, as STATS_DIMENSIONS names
+DISTRIBUTION_DIMENSIONS = ("term", "status", "degree")
+
+
+def build_distribution_query(score, filters, table="application_data"):
+    """(statement, params) for the (bin, count) pairs of score over the filtered segments.
+
+    The segments of {table}_histogram that match filters are merged by
+    adding their counts bin by bin; application_data is not read.
+    """
+    where, params = filter_condition(filters)
+    statement = sql.SQL(
+        "SELECT bin::BIGINT AS bin, SUM(applications)::BIGINT AS count FROM {} "
+        "WHERE score = %s AND {} GROUP BY 1 ORDER BY 1"
+    ).format(sql.Identifier(f"{table}_histogram"), where)
+    return statement, (score,) + tuple(params)
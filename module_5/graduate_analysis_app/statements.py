@@ -0,0 +1,152 @@
+"""Server-side prepared statements for the composed SQL in queries.py.
+
+A statement is registered once, by name, as the Composed object (or string)
+queries.py builds with %s placeholders. Whether it returns rows is decided
+then, from its leading keyword, not on every call. The first time a
+connection executes it, it is PREPAREd there with the placeholders numbered
+$1, $2, ...; from then on only EXECUTE name (params) goes over the wire and
+PostgreSQL reuses the parsed statement and, once it settles on one, its
+generic plan. Calls and execution time are counted per statement.
+
+    STATEMENTS.register("dashboard_summary", SQL_DASHBOARD_SUMMARY)
+    rows = STATEMENTS.execute(conn, "dashboard_summary", DASHBOARD_SUMMARY_PARAMS)
+"""
+
+import re
+import threading
+import time
+import weakref
+
+from psycopg2 import sql
+
+# leading keywords of statements whose results are fetched
+ROW_KEYWORDS = {"SELECT", "WITH", "VALUES", "TABLE", "SHOW", "EXPLAIN"}
+PLACEHOLDER_RE = re.compile(r"%([s%])")
+
+
+def leading_text(query):
+    """The first literal SQL text of query, without needing a connection to render it."""
+    if isinstance(query, str):
+        return query
+    if isinstance(query, sql.SQL):
+        return query.string
+    if isinstance(query, sql.Composed):
+        for part in query.seq:
+            text = leading_text(part)
+            if text.strip():
+                return text
+    return ""
+
+
+def returns_rows(query):
+    """True if query is a statement whose results should be fetched."""
+    words = leading_text(query).lstrip(" \n\t(").split(None, 1)
+    return bool(words) and words[0].upper() in ROW_KEYWORDS
+
+
+def numbered_placeholders(text):
+    """(text with each %s made $1, $2, ... and %% made %, number of parameters)."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(1) == "%":
+            return "%"
+        count += 1
+        return f"${count}"
+    return PLACEHOLDER_RE.sub(replace, text), count
+
+
+class Statement:
+    """One registered statement and its call statistics."""
+
+    def __init__(self, name, query):
+        self.name = name
+        self.query = query
+        self.returns_rows = returns_rows(query)
+        self.calls = 0
+        self.prepares = 0
+        self.seconds = 0.0
+
+    def stats(self):
+        """Calls, prepares and execution time of this statement as a dict."""
+        return {
+            "calls": self.calls,
+            "prepares": self.prepares,
+            "total_ms": round(self.seconds * 1000, 3),
+            "mean_ms": round(self.seconds * 1000 / self.calls, 3) if self.calls else None,
+        }
+
+    def record(self, seconds):
+        """Count one call that took seconds (callers hold the registry's lock)."""
+        self.calls += 1
+        self.seconds += seconds
+
+
+class StatementRegistry:
+    """Named statements, prepared lazily on each connection that runs them."""
+
+    def __init__(self, prefix="dashboard"):
+        self.prefix = prefix
+        self._statements = {}
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> names prepared there
+        self._lock = threading.Lock()
+
+    def register(self, name, query):
+        """Register query under name; registering the same name again is a no-op."""
+        with self._lock:
+            if name not in self._statements:
+                self._statements[name] = Statement(f"{self.prefix}_{name}", query)
+            return self._statements[name]
+
+    def _prepare(self, cur, statement):
+        """PREPARE statement on cur's connection unless it already is; returns its arity."""
+        conn = cur.connection
+        with self._lock:
+            prepared = self._prepared.setdefault(conn, {})
+            arity = prepared.get(statement.name)
+        if arity is not None:
+            return arity
+        text = statement.query if isinstance(statement.query, str) \
+            else statement.query.as_string(conn)
+        text, arity = numbered_placeholders(text.strip().rstrip(";"))
+        cur.execute(sql.SQL("PREPARE {} AS ").format(sql.Identifier(statement.name))
+                    + sql.SQL(text))
+        with self._lock:
+            prepared[statement.name] = arity
+            statement.prepares += 1
+        return arity
+
+    def execute(self, conn, name, params=None, cursor_factory=None):
+        """Run a registered statement on conn; its rows if it returns any.
+
+        Raises KeyError for a name that was never registered, and whatever
+        psycopg2.Error the statement raises. Transaction control is left to
+        the caller.
+        """
+        statement = self._statements[name]
+        params = tuple(params or ())
+        with conn.cursor(cursor_factory=cursor_factory) as cur:
+            arity = self._prepare(cur, statement)
+            if len(params) != arity:
+                raise ValueError(f"{name} takes {arity} parameters, got {len(params)}")
+            arguments = sql.SQL(" ({})").format(
+                sql.SQL(", ").join([sql.Placeholder()] * arity)) if arity else sql.SQL("")
+            start = time.perf_counter()
+            cur.execute(sql.SQL("EXECUTE {}{}").format(sql.Identifier(statement.name), arguments),
+                        params)
+            rows = cur.fetchall() if statement.returns_rows else None
+            elapsed = time.perf_counter() - start
+        with self._lock:
+            statement.record(elapsed)
+        return rows
+
+    def forget(self, conn):
+        """Drop what is known about conn, e.g. after DEALLOCATE ALL or DISCARD ALL on it."""
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def stats(self):
+        """{name: call statistics} for every registered statement."""
+        with self._lock:
+            return {name: statement.stats() for name, statement in self._statements.items()}
@@ -3,9 +3,77 @@
 
 # pylint: disable=too-many-locals,too-many-branches,too-many-statements,duplicate-code
 
+import argparse
+import gzip
+import io
 import json
+import re
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
+
 import psycopg2
+from psycopg2.extras import execute_values
+
+from schema import (ROLLUP_COLUMNS, bump_data_version, lock_rollups, migrate, prune_rollups,
+                    rebuild_rollups, refresh_statistics, update_rollups)
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'module3',
+    'user': 'postgres',  # Change as needed
+    'password': 'your_password',
+    'port': '5432'
+}
+
+TABLE = "application_data"
+# Columns written by every load strategy, in row-tuple order
+COLUMNS = (
+    "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "result_id", "program_name", "institution",
+)
+# Worked out by the loader rather than read from the record
+DERIVED_COLUMNS = ("result_id", "program_name", "institution")
+# What content_hash covers: everything read from the record
+CONTENT_COLUMNS = tuple(column for column in COLUMNS if column not in DERIVED_COLUMNS)
+STAGING_TABLE = "staging_application_data"
+ROLLUP_DELTA = "rollup_delta_application_data"
+RESULT_ID_RE = re.compile(r"/result/(\d+)")
+# "Statistics, University of California, Berkeley": the last part is only a
+# campus when the part before it names the university and it names nothing
+CAMPUS_PARENT_RE = re.compile(r"\b(?:university|college|institute)\b", re.IGNORECASE)
+INSTITUTION_RE = re.compile(r"\b(?:university|institute|school)\b", re.IGNORECASE)
+CAMPUS_MAX_WORDS = 4
+STRATEGIES = ("copy", "values", "row")
+BATCH_SIZE = 5000
+# parallel mode: every run's workers COPY their shards into an unlogged table
+# named with this prefix and a random suffix, so concurrent runs stay apart
+SHARD_TABLE_PREFIX = "shard_staging_application_data"
+SHARD_SIZE = 50000
+SHARD_RETRIES = 3
+
+# column-wise parsing: records per chunk, distinct "Added on ..." strings cached
+PARSE_CHUNK_SIZE = 5000
+DATE_CACHE_SIZE = 4096
+# score columns: (record key, prefix)
+SCORE_FIELDS = {
+    "gpa": ("GPA", "GPA "),
+    "gre": ("GRE", "GRE "),
+    "gre_v": ("GRE V", "GRE V "),
+    "gre_aw": ("GRE AW", "GRE AW "),
+}
+# text columns: record key
+TEXT_FIELDS = {
+    "program": "program", "comments": "comments", "url": "url", "status": "status",
+    "term": "term", "us_or_international": "US/International", "degree": "Degree",
+}
+
+# COPY text format: tab-separated, \N for NULL, backslash escapes
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
 
 
 def parse_gpa(gpa_str):
@@ -28,8 +96,12 @@ def parse_gre_score(score_str, prefix):
         return None
 
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def parse_date(date_str):
-    """Parse date from 'Added on Month DD, YYYY'."""
+    """Parse date from 'Added on Month DD, YYYY'.
+
+    Results are cached: a corpus has only a few hundred distinct dates.
+    """
     if not date_str or not date_str.startswith("Added on "):
         return None
     try:
@@ -39,82 +111,622 @@ def parse_date(date_str):
         return None
 
 
-def load_json_to_postgres():
-    """Load JSON data into PostgreSQL table application_data."""
-    db_config = {
-        'host': 'localhost',
-        'database': 'module3',
-        'user': 'postgres',  # Change as needed
-        'password': 'your_password',
-        'port': '5432'
-    }
-    json_file_path = "cleaned_applicant_data_10000.json"
+def iter_records(path):
+    """Yield records lazily from a .jsonl(.gz) stream or a legacy .json array."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        if path.removesuffix(".gz").endswith(".json"):
+            yield from json.load(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_result_id(url):
+    """Extract the GradCafe result ID from a result URL."""
+    match = RESULT_ID_RE.search(url or "")
+    return int(match.group(1)) if match else None
+
+
+def split_program(program):
+    """Split 'Statistics, University of Toronto' into (program name, institution).
+
+    Whitespace is normalized. The institution is the last comma-separated
+    part, or the last two when the last is a campus ('University of
+    Maryland, College Park'); without a comma there is no institution.
+    """
+    parts = [" ".join(part.split()) for part in (program or "").split(",")]
+    parts = [part for part in parts if part]
+    if len(parts) < 2:
+        return (parts[0] if parts else None), None
+    cut = len(parts) - 1
+    last = parts[cut]
+    if (cut > 1 and CAMPUS_PARENT_RE.search(parts[cut - 1])
+            and not INSTITUTION_RE.search(last) and len(last.split()) <= CAMPUS_MAX_WORDS):
+        cut -= 1
+    return ", ".join(parts[:cut]), ", ".join(parts[cut:])
+
+
+def record_to_row(record):
+    """Convert one JSON record into a tuple in COLUMNS order."""
+    program = record.get("program", "").strip()
+    return (
+        program,
+        record.get("comments", ""),
+        parse_date(record.get("date_added", "")),
+        record.get("url", ""),
+        record.get("status", ""),
+        record.get("term", ""),
+        record.get("US/International", ""),
+        parse_gpa(record.get("GPA", "")),
+        parse_gre_score(record.get("GRE", ""), "GRE "),
+        parse_gre_score(record.get("GRE V", ""), "GRE V "),
+        parse_gre_score(record.get("GRE AW", ""), "GRE AW "),
+        record.get("Degree", ""),
+        parse_result_id(record.get("url", "")),
+    ) + split_program(program)
+
+
+def batched(rows, size):
+    """Split an iterable of rows into lists of at most size rows."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+# ---- Column-wise parsing: a chunk of records at a time ----
+
+
+class ParseReport:
+    """Values per column that could not be parsed and were loaded as NULL."""
+
+    SAMPLES = 3
+
+    def __init__(self):
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, column, value, count=1):
+        """Record count occurrences of a bad value in column."""
+        self.counts[column] += count
+        samples = self.samples.setdefault(column, [])
+        if len(samples) < self.SAMPLES and value not in samples:
+            samples.append(value)
+
+    def update(self, other):
+        """Fold another report (from a worker process, say) into this one."""
+        for column, count in other.counts.items():
+            for value in other.samples.get(column, []):
+                self.add(column, value, 0)
+            self.counts[column] += count
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def lines(self):
+        """One summary line per column with bad values."""
+        return [
+            f"{column}: {count} bad value{'s' if count > 1 else ''}, e.g. "
+            + ", ".join(repr(value) for value in self.samples[column])
+            for column, count in self.counts.most_common()
+        ]
+
 
+def _column(records, key):
+    """The key of every record, "" where it is missing."""
+    return [record.get(key, "") for record in records]
+
+
+def _strings(values, column, report):
+    """values with anything but a string reported as bad and blanked."""
+    cleaned = []
+    for value in values:
+        if not isinstance(value, str):
+            if value is not None:  # JSON null is just a missing value
+                report.add(column, value)
+            value = ""
+        cleaned.append(value)
+    return cleaned
+
+
+def _parse_distinct(values, parse, column, report):
+    """parse() of every value, computed once per distinct value.
+
+    A value that is present but parses to None is reported as bad.
+    """
     try:
-        conn = psycopg2.connect(**db_config)
-        cur = conn.cursor()
+        distinct = set(values)
+    except TypeError:  # a list or object where a string belongs
+        values = _strings(values, column, report)
+        distinct = set(values)
+    table = {value: parse(value) if isinstance(value, str) else None for value in distinct}
+    bad = {value for value, parsed in table.items()
+           if parsed is None and value is not None and value != ""}
+    if bad:
+        for value, count in Counter(value for value in values if value in bad).items():
+            report.add(column, value, count)
+    return [table[value] for value in values]
+
+
+def parse_score_column(values, prefix, column="score", report=None):
+    """Parse a column of 'GRE 165'-style strings into floats, None where missing.
+
+    A plain list, not an array: the values go straight into row tuples.
+    """
+    report = ParseReport() if report is None else report
+    return _parse_distinct(values, lambda value: parse_gre_score(value, prefix),
+                           column, report)
+
+
+def parse_columns(records, report):
+    """Parse a chunk of records column by column; returns {column: values}.
+
+    Every column is a list, with None for a missing or unparseable value.
+    Text columns pass through as record_to_row() leaves them.
+    """
+    columns = {column: _column(records, key) for column, key in TEXT_FIELDS.items()}
+    try:
+        columns["program"] = [value.strip() for value in columns["program"]]
+    except AttributeError:
+        programs = _strings(columns["program"], "program", report)
+        columns["program"] = [value.strip() for value in programs]
+    columns["date_added"] = _parse_distinct(_column(records, "date_added"), parse_date,
+                                            "date_added", report)
+    for column, (key, prefix) in SCORE_FIELDS.items():
+        columns[column] = parse_score_column(_column(records, key), prefix, column, report)
+    # URLs are unique, so there is nothing to share between rows here
+    try:
+        result_ids = list(map(parse_result_id, columns["url"]))
+    except TypeError:
+        result_ids = list(map(parse_result_id, _strings(columns["url"], "url", report)))
+    if None in result_ids:
+        for url, result_id in zip(columns["url"], result_ids):
+            if result_id is None and url:
+                report.add("result_id", url)
+    columns["result_id"] = result_ids
+    splits = {program: split_program(program) for program in set(columns["program"])}
+    columns["program_name"] = [splits[program][0] for program in columns["program"]]
+    columns["institution"] = [splits[program][1] for program in columns["program"]]
+    return columns
+
+
+def rows_from_columns(columns):
+    """Row tuples in COLUMNS order."""
+    return zip(*(columns[column] for column in COLUMNS))
+
+
+def parse_chunk(records, report):
+    """Rows for one chunk of records; anything but a JSON object is skipped."""
+    objects = [record for record in records if isinstance(record, dict)]
+    if len(objects) < len(records):
+        for record in records:
+            if not isinstance(record, dict):
+                report.add("record", record)
+    return rows_from_columns(parse_columns(objects, report))
+
+
+def iter_parsed_rows(records, report, chunk_size=PARSE_CHUNK_SIZE):
+    """Rows for a stream of records, parsed a chunk at a time.
+
+    Bad field values are loaded as NULL and counted in report rather than
+    stopping the load.
+    """
+    chunks = batched(records, chunk_size)
+    return chain.from_iterable(parse_chunk(chunk, report) for chunk in chunks)
+
+
+def create_table(cur, table=TABLE):
+    """Create the application data table if it does not exist yet."""
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        "p_id SERIAL PRIMARY KEY, "
+        "program TEXT, "
+        "comments TEXT, "
+        "date_added DATE, "
+        "url TEXT, "
+        "status TEXT, "
+        "term TEXT, "
+        "us_or_international TEXT, "
+        "gpa NUMERIC, "
+        "gre NUMERIC, "
+        "gre_v NUMERIC, "
+        "gre_aw NUMERIC, "
+        "degree TEXT, "
+        "result_id BIGINT, "
+        "program_name TEXT, "
+        "institution TEXT, "
+        "content_hash TEXT"
+        ");"
+    )
+    # tables created before these columns were loaded
+    for column, sql_type in (("degree", "TEXT"), ("result_id", "BIGINT"),
+                             ("content_hash", "TEXT"), ("program_name", "TEXT"),
+                             ("institution", "TEXT")):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {sql_type};")
+
+
+def ensure_natural_key(cur, table=TABLE):
+    """Make result_id the table's unique natural key; returns the rows removed.
+
+    Older rows get result_id backfilled from url, and rows repeated by earlier
+    double loads are removed, keeping the lowest p_id.
+    """
+    cur.execute(
+        f"UPDATE {table} "
+        "SET result_id = substring(url from '/result/([0-9]+)')::BIGINT "
+        "WHERE result_id IS NULL AND url ~ '/result/[0-9]+';"
+    )
+    cur.execute(
+        f"DELETE FROM {table} a USING {table} b "
+        "WHERE a.result_id = b.result_id AND a.p_id > b.p_id;"
+    )
+    removed = cur.rowcount
+    if removed:
+        print(f"Removed {removed} duplicate rows")
+    cur.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_result_id_key ON {table} (result_id);"
+    )
+    return removed
 
-        create_table_sql = (
-            "CREATE TABLE IF NOT EXISTS application_data ("
-            "p_id SERIAL PRIMARY KEY, "
-            "program TEXT, "
-            "comments TEXT, "
-            "date_added DATE, "
-            "url TEXT, "
-            "status TEXT, "
-            "term TEXT, "
-            "us_or_international TEXT, "
-            "gpa NUMERIC, "
-            "gre NUMERIC, "
-            "gre_v NUMERIC, "
-            "gre_aw NUMERIC"
-            ");"
-        )
-        cur.execute(create_table_sql)
+
+def backfill_program_split(cur, table=TABLE):
+    """Fill program_name/institution for rows loaded before the loader split program.
+
+    Returns the number of distinct programs split.
+    """
+    cur.execute(
+        f"SELECT DISTINCT program FROM {table} "
+        "WHERE program_name IS NULL AND institution IS NULL AND program <> '';"
+    )
+    splits = [(program,) + split_program(program) for (program,) in cur.fetchall()]
+    execute_values(
+        cur,
+        f"UPDATE {table} t SET program_name = v.program_name, institution = v.institution "
+        "FROM (VALUES %s) AS v (program, program_name, institution) "
+        "WHERE t.program = v.program AND t.program_name IS NULL AND t.institution IS NULL",
+        splits, page_size=BATCH_SIZE,
+    )
+    if splits:
+        print(f"Split program for {len(splits)} distinct programs already loaded")
+    return len(splits)
+
+
+def create_staging_table(cur, table=TABLE):
+    """Create a temporary table with the loader's columns plus an arrival sequence."""
+    cur.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE};")
+    cur.execute(
+        f"CREATE TEMP TABLE {STAGING_TABLE} AS "
+        f"SELECT {', '.join(COLUMNS)} FROM {table} WITH NO DATA;"
+    )
+    cur.execute(f"ALTER TABLE {STAGING_TABLE} ADD COLUMN seq BIGSERIAL;")
+
+
+def merge_staged(cur, table=TABLE, staging=STAGING_TABLE):
+    """Upsert staged rows into table and return (inserted, updated).
+
+    Rows whose content hash is unchanged are not rewritten; within one input
+    the last occurrence of a result wins. Rows without a result ID cannot be
+    matched and are always inserted.
+
+    The rollups are updated from the rows this merge changes, and only those:
+    the old version of every rewritten row is taken out and each new or
+    rewritten row added, with the rollups locked against other loaders. If
+    anything changed, table's data version goes up with the same commit.
+    """
+    lock_rollups(cur, table)
+    columns = ", ".join(COLUMNS)
+    rollup_columns = ", ".join(ROLLUP_COLUMNS)
+    content_hash = f"md5(ROW({', '.join(CONTENT_COLUMNS)})::TEXT)"
+    updates = ", ".join(
+        f"{column} = EXCLUDED.{column}"
+        for column in COLUMNS + ("content_hash",) if column != "result_id"
+    )
+    cur.execute(f"DROP TABLE IF EXISTS {ROLLUP_DELTA};")
+    cur.execute(
+        f"CREATE TEMP TABLE {ROLLUP_DELTA} ON COMMIT DROP AS "
+        f"SELECT 1 AS sign, TRUE AS inserted, {rollup_columns} FROM {table} WITH NO DATA;"
+    )
+    # every CTE sees the table as it was before the upsert
+    cur.execute(
+        f"WITH latest AS ("
+        f"SELECT DISTINCT ON (result_id) {columns}, {content_hash} AS content_hash "
+        f"FROM {staging} WHERE result_id IS NOT NULL ORDER BY result_id, seq DESC), "
+        f"replaced AS ("
+        f"SELECT {', '.join(f't.{column}' for column in ROLLUP_COLUMNS)} "
+        f"FROM {table} t JOIN latest USING (result_id) "
+        f"WHERE t.content_hash IS DISTINCT FROM latest.content_hash), "
+        f"merged AS ("
+        f"INSERT INTO {table} ({columns}, content_hash) "
+        f"SELECT {columns}, content_hash FROM latest "
+        f"ON CONFLICT (result_id) DO UPDATE SET {updates} "
+        f"WHERE {table}.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+        f"RETURNING (xmax = 0) AS inserted, {rollup_columns}) "
+        f"INSERT INTO {ROLLUP_DELTA} "
+        f"SELECT -1, FALSE, * FROM replaced UNION ALL SELECT 1, * FROM merged;"
+    )
+    cur.execute(
+        f"WITH added AS ("
+        f"INSERT INTO {table} ({columns}, content_hash) "
+        f"SELECT {columns}, {content_hash} FROM {staging} "
+        f"WHERE result_id IS NULL ORDER BY seq RETURNING {rollup_columns}) "
+        f"INSERT INTO {ROLLUP_DELTA} SELECT 1, TRUE, * FROM added;"
+    )
+    cur.execute(
+        f"SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) "
+        f"FROM {ROLLUP_DELTA} WHERE sign = 1;"
+    )
+    inserted, updated = cur.fetchone()
+    update_rollups(cur, table, ROLLUP_DELTA, sign="sign")
+    prune_rollups(cur, table)
+    if inserted or updated:
+        bump_data_version(cur, table)
+    return inserted, updated
+
+
+def copy_value(value):
+    """Render one field in COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+def copy_rows(cur, rows, batch_size=BATCH_SIZE, table=TABLE, columns=COLUMNS):
+    """Stream rows through COPY FROM STDIN, one in-memory buffer per batch."""
+    copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    for batch in batched(rows, batch_size):
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write("\t".join(map(copy_value, row)) + "\n")
+        buffer.seek(0)
+        cur.copy_expert(copy_sql, buffer)
+        total += len(batch)
+    return total
+
+
+def insert_values(cur, rows, batch_size=BATCH_SIZE, table=TABLE):
+    """Insert rows with multi-row INSERT ... VALUES statements."""
+    insert_sql = f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES %s"
+    total = 0
+    for batch in batched(rows, batch_size):
+        execute_values(cur, insert_sql, batch, page_size=batch_size)
+        total += len(batch)
+    return total
+
+
+def insert_rows(cur, rows, table=TABLE):
+    """Insert rows one INSERT round trip at a time (the original behaviour)."""
+    placeholders = ", ".join(["%s"] * len(COLUMNS))
+    insert_sql = f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES ({placeholders});"
+    total = 0
+    for row in rows:
+        cur.execute(insert_sql, row)
+        total += 1
+    return total
+
+
+def load_rows(cur, rows, strategy, batch_size=BATCH_SIZE, table=TABLE):
+    """Insert rows with one of STRATEGIES; batch_size does not apply to "row"."""
+    if strategy == "copy":
+        return copy_rows(cur, rows, batch_size, table=table)
+    if strategy == "values":
+        return insert_values(cur, rows, batch_size, table=table)
+    if strategy == "row":
+        return insert_rows(cur, rows, table=table)
+    raise ValueError(f"unknown strategy {strategy!r}; choose from {', '.join(STRATEGIES)}")
+
+
+# ---- Parallel mode: shards COPYed from worker processes, merged once ----
+
+_WORKER_CONN = None
+
+
+def _init_shard_worker():
+    """Open the connection this worker process loads its shards on."""
+    global _WORKER_CONN  # pylint: disable=global-statement
+    _WORKER_CONN = psycopg2.connect(**DB_CONFIG)
+
+
+def load_shard(shard_table, first_seq, items):
+    """COPY one shard into shard_table in its own transaction.
+
+    items are raw JSON lines or already-parsed records; seq numbers continue
+    from first_seq so the merge can still tell which duplicate came last.
+    Returns (rows staged, records rejected, ParseReport); a rejected record
+    (anything but a JSON object) is counted in the report, as in a serial load.
+    """
+    report = ParseReport()
+    records = [json.loads(item) if isinstance(item, str) else item for item in items]
+    rejected = sum(not isinstance(record, dict) for record in records)
+    rows = (
+        row + (first_seq + i,) for i, row in enumerate(iter_parsed_rows(records, report))
+    )
+    try:
+        with _WORKER_CONN.cursor() as cur:
+            count = copy_rows(cur, rows, table=shard_table, columns=COLUMNS + ("seq",))
+        _WORKER_CONN.commit()
+    except Exception:
+        # leave nothing behind, so the shard can simply be sent again
+        if _WORKER_CONN.closed:
+            _init_shard_worker()
+        else:
+            _WORKER_CONN.rollback()
+        raise
+    return count, rejected, report
+
+
+def _iter_raw_items(path):
+    """Raw JSON lines (parsed later, in the workers) or records of a .json array."""
+    if path.removesuffix(".gz").endswith(".json"):
+        yield from iter_records(path)
+        return
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield line
+
+
+def iter_shards(path, shard_size=SHARD_SIZE):
+    """Yield (first_seq, items) for consecutive shards of the input file."""
+    seq = 0
+    for items in batched(_iter_raw_items(path), shard_size):
+        yield seq, items
+        seq += len(items)
+
+
+def create_shard_table(cur, table=TABLE):
+    """Create an unlogged table for one parallel run's workers; returns its name."""
+    shard_table = f"{SHARD_TABLE_PREFIX}_{uuid.uuid4().hex[:12]}"
+    cur.execute(
+        f"CREATE UNLOGGED TABLE {shard_table} AS "
+        f"SELECT {', '.join(COLUMNS)} FROM {table} WITH NO DATA;"
+    )
+    cur.execute(f"ALTER TABLE {shard_table} ADD COLUMN seq BIGINT;")
+    return shard_table
+
+
+def stage_parallel(path, workers, shard_table, shard_size=SHARD_SIZE, retries=SHARD_RETRIES):
+    """Load every shard of path into shard_table from a pool of worker processes.
+
+    Each shard commits on its own, so a failed one is retried by itself, up
+    to `retries` times. Returns (records read, rows staged, records rejected,
+    ParseReport).
+    """
+    shards = iter_shards(path, shard_size)
+    sent = staged = rejected = 0
+    report = ParseReport()
+    with ProcessPoolExecutor(workers, initializer=_init_shard_worker) as pool:
+        pending = {}
+
+        def submit(shard, attempt):
+            pending[pool.submit(load_shard, shard_table, *shard)] = (shard, attempt)
+
+        for shard in islice(shards, 2 * workers):
+            sent += len(shard[1])
+            submit(shard, 1)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard, attempt = pending.pop(future)
+                try:
+                    count, shard_rejected, shard_report = future.result()
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    if attempt > retries:
+                        raise RuntimeError(
+                            f"shard starting at record {shard[0]} failed "
+                            f"{attempt} times: {error}"
+                        ) from error
+                    print(f"Shard starting at record {shard[0]} failed ({error}), retrying")
+                    submit(shard, attempt + 1)
+                    continue
+                staged += count
+                rejected += shard_rejected
+                report.update(shard_report)
+                if (shard := next(shards, None)) is not None:
+                    sent += len(shard[1])
+                    submit(shard, 1)
+    return sent, staged, rejected, report
+
+
+def load_parallel(conn, path, workers, shard_size=SHARD_SIZE):
+    """Stage path from `workers` processes, then merge it all in one transaction.
+
+    Returns (staged, inserted, updated, ParseReport); raises RuntimeError if
+    the row counts do not add up, in which case nothing is committed.
+    """
+    cur = conn.cursor()
+    shard_table = create_shard_table(cur)
+    conn.commit()
+    try:
+        sent, staged, rejected, report = stage_parallel(path, workers, shard_table, shard_size)
+        cur.execute(f"SELECT COUNT(*) FROM {shard_table};")
+        in_table = cur.fetchone()[0]
+        if not sent - rejected == staged == in_table:
+            raise RuntimeError(f"read {sent} records ({rejected} rejected) but staged "
+                               f"{staged} ({in_table} in table)")
+
+        cur.execute(f"SELECT COUNT(*) FROM {TABLE};")
+        before = cur.fetchone()[0]
+        inserted, updated = merge_staged(cur, staging=shard_table)
+        cur.execute(f"SELECT COUNT(*) FROM {TABLE};")
+        after = cur.fetchone()[0]
+        if after - before != inserted:
+            raise RuntimeError(f"merge inserted {inserted} rows but the table grew by "
+                               f"{after - before}")
         conn.commit()
+    finally:
+        conn.rollback()
+        cur.execute(f"DROP TABLE IF EXISTS {shard_table};")
+        conn.commit()
+    return staged, inserted, updated, report
+
+
+def load_json_to_postgres(json_file_path="cleaned_applicant_data_10000.json",
+                          strategy="copy", batch_size=BATCH_SIZE, workers=1):
+    """Stream records from json_file_path into PostgreSQL table application_data.
 
-        with open(json_file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        insert_sql = (
-            "INSERT INTO application_data "
-            "(program, comments, date_added, url, status, term, "
-            "us_or_international, gpa, gre, gre_v, gre_aw) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);"
-        )
-        for record in data:
-            date_added = parse_date(record.get("Added on", ""))
-            gpa = parse_gpa(record.get("GPA", ""))
-            gre = parse_gre_score(record.get("GRE", ""), "GRE ")
-            gre_v = parse_gre_score(record.get("GRE V", ""), "GRE V ")
-            gre_aw = parse_gre_score(record.get("GRE AW", ""), "GRE AW ")
-
-            cur.execute(
-                insert_sql,
-                (
-                    record.get("program"),
-                    record.get("notes"),
-                    date_added,
-                    record.get("url"),
-                    record.get("status"),
-                    record.get("term"),
-                    record.get("US/International"),
-                    gpa,
-                    gre,
-                    gre_v,
-                    gre_aw,
-                ),
-            )
+    With workers > 1 the file is loaded in parallel shards (always via COPY).
+    """
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+        cur = conn.cursor()
+        create_table(cur)
+        repaired = ensure_natural_key(cur) + backfill_program_split(cur)
+        migrate(cur)
+        if repaired:
+            # rows changed outside merge_staged(), which keeps the rollups current
+            rebuild_rollups(cur)
         conn.commit()
+
+        if workers > 1:
+            staged, inserted, updated, report = load_parallel(conn, json_file_path, workers)
+            print(f"Staged {staged} records on {workers} connections: {inserted} new, "
+                  f"{updated} changed, {staged - inserted - updated} unchanged")
+        else:
+            # stage everything, then merge on result_id in the same transaction
+            report = ParseReport()
+            create_staging_table(cur)
+            rows = iter_parsed_rows(iter_records(json_file_path), report)
+            staged = load_rows(cur, rows, strategy, batch_size, table=STAGING_TABLE)
+            inserted, updated = merge_staged(cur)
+            conn.commit()
+            print(f"Staged {staged} records ({strategy}): {inserted} new, {updated} changed, "
+                  f"{staged - inserted - updated} unchanged")
+        for line in report.lines():
+            print(f"Loaded as NULL - {line}")
+        refresh_statistics(conn)
     except FileNotFoundError as error:
         print(f"JSON file not found: {error}")
     except json.JSONDecodeError as error:
         print(f"Invalid JSON format: {error}")
     except psycopg2.Error as error:
         print(f"Database error: {error}")
+    except RuntimeError as error:
+        print(f"Load aborted, nothing committed: {error}")
     finally:
         if 'conn' in locals():
             conn.close()
 
+
+def parse_args(argv=None):
+    """Command-line options for the loader."""
+    parser = argparse.ArgumentParser(description="Load applicant records into PostgreSQL.")
+    parser.add_argument("path", nargs="?", default="cleaned_applicant_data_10000.json",
+                        help=".jsonl(.gz) stream or .json array")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="copy",
+                        help="copy: COPY FROM STDIN; values: multi-row INSERT; "
+                             "row: one INSERT per row")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="rows per COPY buffer / INSERT statement")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="load shards of the file on this many connections in parallel")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    load_json_to_postgres()
+    ARGS = parse_args()
+    load_json_to_postgres(ARGS.path, ARGS.strategy, ARGS.batch_size, ARGS.workers)
@@ -7,6 +7,11 @@ import sys
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from graduate_analysis_app.pool import ConnectionPool
+from graduate_analysis_app.queries import (DASHBOARD_SUMMARY_PARAMS, SQL_DASHBOARD_SUMMARY,
+                                           like_pattern)
+from graduate_analysis_app.statements import StatementRegistry
+
 # Database connection configuration
 DB_CONFIG = {
     'host': 'localhost',
@@ -16,30 +21,24 @@ DB_CONFIG = {
     'port': '5432'
 }
 
+SEARCH_LIMIT = 20
 
-def get_connection():
-    """Create and return a new database connection."""
-    try:
-        return psycopg2.connect(**DB_CONFIG)
-    except psycopg2.Error as error:
-        print(f"Error connecting to database: {error}")
-        return None
 
+# Shared by every query this process runs; connections are opened on first use
+POOL = ConnectionPool(DB_CONFIG)
+# Prepared once on each pooled connection, then executed by name
+STATEMENTS = StatementRegistry(prefix="query_data")
 
-def execute_query(query, description):
-    """Execute SQL query and return a list of dict results."""
-    conn = get_connection()
-    if conn is None:
-        return None
+
+def execute_query(name, query, description, params=None):
+    """Execute SQL query as prepared statement name and return a list of dict results."""
+    STATEMENTS.register(name, query)
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(query)
-        return cur.fetchall()
+        with POOL.connection() as conn:
+            return STATEMENTS.execute(conn, name, params, RealDictCursor)
     except psycopg2.Error as error:
         print(f"Error executing {description}: {error}")
         return None
-    finally:
-        conn.close()
 
 
 def query_1_fall_2024_count():
@@ -49,7 +48,7 @@ def query_1_fall_2024_count():
         "FROM application_data "
         "WHERE term = 'Fall 2024';"
     )
-    results = execute_query(query, "Fall 2024 Count")
+    results = execute_query("fall_2024_count", query, "Fall 2024 Count")
     if results:
         data = results[0]
         print("=== QUERY 1: Fall 2024 Application Count ===")
@@ -69,7 +68,7 @@ def query_2_international_percentage():
         "AS international_percentage "
         "FROM application_data;"
     )
-    results = execute_query(query, "International Percentage")
+    results = execute_query("international_percentage", query, "International Percentage")
     if results:
         data = results[0]
         print("=== QUERY 2: International Students ===")
@@ -79,12 +78,92 @@ def query_2_international_percentage():
     return results
 
 
+def query_dashboard_summary():
+    """Every dashboard answer in one statement over the rollups load_data.py maintains.
+
+    application_data itself is not read; build_dashboard_query(rollups=False)
+    is the single-pass scan of it, kept for comparison in bench_dashboard.py.
+    """
+    results = execute_query("summary", SQL_DASHBOARD_SUMMARY, "Dashboard Summary",
+                            DASHBOARD_SUMMARY_PARAMS)
+    if results:
+        print("=== DASHBOARD SUMMARY ===")
+        for name, value in results[0].items():
+            print(f"{name}: {value}")
+    return results
+
+
+def institution_terms(cur, institution):
+    """The institution search term plus whatever institution_alias maps it to."""
+    cur.execute(
+        "SELECT institution FROM institution_alias WHERE alias = lower(%s);",
+        (institution,),
+    )
+    return [institution] + [row["institution"] for row in cur.fetchall()]
+
+
+def search_programs(institution="", program="", degree=None, limit=SEARCH_LIMIT,
+                    table="application_data"):
+    """Application counts per (institution, program name) matching the search.
+
+    Both terms are case-insensitive substrings of the columns the loader
+    splits out of program; institution also goes through institution_alias,
+    so 'JHU' finds 'Johns Hopkins University'. With pg_trgm installed both
+    filters are answered from GIN indexes. Returns a list of dicts, most
+    applications first, or None on error.
+    """
+    institution, program = institution.strip(), program.strip()
+    try:
+        with POOL.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            conditions, params = [], []
+            if institution:
+                terms = institution_terms(cur, institution)
+                conditions.append("(" + " OR ".join(["institution ILIKE %s"] * len(terms)) + ")")
+                params.extend(like_pattern(term) for term in terms)
+            if program:
+                conditions.append("program_name ILIKE %s")
+                params.append(like_pattern(program))
+            if degree:
+                conditions.append("degree_level = %s")
+                params.append(degree)
+            cur.execute(
+                "SELECT institution, program_name, COUNT(*) AS applications "
+                f"FROM {table} WHERE {' AND '.join(conditions) or 'TRUE'} "
+                "GROUP BY institution, program_name "
+                "ORDER BY applications DESC, institution, program_name LIMIT %s;",
+                params + [limit],
+            )
+            return cur.fetchall()
+    except psycopg2.Error as error:
+        print(f"Error executing program search: {error}")
+        return None
+
+
+def print_search(institution, program="", degree=None):
+    """Run search_programs and print its results."""
+    results = search_programs(institution, program, degree)
+    if results is None:
+        return
+    print(f"=== SEARCH: {institution or '*'} / {program or '*'} / {degree or '*'} ===")
+    for row in results:
+        print(f"{row['applications']:>6,}  {row['institution']} - {row['program_name']}")
+    if not results:
+        print("No matching applications.")
+
+
 def main():
     """Interactive menu to run queries."""
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        if len(sys.argv) > 2:
+            print_search(*sys.argv[2:5])
+        else:
+            print("Usage: python query_data.py search <institution> [program] [degree]")
+    elif len(sys.argv) > 1:
         try:
             num = int(sys.argv[1])
-            if num == 1:
+            if num == -1:
+                query_dashboard_summary()
+            elif num == 1:
                 query_1_fall_2024_count()
             elif num == 2:
                 query_2_international_percentage()
@@ -93,7 +172,8 @@ def main():
         except ValueError:
             print("Please provide a valid query number.")
     else:
-        print("Usage: python query_data.py <query_number>")
+        print("Usage: python query_data.py <query_number>   (-1 for the whole dashboard)")
+        print("       python query_data.py search <institution> [program] [degree]")
 
 
 if __name__ == "__main__":
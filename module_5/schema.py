@@ -0,0 +1,383 @@
+# module_5/schema.py
+"""Typed columns and indexes for application_data, tuned to the dashboard queries.
+
+    python schema.py
+
+load_data.py applies it before every load. The loader keeps writing the
+scraped text columns; the coded columns below are STORED generated columns
+computed from them, so they are filled in for existing rows when the
+migration runs, kept current by every insert and upsert, and can never
+disagree with the text they encode. Re-running the migration is a no-op.
+
+Program search runs on the program_name and institution columns the loader
+splits out of program. It gets pg_trgm GIN indexes where the extension can
+be installed, and institution_alias maps short names ("jhu") to what the
+institution column holds ("Johns Hopkins").
+
+The dashboard reads rollups rather than the table: application counts and
+score sums per term, decision, origin and degree level ({table}_rollup),
+per degree level, institution and program ({table}_program_rollup), and
+fine-binned score histograms per term, decision and degree level
+({table}_histogram) for the distribution endpoints. They are
+built when first created, kept current by the loader from the rows each load
+changes, and rebuilt from scratch by running this script.
+
+data_version holds a counter per table that goes up with every change to
+its data, in the same transaction; the app's result cache keys on it.
+"""
+
+# pylint: disable=duplicate-code
+
+import psycopg2
+
+# Database connection configuration
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'module3',
+    'user': 'postgres',  # Change as needed
+    'password': 'your_password',
+    'port': '5432'
+}
+
+TABLE = "application_data"
+
+# enum type -> labels, in sort order
+ENUM_TYPES = {
+    "application_decision": ("Accepted", "Rejected", "Wait listed", "Interview", "Other"),
+    "applicant_origin": ("American", "International", "Other"),
+    "degree_level": ("Masters", "PhD", "Other"),
+    "term_season": ("Spring", "Summer", "Fall", "Winter"),
+}
+
+# coded column -> (type, expression over the text columns); blank text stays NULL.
+# Every label is cast explicitly, which keeps the expressions immutable.
+GENERATED_COLUMNS = {
+    "decision": (
+        "application_decision",
+        "CASE WHEN status LIKE '%Accept%' THEN 'Accepted'::application_decision "
+        "WHEN status LIKE '%Reject%' THEN 'Rejected'::application_decision "
+        "WHEN status ILIKE '%wait%' THEN 'Wait listed'::application_decision "
+        "WHEN status LIKE '%Interview%' THEN 'Interview'::application_decision "
+        "WHEN status <> '' THEN 'Other'::application_decision END",
+    ),
+    "origin": (
+        "applicant_origin",
+        "CASE WHEN us_or_international = 'American' THEN 'American'::applicant_origin "
+        "WHEN us_or_international = 'International' THEN 'International'::applicant_origin "
+        "WHEN us_or_international <> '' THEN 'Other'::applicant_origin END",
+    ),
+    "degree_level": (
+        "degree_level",
+        "CASE WHEN degree ILIKE '%masters%' THEN 'Masters'::degree_level "
+        "WHEN degree ILIKE '%phd%' THEN 'PhD'::degree_level "
+        "WHEN degree <> '' THEN 'Other'::degree_level END",
+    ),
+    "term_season": (
+        "term_season",
+        "CASE WHEN term LIKE 'Spring%' THEN 'Spring'::term_season "
+        "WHEN term LIKE 'Summer%' THEN 'Summer'::term_season "
+        "WHEN term LIKE 'Fall%' THEN 'Fall'::term_season "
+        "WHEN term LIKE 'Winter%' THEN 'Winter'::term_season END",
+    ),
+    "term_year": ("SMALLINT", "substring(term from '[0-9]{4}')::SMALLINT"),
+}
+
+# index name suffix -> definition; each one serves the dashboard query noted beside it
+INDEXES = {
+    # Fall 2024 count (index-only on term), acceptance rate
+    "term_decision_idx": "(term, decision)",
+    # international share
+    "term_origin_idx": "(term, origin)",
+    # average GPA of American / of accepted Fall 2024 applicants
+    "gpa_idx": "(term, origin, decision) INCLUDE (gpa) WHERE gpa IS NOT NULL",
+    # average GPA and GRE scores over everyone
+    "scores_idx": "(term) INCLUDE (gpa, gre, gre_v, gre_aw)",
+    # JHU computer science masters without pg_trgm: filtered inside the index
+    "degree_search_idx": "(degree_level) INCLUDE (program_name, institution)",
+}
+# superseded indexes, dropped by the migration
+RETIRED_INDEXES = ("degree_program_idx",)
+
+# substring search on the split program columns, when pg_trgm can be installed
+TRIGRAM_INDEXES = {
+    "institution_trgm_idx": "USING GIN (institution gin_trgm_ops)",
+    "program_name_trgm_idx": "USING GIN (program_name gin_trgm_ops)",
+}
+
+# lower-case alias -> what the institution column contains for that school
+ALIAS_TABLE = "institution_alias"
+VERSION_TABLE = "data_version"
+INSTITUTION_ALIASES = {
+    "jhu": "Johns Hopkins",
+    "mit": "Massachusetts Institute of Technology",
+    "cmu": "Carnegie Mellon",
+    "caltech": "California Institute of Technology",
+    "gatech": "Georgia Institute of Technology",
+    "georgia tech": "Georgia Institute of Technology",
+    "nyu": "New York University",
+    "usc": "University of Southern California",
+    "upenn": "University of Pennsylvania",
+    "penn": "University of Pennsylvania",
+    "uchicago": "University of Chicago",
+    "umich": "University of Michigan",
+    "uiuc": "University of Illinois",
+    "uw": "University of Washington",
+    "ucb": "University of California, Berkeley",
+    "uc berkeley": "University of California, Berkeley",
+    "ucla": "University of California, Los Angeles",
+    "ucsd": "University of California, San Diego",
+    "ut austin": "University of Texas at Austin",
+    "unc": "University of North Carolina",
+    "uoft": "University of Toronto",
+    "ubc": "University of British Columbia",
+    "ucl": "University College London",
+    "lse": "London School of Economics",
+}
+
+# score -> histogram bin width. A score falls in bin floor(score / width), so
+# percentiles read from the bins are exact to within one width.
+HISTOGRAM_BINS = {"gpa": 0.01, "gre": 1, "gre_v": 1, "gre_aw": 0.1}
+# what {table}_histogram groups by, besides the score and its bin
+HISTOGRAM_KEYS = ("term", "decision", "degree_level")
+
+# rollup table suffix -> (grouping columns, score columns kept as sum and non-null count).
+# Keys are stored as text, '' standing for NULL, so they can form a primary key.
+ROLLUPS = {
+    "rollup": (("term", "decision", "origin", "degree_level"), ("gpa", "gre", "gre_v", "gre_aw")),
+    "program_rollup": (("degree_level", "institution", "program_name"), ()),
+    # applications counts the scores in each bin, one row per non-null score
+    "histogram": (HISTOGRAM_KEYS + ("score", "bin"), ()),
+}
+
+# every column a rollup is computed from
+ROLLUP_COLUMNS = tuple(dict.fromkeys(
+    [column for keys, scores in ROLLUPS.values() for column in keys + scores
+     if column not in ("score", "bin")] + list(HISTOGRAM_BINS)
+))
+
+
+def create_enum_types(cur):
+    """Create the enum types that do not exist yet."""
+    cur.execute("SELECT typname FROM pg_type WHERE typtype = 'e';")
+    existing = {row[0] for row in cur.fetchall()}
+    for name, labels in ENUM_TYPES.items():
+        if name not in existing:
+            quoted = ", ".join(f"'{label}'" for label in labels)
+            cur.execute(f"CREATE TYPE {name} AS ENUM ({quoted});")
+
+
+def add_generated_columns(cur, table=TABLE):
+    """Add the coded columns; existing rows are filled in by the ALTER itself."""
+    for column, (sql_type, expression) in GENERATED_COLUMNS.items():
+        cur.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {sql_type} "
+            f"GENERATED ALWAYS AS ({expression}) STORED;"
+        )
+
+
+def create_indexes(cur, table=TABLE, indexes=None):
+    """Create the indexes (the dashboard ones by default) that do not exist yet."""
+    for suffix in RETIRED_INDEXES:
+        cur.execute(f"DROP INDEX IF EXISTS {table}_{suffix};")
+    for suffix, definition in (INDEXES if indexes is None else indexes).items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_{suffix} ON {table} {definition};")
+
+
+def enable_trigrams(cur):
+    """Install pg_trgm if the server has it; returns whether it is available."""
+    cur.execute("SAVEPOINT enable_trigrams;")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    except psycopg2.Error as error:
+        cur.execute("ROLLBACK TO SAVEPOINT enable_trigrams;")
+        print(f"pg_trgm unavailable, program search will not be indexed: "
+              f"{str(error).splitlines()[0]}")
+        return False
+    cur.execute("RELEASE SAVEPOINT enable_trigrams;")
+    return True
+
+
+def create_alias_table(cur):
+    """Create institution_alias and add the built-in aliases it does not have yet."""
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {ALIAS_TABLE} ("
+        "alias TEXT PRIMARY KEY CHECK (alias = lower(alias)), "
+        "institution TEXT NOT NULL"
+        ");"
+    )
+    cur.executemany(
+        f"INSERT INTO {ALIAS_TABLE} (alias, institution) VALUES (%s, %s) "
+        "ON CONFLICT (alias) DO NOTHING;",
+        sorted(INSTITUTION_ALIASES.items()),
+    )
+
+
+def create_version_table(cur):
+    """Create data_version, one change counter per table."""
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        "table_name TEXT PRIMARY KEY, "
+        "version BIGINT NOT NULL, "
+        "changed_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+        ");"
+    )
+
+
+def bump_data_version(cur, table=TABLE):
+    """Count a change to table's data; returns its new version."""
+    cur.execute(
+        f"INSERT INTO {VERSION_TABLE} (table_name, version) VALUES (%s, 1) "
+        f"ON CONFLICT (table_name) DO UPDATE SET version = {VERSION_TABLE}.version + 1, "
+        "changed_at = now() RETURNING version;",
+        (table,),
+    )
+    return cur.fetchone()[0]
+
+
+def rollup_measures(scores):
+    """Column names of a rollup besides its keys."""
+    return ("applications",) + tuple(f"{score}_{part}" for score in scores
+                                     for part in ("sum", "count"))
+
+
+def rollup_select(source, keys, scores, sign="1"):
+    """SELECT aggregating the rows of source into rollup rows, each counted sign times."""
+    columns = [f"COALESCE({key}::TEXT, '')" for key in keys] + [f"SUM({sign})"]
+    for score in scores:
+        columns += [f"COALESCE(SUM({sign} * {score}), 0)",
+                    f"COALESCE(SUM({sign}) FILTER (WHERE {score} IS NOT NULL), 0)"]
+    positions = ", ".join(str(position) for position in range(1, len(keys) + 1))
+    return f"SELECT {', '.join(columns)} FROM {source} GROUP BY {positions}"
+
+
+def rollup_source(suffix, source, sign="1"):
+    """(rows, sign) that rollup suffix aggregates: source, or one row per score for histogram."""
+    if suffix != "histogram":
+        return source, sign
+    scores = ", ".join(f"('{score}', {score}::NUMERIC, {width})"
+                       for score, width in HISTOGRAM_BINS.items())
+    return (
+        f"(SELECT {', '.join(HISTOGRAM_KEYS)}, s.score, "
+        f"floor(s.value / s.width)::BIGINT AS bin, {sign} AS sign FROM {source} "
+        f"CROSS JOIN LATERAL (VALUES {scores}) AS s (score, value, width) "
+        f"WHERE s.value IS NOT NULL) AS scores",
+        "sign",
+    )
+
+
+def rollup_rows(suffix, source, sign="1"):
+    """SELECT of rollup suffix's rows from source, each counted sign times."""
+    keys, scores = ROLLUPS[suffix]
+    rows, sign = rollup_source(suffix, source, sign)
+    return rollup_select(rows, keys, scores, sign)
+
+
+def create_rollups(cur, table=TABLE):
+    """Create the rollup tables that do not exist yet and fill them from table.
+
+    Existing rollups are emptied if table has no rows.
+    """
+    for suffix, (keys, scores) in ROLLUPS.items():
+        cur.execute("SELECT to_regclass(%s);", (f"{table}_{suffix}",))
+        if cur.fetchone()[0] is not None:
+            # left over from a table that was dropped and created again
+            cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table});")
+            if not cur.fetchone()[0]:
+                cur.execute(f"TRUNCATE {table}_{suffix};")
+            continue
+        columns = [f"{key} TEXT NOT NULL" for key in keys] + [
+            f"{measure} {'NUMERIC' if measure.endswith('_sum') else 'BIGINT'} NOT NULL"
+            for measure in rollup_measures(scores)
+        ]
+        cur.execute(
+            f"CREATE TABLE {table}_{suffix} ({', '.join(columns)}, "
+            f"PRIMARY KEY ({', '.join(keys)}));"
+        )
+        cur.execute(f"INSERT INTO {table}_{suffix} {rollup_rows(suffix, table)};")
+
+
+def rebuild_rollups(cur, table=TABLE):
+    """Recompute every rollup from table."""
+    for suffix in ROLLUPS:
+        cur.execute(f"TRUNCATE {table}_{suffix};")
+        cur.execute(f"INSERT INTO {table}_{suffix} {rollup_rows(suffix, table)};")
+    # whatever the rollups disagreed on, cached answers may have too
+    bump_data_version(cur, table)
+
+
+def drop_rollups(cur, table=TABLE):
+    """Drop table's rollups, as when table itself is dropped."""
+    for suffix in ROLLUPS:
+        cur.execute(f"DROP TABLE IF EXISTS {table}_{suffix};")
+
+
+def lock_rollups(cur, table=TABLE):
+    """Hold the rollups against other loaders until the transaction ends."""
+    for suffix in ROLLUPS:
+        cur.execute(f"LOCK TABLE {table}_{suffix} IN SHARE ROW EXCLUSIVE MODE;")
+
+
+def update_rollups(cur, table=TABLE, source=None, sign="1"):
+    """Add the rows of source (by default all of table) to table's rollups.
+
+    sign is a number or a column of source: rows with sign -1 are taken away.
+    Groups left with no applications stay until prune_rollups().
+    """
+    for suffix, (keys, scores) in ROLLUPS.items():
+        updates = ", ".join(f"{measure} = {table}_{suffix}.{measure} + EXCLUDED.{measure}"
+                            for measure in rollup_measures(scores))
+        cur.execute(
+            f"INSERT INTO {table}_{suffix} {rollup_rows(suffix, source or table, sign)} "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates};"
+        )
+
+
+def prune_rollups(cur, table=TABLE):
+    """Delete rollup groups that no longer have any applications."""
+    for suffix in ROLLUPS:
+        cur.execute(f"DELETE FROM {table}_{suffix} WHERE applications = 0;")
+
+
+def migrate(cur, table=TABLE):
+    """Bring table up to the typed, indexed schema (within the caller's transaction)."""
+    create_enum_types(cur)
+    add_generated_columns(cur, table)
+    create_indexes(cur, table)
+    create_alias_table(cur)
+    create_version_table(cur)
+    if enable_trigrams(cur):
+        create_indexes(cur, table, TRIGRAM_INDEXES)
+    create_rollups(cur, table)
+
+
+def refresh_statistics(conn, table=TABLE, vacuum=False):
+    """ANALYZE table, so the planner sees fresh statistics.
+
+    With vacuum it runs VACUUM (ANALYZE), which also updates the visibility
+    map that index-only scans depend on. That is worth it after a full
+    rebuild; after an incremental load autovacuum is left to do it.
+    """
+    autocommit, conn.autocommit = conn.autocommit, True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"VACUUM (ANALYZE) {table};" if vacuum else f"ANALYZE {table};")
+    finally:
+        conn.autocommit = autocommit
+
+
+def main():
+    """Apply the migration to the configured database and rebuild the rollups."""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            migrate(cur)
+            rebuild_rollups(cur)
+        conn.commit()
+        refresh_statistics(conn, vacuum=True)
+        print(f"{TABLE}: {len(GENERATED_COLUMNS)} coded columns, {len(INDEXES)} indexes")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
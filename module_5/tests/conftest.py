@@ -0,0 +1,54 @@
+"""Fixtures shared by the module_5 tests.
+
+Tests marked db run against a PostgreSQL database: the one named by the
+MODULE5_TEST_DSN libpq connection string, e.g.
+
+    MODULE5_TEST_DSN="dbname=module5_test user=postgres" python -m pytest
+
+or, without it, a throwaway server in a temporary directory if the
+pgserver package (see requirements.txt) is installed. They create and drop
+their own tables, so never point MODULE5_TEST_DSN at the database the app
+serves. With neither they are skipped, and pytest -rs says why.
+"""
+
+import os
+
+import psycopg2
+import pytest
+
+try:
+    import pgserver
+except ImportError:
+    pgserver = None
+
+TEST_DSN = os.environ.get("MODULE5_TEST_DSN")
+
+
+@pytest.fixture(name="test_dsn", scope="session")
+def fixture_test_dsn(tmp_path_factory):
+    """MODULE5_TEST_DSN, else the URI of a server started for this session."""
+    if TEST_DSN:
+        yield TEST_DSN
+        return
+    if pgserver is None:
+        pytest.skip("MODULE5_TEST_DSN is not set and pgserver is not installed")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture(name="db_config")
+def fixture_db_config(test_dsn):
+    """psycopg2.connect() keyword arguments for the test database."""
+    return {"dsn": test_dsn}
+
+
+@pytest.fixture(name="conn")
+def fixture_conn(db_config):
+    """A connection to the test database, closed after the test."""
+    try:
+        connection = psycopg2.connect(**db_config)
+    except psycopg2.OperationalError as err:
+        pytest.skip(f"test database unavailable: {err}")
+    yield connection
+    connection.close()
@@ -0,0 +1,213 @@
+"""The JSON and CSV endpoints: bad input, revalidation, an unreachable database, real rows."""
+
+import csv
+import gzip
+import io
+
+import pytest
+
+import app as dashboard_app
+from cache import MemoryBackend, ResultCache
+from pool import ConnectionPool
+from test_load import record
+
+from load_data import (STAGING_TABLE, TABLE, ParseReport, copy_rows, create_staging_table,
+                       create_table, ensure_natural_key, iter_parsed_rows, merge_staged)
+from schema import drop_rollups, migrate
+
+STATS_ROW = {"applications": 4, "accepted": 1, "international": 2, "avg_gpa": 3.5,
+             "avg_gre_quant": None, "avg_gre_verbal": None, "avg_gre_writing": None,
+             "acceptance_percentage": 25.0, "international_percentage": 50.0}
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    """A test client for the app."""
+    with dashboard_app.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(name="fake_db")
+def fixture_fake_db(monkeypatch):
+    """Answer every query with STATS_ROW at a data version the test can change."""
+    state = {"version": 7, "queries": []}
+
+    def execute_query(name, *_args, **_kwargs):
+        state["queries"].append(name)
+        return [STATS_ROW]
+
+    monkeypatch.setattr(dashboard_app, "execute_query", execute_query)
+    monkeypatch.setattr(dashboard_app, "CACHE", ResultCache(
+        MemoryBackend(), version=lambda: state["version"], version_ttl=0))
+    return state
+
+
+@pytest.fixture(name="no_db")
+def fixture_no_db(monkeypatch):
+    """Point the app at a database nobody is listening for."""
+    pool = ConnectionPool({"host": "127.0.0.1", "port": 1, "connect_timeout": 1})
+    monkeypatch.setattr(dashboard_app, "POOL", pool)
+    monkeypatch.setattr(dashboard_app, "CACHE", ResultCache(
+        MemoryBackend(), version=dashboard_app.read_data_version))
+    yield
+    pool.close()
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("url", [
+    "/api/stats?status=Maybe",
+    "/api/stats?colour=red",
+    "/api/stats?term=%20",
+    "/api/stats/by/program",
+    "/api/distribution/gpa?term=Fall%202025&institution=jhu",
+    "/api/distribution/gpa?percentiles=10,abc",
+    "/api/distribution/gpa?percentiles=101",
+    "/api/distribution/gpa?width=0.015",
+    "/api/distribution/sat",
+    "/records?limit=0",
+    "/records?after=last",
+    "/records?degree=BA",
+    "/export.csv?nationality=Martian",
+])
+def test_bad_arguments_are_400(client, fake_db, url):
+    """Bad filters and paging arguments get a 400 with a message, and no query runs."""
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.get_json()["error"]
+    assert fake_db["queries"] == []
+
+
+@pytest.mark.api
+def test_stats_revalidation_is_answered_without_a_query(client, fake_db):
+    """A matching If-None-Match is a 304 until the data version changes."""
+    first = client.get("/api/stats?degree=Masters")
+    assert first.status_code == 200
+    assert first.get_json()["stats"] == STATS_ROW
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/api/stats?degree=Masters", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert len(fake_db["queries"]) == 1
+
+    other = client.get("/api/stats?degree=PhD", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    fake_db["version"] += 1
+    changed = client.get("/api/stats?degree=Masters", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.api
+def test_conditional_request_reads_the_version_afresh(client, fake_db, monkeypatch):
+    """A load just before an If-None-Match request is seen even within version_ttl."""
+    monkeypatch.setattr(dashboard_app, "CACHE", ResultCache(
+        MemoryBackend(), version=lambda: fake_db["version"], version_ttl=60))
+    etag = client.get("/api/stats").headers["ETag"]
+    fake_db["version"] += 1
+    response = client.get("/api/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["version"] == fake_db["version"]
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("url", ["/api/stats", "/api/stats/by/term", "/api/distribution/gre",
+                                 "/records", "/export.csv"])
+def test_unreachable_database_is_503(client, no_db, url):  # pylint: disable=unused-argument
+    """When no connection can be had the endpoints say so with a 503, not a 500."""
+    response = client.get(url)
+    assert response.status_code == 503
+    assert response.get_json()["error"]
+    assert "ETag" not in response.headers
+
+
+@pytest.fixture(name="loaded")
+def fixture_loaded(conn, db_config, monkeypatch):
+    """application_data in the test database with 7 rows, served through a fresh pool."""
+    def drop(cur):
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE};")
+        drop_rollups(cur, TABLE)
+
+    records = [record(result_id, status=("Accepted", "Rejected")[result_id % 2],
+                      comments=f'line one\nsaid "{result_id}", ok')
+               for result_id in range(1, 8)]
+    with conn.cursor() as cur:
+        drop(cur)
+        create_table(cur)
+        ensure_natural_key(cur)
+        migrate(cur)
+        create_staging_table(cur)
+        copy_rows(cur, iter_parsed_rows(records, ParseReport()), table=STAGING_TABLE)
+        merge_staged(cur)
+    conn.commit()
+    pool = ConnectionPool(db_config)
+    monkeypatch.setattr(dashboard_app, "POOL", pool)
+    monkeypatch.setattr(dashboard_app, "CACHE", ResultCache(
+        MemoryBackend(), version=dashboard_app.read_data_version))
+    yield records
+    pool.close()
+    conn.rollback()
+    with conn.cursor() as cur:
+        drop(cur)
+        cur.execute("DELETE FROM data_version WHERE table_name = %s;", (TABLE,))
+    conn.commit()
+
+
+@pytest.mark.db
+@pytest.mark.api
+def test_stats_from_the_rollups(client, loaded):
+    """/api/stats answers from the rollups and revalidates against the real data version."""
+    response = client.get("/api/stats?status=Accepted")
+    assert response.status_code == 200
+    assert response.get_json()["stats"]["applications"] == \
+        sum(item["status"] == "Accepted" for item in loaded)
+    again = client.get("/api/stats?status=Accepted",
+                       headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.db
+@pytest.mark.api
+def test_records_pages_through_every_row(client, loaded):
+    """Following next_after visits every row once, in p_id order."""
+    seen, after = [], 0
+    while after is not None:
+        page = client.get(f"/records?limit=3&after={after}").get_json()
+        assert len(page["records"]) <= 3
+        seen.extend(row["p_id"] for row in page["records"])
+        after = page["next_after"]
+    assert len(seen) == len(loaded)
+    assert seen == sorted(seen)
+
+
+@pytest.mark.db
+@pytest.mark.api
+def test_export_streams_gzip_csv_and_returns_the_connection(client, loaded):
+    """The gzip export decodes to a header plus every row; its connection goes back to the pool."""
+    response = client.get("/export.csv", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert rows[0] == list(dashboard_app.RECORD_COLUMNS)
+    assert len(rows) == len(loaded) + 1
+    assert rows[1][dashboard_app.RECORD_COLUMNS.index("comments")] == 'line one\nsaid "1", ok'
+    response.close()
+    assert dashboard_app.POOL.stats()[0] == dashboard_app.POOL.stats()[1]
+
+
+@pytest.mark.db
+@pytest.mark.api
+def test_distribution_from_the_histogram(client, loaded):
+    """/api/distribution counts every score and places percentiles within one fine bin."""
+    response = client.get("/api/distribution/gpa?status=Accepted&percentiles=50")
+    assert response.status_code == 200
+    body = response.get_json()
+    accepted = sum(item["status"] == "Accepted" for item in loaded)
+    assert body["count"] == accepted
+    assert abs(body["percentiles"]["p50"] - 3.7) <= 0.01
+    assert sum(row["count"] for row in body["histogram"]) == accepted
+    again = client.get("/api/distribution/gpa?status=Accepted&percentiles=50",
+                       headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
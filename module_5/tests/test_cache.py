@@ -0,0 +1,95 @@
+"""cache.py: results keyed by data version, single-flight misses and both backends."""
+
+import threading
+import time
+
+import pytest
+
+from cache import MemoryBackend, ResultCache, SQLiteBackend
+
+
+class Counter:  # pylint: disable=too-few-public-methods
+    """A compute() that counts its calls and returns the count."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"calls": self.calls}
+
+
+@pytest.mark.cache
+def test_result_is_computed_once_per_version():
+    """A result is reused until the data version changes."""
+    version = [1]
+    cache = ResultCache(MemoryBackend(), version=lambda: version[0], version_ttl=0)
+    compute = Counter()
+    assert cache.get_or_compute("dashboard", compute) == {"calls": 1}
+    assert cache.get_or_compute("dashboard", compute) == {"calls": 1}
+    version[0] = 2
+    assert cache.get_or_compute("dashboard", compute) == {"calls": 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.cache
+def test_version_is_trusted_for_version_ttl():
+    """The version callable is read once per version_ttl, not per request."""
+    reads = Counter()
+    cache = ResultCache(MemoryBackend(), version=lambda: reads()["calls"], version_ttl=60)
+    assert [cache.version() for _ in range(5)] == [1] * 5
+    cache.invalidate()
+    assert cache.version() == 2
+    assert cache.version(fresh=True) == 3
+    assert cache.version() == 3
+
+
+@pytest.mark.cache
+def test_failed_result_is_not_cached():
+    """compute() returning None is passed on and tried again next time."""
+    cache = ResultCache(MemoryBackend())
+    results = iter([None, {"ok": True}])
+    assert cache.get_or_compute("dashboard", lambda: next(results)) is None
+    assert cache.get_or_compute("dashboard", lambda: next(results)) == {"ok": True}
+
+
+@pytest.mark.cache
+def test_concurrent_misses_compute_once():
+    """Threads missing on the same key wait for one computation."""
+    cache = ResultCache(MemoryBackend())
+    compute = Counter(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_compute("dashboard", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert compute.calls == 1
+    assert results == [{"calls": 1}] * 8
+
+
+@pytest.mark.cache
+def test_memory_backend_expires_and_evicts():
+    """Entries expire after their TTL, and the least recently used go past max_entries."""
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    assert backend.get("a") == 1
+    backend.set("c", 3, ttl=60)
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (1, None, 3)
+    backend.set("d", 4, ttl=-1)
+    assert backend.get("d") is None
+
+
+@pytest.mark.cache
+def test_sqlite_backend_is_shared_through_its_file(tmp_path):
+    """Two SQLiteBackends on one file, as two worker processes would, see each other's entries."""
+    path = str(tmp_path / "cache.sqlite")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    first.set("dashboard@1", {"total_entries": 10}, ttl=60)
+    assert second.get("dashboard@1") == {"total_entries": 10}
+    second.clear()
+    assert first.get("dashboard@1") is None
@@ -0,0 +1,53 @@
+"""The dashboard's fan-out: concurrent queries, each with its own server-side deadline."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app as dashboard_app
+from pool import ConnectionPool
+from queries import DASHBOARD_COLUMNS
+
+FIRST, SECOND = DASHBOARD_COLUMNS[:2]
+
+
+@pytest.fixture(name="pooled")
+def fixture_pooled(db_config, monkeypatch):
+    """The app's queries run on a pool of the test database."""
+    pool = ConnectionPool(db_config)
+    monkeypatch.setattr(dashboard_app, "POOL", pool)
+    yield pool
+    pool.close()
+
+
+def sleeper(name, seconds, column):
+    """A fan-out query that takes about seconds and answers 1 in column."""
+    return (f"test_{name}", name, f"SELECT 1 AS {column} FROM pg_sleep({seconds})", None,
+            (column,))
+
+
+@pytest.mark.db
+@pytest.mark.dashboard
+def test_slow_query_is_cancelled_and_the_rest_answer(pooled):  # pylint: disable=unused-argument
+    """A query over the limit leaves its columns at 0; the page is marked incomplete."""
+    data, complete = dashboard_app.run_dashboard_queries(
+        [sleeper("slow", 1, FIRST), sleeper("quick", 0, SECOND)], timeout_ms=200)
+    assert not complete
+    assert (data[FIRST], data[SECOND]) == (0, 1)
+
+
+@pytest.mark.db
+@pytest.mark.dashboard
+def test_time_queued_does_not_count_against_the_limit(pooled, monkeypatch):  # pylint: disable=unused-argument
+    """With one fan-out thread the second query queues, then still gets its full limit."""
+    monkeypatch.setattr(dashboard_app, "FANOUT", ThreadPoolExecutor(max_workers=1))
+    data, complete = dashboard_app.run_dashboard_queries(
+        [sleeper("first", 0.3, FIRST), sleeper("second", 0.3, SECOND)], timeout_ms=500)
+    assert complete
+    assert (data[FIRST], data[SECOND]) == (1, 1)
+
+
+@pytest.mark.dashboard
+def test_fanout_has_a_thread_per_pooled_connection():
+    """More threads than connections would only queue on the pool instead."""
+    assert dashboard_app.FANOUT._max_workers == dashboard_app.POOL.max_size  # pylint: disable=protected-access
@@ -0,0 +1,209 @@
+"""load_data.py: the result_id upsert, the parallel load, and the rollups they keep current."""
+
+import json
+from decimal import Decimal
+
+import pytest
+
+import load_data
+from load_data import (STAGING_TABLE, ParseReport, copy_rows, create_shard_table,
+                       create_staging_table, create_table, ensure_natural_key,
+                       iter_parsed_rows, load_parallel, merge_staged, parse_score_column,
+                       record_to_row)
+from schema import ROLLUPS, drop_rollups, migrate, rollup_rows
+
+TABLE = "test_application_data"
+
+
+def record(result_id, **fields):
+    """A scraped record for result_id, with fields overriding the defaults."""
+    return {
+        "program": "Computer Science, Johns Hopkins University",
+        "comments": "",
+        "date_added": "Added on March 3, 2025",
+        "url": f"https://www.thegradcafe.com/result/{result_id}",
+        "status": "Accepted",
+        "term": "Fall 2025",
+        "US/International": "International",
+        "Degree": "Masters",
+        "GPA": "GPA 3.70",
+        "GRE": "GRE 320",
+        **fields,
+    }
+
+
+@pytest.fixture(name="table")
+def fixture_table(conn):
+    """A migrated, empty scratch copy of application_data, dropped afterwards."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE};")
+        drop_rollups(cur, TABLE)
+        create_table(cur, TABLE)
+        ensure_natural_key(cur, TABLE)
+        migrate(cur, TABLE)
+    conn.commit()
+    yield TABLE
+    conn.rollback()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE};")
+        drop_rollups(cur, TABLE)
+        cur.execute("DELETE FROM data_version WHERE table_name = %s;", (TABLE,))
+    conn.commit()
+
+
+@pytest.fixture(name="application_data")
+def fixture_application_data(conn, db_config, monkeypatch):
+    """An empty application_data, which the parallel load always targets, dropped afterwards."""
+    # the shard workers are forked after this, so they connect here too
+    monkeypatch.setattr(load_data, "DB_CONFIG", db_config)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {load_data.TABLE};")
+        drop_rollups(cur, load_data.TABLE)
+        create_table(cur)
+        ensure_natural_key(cur)
+        migrate(cur)
+    conn.commit()
+    yield load_data.TABLE
+    conn.rollback()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {load_data.TABLE};")
+        drop_rollups(cur, load_data.TABLE)
+        cur.execute("DELETE FROM data_version WHERE table_name = %s;", (load_data.TABLE,))
+    conn.commit()
+
+
+def load(conn, records):
+    """Stage records and merge them into TABLE as the serial loader does; (inserted, updated)."""
+    with conn.cursor() as cur:
+        create_staging_table(cur, TABLE)
+        copy_rows(cur, iter_parsed_rows(records, ParseReport()), table=STAGING_TABLE)
+        counts = merge_staged(cur, TABLE)
+    conn.commit()
+    return counts
+
+
+def query(conn, statement, params=()):
+    """Every row of statement."""
+    with conn.cursor() as cur:
+        cur.execute(statement, params)
+        return cur.fetchall()
+
+
+def data_version(conn):
+    """TABLE's version in data_version, or None before its first change."""
+    rows = query(conn, "SELECT version FROM data_version WHERE table_name = %s;", (TABLE,))
+    return rows[0][0] if rows else None
+
+
+def assert_rollups_current(conn):
+    """Every rollup of TABLE holds exactly what rebuilding it from the table would."""
+    for suffix in ROLLUPS:
+        kept = query(conn, f"SELECT * FROM {TABLE}_{suffix};")
+        rebuilt = query(conn, rollup_rows(suffix, TABLE))
+        assert sorted(kept, key=repr) == sorted(rebuilt, key=repr), suffix
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_reload_is_idempotent(conn, table):
+    """Loading the same records twice inserts them once and changes nothing the second time."""
+    records = [record(result_id) for result_id in range(1, 6)]
+    assert load(conn, records) == (5, 0)
+    version = data_version(conn)
+    assert load(conn, records) == (0, 0)
+    assert query(conn, f"SELECT COUNT(*) FROM {table};") == [(5,)]
+    assert data_version(conn) == version
+    assert_rollups_current(conn)
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_merge_counts_new_changed_and_unchanged(conn, table):
+    """A reload reports new and changed rows; unchanged ones are not rewritten."""
+    load(conn, [record(1), record(2), record(3)])
+    version = data_version(conn)
+    untouched = query(conn, f"SELECT xmin::TEXT FROM {table} WHERE result_id = 2;")
+
+    inserted, updated = load(conn, [record(1, status="Rejected"), record(2), record(4)])
+    assert (inserted, updated) == (1, 1)
+    assert query(conn, f"SELECT result_id, status FROM {table} ORDER BY result_id;") == [
+        (1, "Rejected"), (2, "Accepted"), (3, "Accepted"), (4, "Accepted")]
+    assert query(conn, f"SELECT xmin::TEXT FROM {table} WHERE result_id = 2;") == untouched
+    assert data_version(conn) == version + 1
+    assert_rollups_current(conn)
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_last_occurrence_in_one_input_wins(conn, table):
+    """A result repeated within one input is stored once, as its last occurrence."""
+    assert load(conn, [record(1, GPA="GPA 3.10"), record(2), record(1, GPA="GPA 3.90")]) == \
+        (2, 0)
+    assert query(conn, f"SELECT gpa FROM {table} WHERE result_id = 1;")[0][0] == Decimal("3.90")
+    assert_rollups_current(conn)
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_rows_without_result_id_are_always_inserted(conn, table):
+    """Rows with no result ID cannot be matched, so every load adds them again."""
+    orphan = record(1, url="https://www.thegradcafe.com/survey/")
+    assert load(conn, [orphan]) == (1, 0)
+    assert load(conn, [orphan]) == (1, 0)
+    assert query(conn, f"SELECT COUNT(*) FROM {table} WHERE result_id IS NULL;") == [(2,)]
+    assert_rollups_current(conn)
+
+
+@pytest.mark.load
+def test_columnwise_rows_match_record_to_row():
+    """Chunked column-wise parsing gives the rows record_to_row() does."""
+    records = [record(1), record(2, GPA="GPA 3,7", GRE=""), record(3, date_added="")]
+    report = ParseReport()
+    assert list(iter_parsed_rows(records, report, chunk_size=2)) == \
+        [record_to_row(item) for item in records]
+    assert report.counts == {"gpa": 1}
+
+
+@pytest.mark.load
+def test_score_columns_are_plain_lists():
+    """Scores come back as a list of floats with None for a missing or bad value."""
+    report = ParseReport()
+    values = parse_score_column(["GRE 320", "", None, "GRE x", "GRE 320"], "GRE ", "gre", report)
+    assert values == [320.0, None, None, None, 320.0]
+    assert isinstance(values, list)
+    assert report.counts == {"gre": 1}
+
+
+@pytest.mark.load
+def test_non_objects_are_reported_not_parsed():
+    """A JSON value that is not an object yields no row and is counted in the report."""
+    report = ParseReport()
+    rows = list(iter_parsed_rows([record(1), None, [1, 2], record(2)], report))
+    assert [row[12] for row in rows] == [1, 2]
+    assert report.counts["record"] == 2
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_parallel_load_counts_rejected_records(conn, application_data, tmp_path):
+    """A null line is reported as in a serial load instead of aborting the parallel one."""
+    path = tmp_path / "records.jsonl"
+    lines = [json.dumps(record(result_id)) for result_id in range(1, 6)]
+    path.write_text("\n".join(lines[:3] + ["null"] + lines[3:]) + "\n", encoding="utf-8")
+    staged, inserted, updated, report = load_parallel(conn, str(path), workers=2, shard_size=2)
+    assert (staged, inserted, updated) == (5, 5, 0)
+    assert report.counts == {"record": 1}
+    assert query(conn, f"SELECT COUNT(*) FROM {application_data};") == [(5,)]
+    assert query(conn, "SELECT tablename FROM pg_tables WHERE tablename LIKE %s;",
+                 (f"{load_data.SHARD_TABLE_PREFIX}%",)) == []
+
+
+@pytest.mark.db
+@pytest.mark.load
+def test_parallel_runs_stage_into_their_own_tables(conn, application_data):
+    """Two runs at once get different shard tables, so neither drops the other's rows."""
+    with conn.cursor() as cur:
+        first, second = create_shard_table(cur, application_data), create_shard_table(cur)
+    conn.rollback()
+    assert first != second
+    assert first.startswith(load_data.SHARD_TABLE_PREFIX)
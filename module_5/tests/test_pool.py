@@ -0,0 +1,87 @@
+"""pool.py: connections shared between threads, checked and replaced as needed."""
+
+import threading
+import time
+
+import pytest
+from psycopg2.pool import PoolError
+
+from pool import ConnectionPool
+
+
+@pytest.mark.pool
+def test_pool_size_must_make_sense():
+    """min_size above max_size is refused before anything connects."""
+    with pytest.raises(ValueError):
+        ConnectionPool({}, min_size=3, max_size=2)
+
+
+@pytest.mark.db
+@pytest.mark.pool
+def test_connections_are_reused_with_a_statement_timeout(db_config):
+    """Sequential checkouts share one connection, opened with the pool's statement_timeout."""
+    pool = ConnectionPool(db_config, max_size=2, statement_timeout_ms=1234)
+    try:
+        with pool.connection() as first, first.cursor() as cur:
+            cur.execute("SHOW statement_timeout;")
+            assert cur.fetchone()[0] == "1234ms"
+        with pool.connection() as second:
+            assert second is first
+        assert pool.stats() == (1, 1)
+    finally:
+        pool.close()
+
+
+@pytest.mark.db
+@pytest.mark.pool
+def test_checkout_times_out_when_every_connection_is_in_use(db_config):
+    """With max_size connections checked out, the next checkout fails after checkout_timeout."""
+    pool = ConnectionPool(db_config, max_size=1, checkout_timeout=0.1)
+    try:
+        with pool.connection():
+            with pytest.raises(PoolError):
+                pool.getconn()
+    finally:
+        pool.close()
+
+
+@pytest.mark.db
+@pytest.mark.pool
+def test_broken_connection_is_replaced(db_config):
+    """A connection that died while idle is discarded on checkout and a new one opened."""
+    pool = ConnectionPool(db_config, ping_after=0)
+    try:
+        with pool.connection() as conn:
+            dead = conn
+        dead.close()
+        with pool.connection() as conn:
+            assert conn is not dead
+            assert pool.stats() == (1, 0)
+    finally:
+        pool.close()
+
+
+@pytest.mark.db
+@pytest.mark.pool
+def test_threads_share_at_most_max_size_connections(db_config):
+    """Many threads checking out at once open no more than max_size connections."""
+    pool = ConnectionPool(db_config, max_size=3)
+    seen, lock = set(), threading.Lock()
+
+    def work():
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_backend_pid();")
+            with lock:
+                seen.add(cur.fetchone()[0])
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(seen) == 3
+        assert pool.stats() == (3, 3)
+    finally:
+        pool.close()
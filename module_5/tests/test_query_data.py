@@ -0,0 +1,17 @@
+"""query_data.py's command line."""
+
+import pytest
+
+import query_data
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["search"], "Usage: python query_data.py search <institution>"),
+    (["abc"], "Please provide a valid query number."),
+    ([], "Usage: python query_data.py <query_number>"),
+])
+def test_usage_without_a_database(monkeypatch, capsys, argv, expected):
+    """Missing or malformed arguments print usage instead of running a query."""
+    monkeypatch.setattr("sys.argv", ["query_data.py", *argv])
+    query_data.main()
+    assert capsys.readouterr().out.startswith(expected)
@@ -0,0 +1,40 @@
+"""statements.py: composed SQL prepared once per connection and executed by name."""
+
+import psycopg2
+import pytest
+
+from statements import StatementRegistry, numbered_placeholders, returns_rows
+
+
+@pytest.mark.statements
+def test_placeholders_are_numbered():
+    """%s becomes $1, $2, ... and %% a literal %."""
+    assert numbered_placeholders("SELECT %s, %s WHERE a LIKE 'x%%'") == \
+        ("SELECT $1, $2 WHERE a LIKE 'x%'", 2)
+
+
+@pytest.mark.statements
+def test_row_returning_statements_are_recognised():
+    """Whether a statement's rows are fetched is decided from its leading keyword."""
+    assert returns_rows("  (SELECT 1)")
+    assert returns_rows("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not returns_rows("UPDATE t SET a = 1")
+
+
+@pytest.mark.db
+@pytest.mark.statements
+def test_statement_is_prepared_once_per_connection(conn):
+    """The first execution on a connection PREPAREs; later ones only EXECUTE."""
+    registry = StatementRegistry(prefix="test")
+    registry.register("add", "SELECT %s::INT + %s::INT AS total")
+    assert registry.execute(conn, "add", (1, 2)) == [(3,)]
+    assert registry.execute(conn, "add", (5, 5)) == [(10,)]
+    with conn.cursor() as cur:
+        cur.execute("SELECT name FROM pg_prepared_statements;")
+        assert cur.fetchall() == [("test_add",)]
+    assert registry.stats()["add"]["calls"] == 2
+    assert registry.stats()["add"]["prepares"] == 1
+    with pytest.raises(ValueError):
+        registry.execute(conn, "add", (1,))
+    with pytest.raises(psycopg2.Error):
+        registry.execute(conn, "add", ("x", 1))